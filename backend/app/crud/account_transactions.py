@@ -1,11 +1,139 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from app.models.account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, and_, case, cast, insert, select, update, Date, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem, SpendRollup, ChemicalPurchaseStats
+from app.models.chemical_inventory import ChemicalInventory
 from app.schema.account_transactions import AccountTransactionCreate, AccountTransactionUpdate, PurchaseOrderCreate, PurchaseOrderUpdate
+from app.crud.rows import TransactionRow, row_columns, materialize
+from app.services.read_cache import queue_cache_invalidation, account_summary_cache_keys
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import uuid
 
+# Spend rollup maintenance
+def _spend_period(created_at: datetime) -> date:
+    """Rollup bucket: first day of the UTC month"""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date().replace(day=1)
+
+def _months_before(period: date, months: int) -> date:
+    year, month = divmod(period.year * 12 + period.month - 1 - months, 12)
+    return date(year, month + 1, 1)
+
+def _spend_key(transaction: AccountTransaction) -> Optional[tuple]:
+    if transaction.created_at is None:
+        return None
+    return (
+        _spend_period(transaction.created_at),
+        transaction.supplier or "",
+        transaction.currency or "USD",
+        transaction.transaction_type
+    )
+
+def _apply_spend_delta(db: Session, key: Optional[tuple], amount: float, count: int) -> None:
+    """Add amount/count to one rollup row in the caller's transaction (atomic upsert, no read)"""
+    if key is None or (not amount and not count):
+        return
+    period, supplier, currency, transaction_type = key
+    stmt = pg_insert(SpendRollup).values(
+        period=period, supplier=supplier, currency=currency, transaction_type=transaction_type,
+        total_amount=amount, transaction_count=count
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SpendRollup.period, SpendRollup.supplier, SpendRollup.currency, SpendRollup.transaction_type],
+        set_={
+            "total_amount": SpendRollup.total_amount + stmt.excluded.total_amount,
+            "transaction_count": SpendRollup.transaction_count + stmt.excluded.transaction_count,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
+
+def rebuild_spend_rollup(db: Session) -> int:
+    """Recompute spend_rollup from account_transactions (backfills, drift repair); returns rows written"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Hold off transaction writes so none lands between the wipe and the re-aggregation
+        db.execute(text("LOCK TABLE account_transactions IN SHARE MODE"))
+    db.query(SpendRollup).delete(synchronize_session=False)
+    
+    period = cast(func.date_trunc("month", func.timezone("UTC", AccountTransaction.created_at)), Date)
+    supplier = func.coalesce(AccountTransaction.supplier, "")
+    currency = func.coalesce(AccountTransaction.currency, "USD")
+    totals = select(
+        period, supplier, currency, AccountTransaction.transaction_type,
+        func.sum(AccountTransaction.amount), func.count(AccountTransaction.id)
+    ).where(AccountTransaction.created_at.isnot(None)).group_by(
+        period, supplier, currency, AccountTransaction.transaction_type
+    )
+    result = db.execute(SpendRollup.__table__.insert().from_select(
+        ["period", "supplier", "currency", "transaction_type", "total_amount", "transaction_count"], totals
+    ))
+    queue_cache_invalidation(db, account_summary_cache_keys())
+    db.commit()
+    return result.rowcount
+
+# Per-chemical purchase stats maintenance
+def _apply_purchase_stats_delta(db: Session, chemical_id: int, quantity: float, amount: float, count: int,
+                                purchased_at: Optional[datetime]) -> None:
+    """Add a purchase (or, with negative values, remove one) from the chemical's stats row"""
+    stmt = pg_insert(ChemicalPurchaseStats).values(
+        chemical_id=chemical_id,
+        total_quantity=quantity,
+        total_spent=amount,
+        purchase_count=count,
+        average_unit_price=amount / quantity if quantity > 0 else 0,
+        last_purchase_date=purchased_at
+    )
+    total_quantity = ChemicalPurchaseStats.total_quantity + stmt.excluded.total_quantity
+    total_spent = ChemicalPurchaseStats.total_spent + stmt.excluded.total_spent
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChemicalPurchaseStats.chemical_id],
+        set_={
+            "total_quantity": total_quantity,
+            "total_spent": total_spent,
+            "purchase_count": ChemicalPurchaseStats.purchase_count + stmt.excluded.purchase_count,
+            "average_unit_price": case((total_quantity > 0, total_spent / total_quantity), else_=0),
+            "last_purchase_date": func.greatest(ChemicalPurchaseStats.last_purchase_date, stmt.excluded.last_purchase_date),
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
+
+def _refresh_last_purchase_date(db: Session, chemical_id: int) -> None:
+    """Recompute last_purchase_date after a purchase was removed (index-backed max)"""
+    latest = select(func.max(AccountTransaction.created_at)).where(
+        AccountTransaction.chemical_id == chemical_id,
+        AccountTransaction.transaction_type == 'purchase'
+    ).scalar_subquery()
+    db.execute(
+        update(ChemicalPurchaseStats)
+        .where(ChemicalPurchaseStats.chemical_id == chemical_id)
+        .values(last_purchase_date=latest)
+    )
+
+def rebuild_chemical_purchase_stats(db: Session) -> int:
+    """Recompute chemical_purchase_stats from account_transactions; returns rows written"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE account_transactions IN SHARE MODE"))
+    db.query(ChemicalPurchaseStats).delete(synchronize_session=False)
+    
+    total_quantity = func.sum(AccountTransaction.quantity)
+    total_spent = func.sum(AccountTransaction.amount)
+    totals = select(
+        AccountTransaction.chemical_id,
+        total_quantity,
+        total_spent,
+        func.count(AccountTransaction.id),
+        case((total_quantity > 0, total_spent / total_quantity), else_=0),
+        func.max(AccountTransaction.created_at)
+    ).where(AccountTransaction.transaction_type == 'purchase').group_by(AccountTransaction.chemical_id)
+    result = db.execute(ChemicalPurchaseStats.__table__.insert().from_select(
+        ["chemical_id", "total_quantity", "total_spent", "purchase_count", "average_unit_price", "last_purchase_date"], totals
+    ))
+    db.commit()
+    return result.rowcount
+
 # Account Transaction CRUD
 def create_account_transaction(db: Session, transaction: AccountTransactionCreate, user_id: str) -> AccountTransaction:
     db_transaction = AccountTransaction(
@@ -22,6 +150,13 @@ def create_account_transaction(db: Session, transaction: AccountTransactionCreat
         created_by=user_id
     )
     db.add(db_transaction)
+    db.flush()  # created_at comes back with the INSERT
+    _apply_spend_delta(db, _spend_key(db_transaction), db_transaction.amount, 1)
+    if db_transaction.transaction_type == 'purchase':
+        _apply_purchase_stats_delta(
+            db, db_transaction.chemical_id, db_transaction.quantity, db_transaction.amount, 1, db_transaction.created_at
+        )
+    queue_cache_invalidation(db, account_summary_cache_keys())
     db.commit()
     db.refresh(db_transaction)
     return db_transaction
@@ -32,15 +167,44 @@ def get_account_transactions(db: Session, skip: int = 0, limit: int = 100, chemi
         query = query.filter(AccountTransaction.chemical_id == chemical_id)
     return query.offset(skip).limit(limit).all()
 
+def get_account_transaction_rows(db: Session, skip: int = 0, limit: int = 100, chemical_id: Optional[int] = None) -> List[TransactionRow]:
+    """ORM-free list read (same rows as get_account_transactions)"""
+    stmt = select(*row_columns(AccountTransaction, TransactionRow))
+    if chemical_id:
+        stmt = stmt.where(AccountTransaction.chemical_id == chemical_id)
+    return materialize(db.execute(stmt.offset(skip).limit(limit)), TransactionRow)
+
 def get_account_transaction(db: Session, transaction_id: int) -> Optional[AccountTransaction]:
     return db.query(AccountTransaction).filter(AccountTransaction.id == transaction_id).first()
 
 def update_account_transaction(db: Session, transaction_id: int, transaction_update: AccountTransactionUpdate) -> Optional[AccountTransaction]:
     db_transaction = get_account_transaction(db, transaction_id)
     if db_transaction:
+        old_key, old_amount = _spend_key(db_transaction), db_transaction.amount
+        was_purchase, old_quantity = db_transaction.transaction_type == 'purchase', db_transaction.quantity
         update_data = transaction_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_transaction, field, value)
+        new_key = _spend_key(db_transaction)
+        if new_key == old_key:
+            _apply_spend_delta(db, new_key, db_transaction.amount - old_amount, 0)
+        else:
+            _apply_spend_delta(db, old_key, -old_amount, -1)
+            _apply_spend_delta(db, new_key, db_transaction.amount, 1)
+        
+        is_purchase = db_transaction.transaction_type == 'purchase'
+        chemical_id, created_at = db_transaction.chemical_id, db_transaction.created_at
+        if was_purchase and is_purchase:
+            _apply_purchase_stats_delta(
+                db, chemical_id, db_transaction.quantity - old_quantity, db_transaction.amount - old_amount, 0, created_at
+            )
+        elif was_purchase:
+            _apply_purchase_stats_delta(db, chemical_id, -old_quantity, -old_amount, -1, None)
+            db.flush()
+            _refresh_last_purchase_date(db, chemical_id)
+        elif is_purchase:
+            _apply_purchase_stats_delta(db, chemical_id, db_transaction.quantity, db_transaction.amount, 1, created_at)
+        queue_cache_invalidation(db, account_summary_cache_keys())
         db.commit()
         db.refresh(db_transaction)
     return db_transaction
@@ -48,7 +212,16 @@ def update_account_transaction(db: Session, transaction_id: int, transaction_upd
 def delete_account_transaction(db: Session, transaction_id: int) -> bool:
     db_transaction = get_account_transaction(db, transaction_id)
     if db_transaction:
+        _apply_spend_delta(db, _spend_key(db_transaction), -db_transaction.amount, -1)
+        if db_transaction.transaction_type == 'purchase':
+            _apply_purchase_stats_delta(
+                db, db_transaction.chemical_id, -db_transaction.quantity, -db_transaction.amount, -1, None
+            )
+        queue_cache_invalidation(db, account_summary_cache_keys())
         db.delete(db_transaction)
+        if db_transaction.transaction_type == 'purchase':
+            db.flush()
+            _refresh_last_purchase_date(db, db_transaction.chemical_id)
         db.commit()
         return True
     return False
@@ -58,15 +231,30 @@ def generate_order_number() -> str:
     """Generate a unique order number"""
     return f"PO-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
 
+def _line_total(quantity: float, unit_price: float) -> float:
+    return round(quantity * unit_price, 2)
+
+def recompute_order_totals(db: Session, order_ids: List[int]) -> None:
+    """Set total_amount to the sum of the orders' item totals, in one UPDATE"""
+    item_total = select(func.coalesce(func.sum(PurchaseOrderItem.total_price), 0.0)).where(
+        PurchaseOrderItem.purchase_order_id == PurchaseOrder.id
+    ).scalar_subquery()
+    db.execute(
+        update(PurchaseOrder)
+        .where(PurchaseOrder.id.in_(order_ids))
+        .values(total_amount=item_total)
+        .execution_options(synchronize_session=False)
+    )
+
 def create_purchase_order(db: Session, purchase_order: PurchaseOrderCreate, user_id: str) -> PurchaseOrder:
     # Generate order number
     order_number = generate_order_number()
     
-    # Create purchase order
+    # Create purchase order (total_amount is filled in from the items below)
     db_purchase_order = PurchaseOrder(
         order_number=order_number,
         supplier=purchase_order.supplier,
-        total_amount=purchase_order.total_amount,
+        total_amount=0.0,
         currency=purchase_order.currency,
         expected_delivery=purchase_order.expected_delivery,
         status=purchase_order.status,
@@ -76,31 +264,45 @@ def create_purchase_order(db: Session, purchase_order: PurchaseOrderCreate, user
     db.add(db_purchase_order)
     db.flush()  # Get the ID without committing
     
-    # Create purchase order items
-    for item in purchase_order.items:
-        db_item = PurchaseOrderItem(
-            purchase_order_id=db_purchase_order.id,
-            chemical_id=item.chemical_id,
-            quantity=item.quantity,
-            unit=item.unit,
-            unit_price=item.unit_price,
-            total_price=item.total_price,
-            notes=item.notes
-        )
-        db.add(db_item)
+    # Create purchase order items in one executemany; line totals are priced here, not by the client
+    if purchase_order.items:
+        db.execute(insert(PurchaseOrderItem), [
+            {
+                "purchase_order_id": db_purchase_order.id,
+                "chemical_id": item.chemical_id,
+                "quantity": item.quantity,
+                "unit": item.unit,
+                "unit_price": item.unit_price,
+                "total_price": _line_total(item.quantity, item.unit_price),
+                "notes": item.notes
+            }
+            for item in purchase_order.items
+        ])
+    recompute_order_totals(db, [db_purchase_order.id])
     
+    queue_cache_invalidation(db, account_summary_cache_keys())
     db.commit()
-    db.refresh(db_purchase_order)
-    return db_purchase_order
+    return get_purchase_order(db, db_purchase_order.id)
 
-def get_purchase_orders(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None) -> List[PurchaseOrder]:
-    query = db.query(PurchaseOrder)
+def get_purchase_orders(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None,
+                        supplier: Optional[str] = None, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> List[PurchaseOrder]:
+    """Newest orders first, with their items loaded in one extra query (selectinload)"""
+    query = db.query(PurchaseOrder).options(selectinload(PurchaseOrder.items))
     if status:
         query = query.filter(PurchaseOrder.status == status)
-    return query.offset(skip).limit(limit).all()
+    if supplier:
+        query = query.filter(PurchaseOrder.supplier == supplier)
+    if start:
+        query = query.filter(PurchaseOrder.order_date >= start)
+    if end:
+        query = query.filter(PurchaseOrder.order_date < end)
+    return query.order_by(PurchaseOrder.order_date.desc(), PurchaseOrder.id.desc()).offset(skip).limit(limit).all()
 
 def get_purchase_order(db: Session, order_id: int) -> Optional[PurchaseOrder]:
-    return db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).first()
+    return db.query(PurchaseOrder).options(selectinload(PurchaseOrder.items)).filter(
+        PurchaseOrder.id == order_id
+    ).first()
 
 def update_purchase_order(db: Session, order_id: int, order_update: PurchaseOrderUpdate) -> Optional[PurchaseOrder]:
     db_order = get_purchase_order(db, order_id)
@@ -108,13 +310,15 @@ def update_purchase_order(db: Session, order_id: int, order_update: PurchaseOrde
         update_data = order_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_order, field, value)
+        queue_cache_invalidation(db, account_summary_cache_keys())
         db.commit()
-        db.refresh(db_order)
+        db_order = get_purchase_order(db, order_id)
     return db_order
 
 def delete_purchase_order(db: Session, order_id: int) -> bool:
     db_order = get_purchase_order(db, order_id)
     if db_order:
+        queue_cache_invalidation(db, account_summary_cache_keys())
         db.delete(db_order)
         db.commit()
         return True
@@ -122,80 +326,119 @@ def delete_purchase_order(db: Session, order_id: int) -> bool:
 
 # Summary and Analytics
 def get_account_summary(db: Session) -> dict:
-    """Get account summary statistics"""
-    # Total purchases
-    total_purchases = db.query(func.sum(AccountTransaction.amount)).filter(
-        AccountTransaction.transaction_type == 'purchase'
-    ).scalar() or 0
+    """Get account summary statistics from spend_rollup (one row per month/supplier/currency/type)"""
+    start_of_month = datetime.now(timezone.utc).date().replace(day=1)
+    start_of_year = start_of_month.replace(month=1)
+    
+    totals = db.query(
+        SpendRollup.period,
+        SpendRollup.transaction_type,
+        func.sum(SpendRollup.total_amount),
+        func.sum(SpendRollup.transaction_count)
+    ).group_by(SpendRollup.period, SpendRollup.transaction_type).all()
     
-    # Total transactions
-    total_transactions = db.query(func.count(AccountTransaction.id)).scalar() or 0
+    total_purchases = total_spent_this_month = total_spent_this_year = 0.0
+    total_transactions = 0
+    for period, transaction_type, amount, count in totals:
+        total_transactions += int(count or 0)
+        if transaction_type != 'purchase':
+            continue
+        amount = float(amount or 0)
+        total_purchases += amount
+        if period >= start_of_year:
+            total_spent_this_year += amount
+        if period >= start_of_month:
+            total_spent_this_month += amount
     
     # Pending orders
     pending_orders = db.query(func.count(PurchaseOrder.id)).filter(
         PurchaseOrder.status.in_(['draft', 'submitted'])
     ).scalar() or 0
     
-    # This month's spending
-    start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    total_spent_this_month = db.query(func.sum(AccountTransaction.amount)).filter(
-        and_(
-            AccountTransaction.transaction_type == 'purchase',
-            AccountTransaction.created_at >= start_of_month
-        )
-    ).scalar() or 0
-    
-    # This year's spending
-    start_of_year = datetime.now().replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    total_spent_this_year = db.query(func.sum(AccountTransaction.amount)).filter(
-        and_(
-            AccountTransaction.transaction_type == 'purchase',
-            AccountTransaction.created_at >= start_of_year
-        )
-    ).scalar() or 0
-    
     return {
-        "total_purchases": float(total_purchases),
+        "total_purchases": total_purchases,
         "total_transactions": total_transactions,
         "pending_orders": pending_orders,
-        "total_spent_this_month": float(total_spent_this_month),
-        "total_spent_this_year": float(total_spent_this_year),
+        "total_spent_this_month": total_spent_this_month,
+        "total_spent_this_year": total_spent_this_year,
         "currency": "USD"
     }
 
-def get_chemical_purchase_history(db: Session, chemical_id: int) -> dict:
-    """Get purchase history for a specific chemical"""
-    transactions = db.query(AccountTransaction).filter(
-        and_(
-            AccountTransaction.chemical_id == chemical_id,
-            AccountTransaction.transaction_type == 'purchase'
-        )
+def get_spend_trend(db: Session, months: int = 12, supplier: Optional[str] = None, currency: Optional[str] = None) -> List[dict]:
+    """Monthly purchase spend for the last `months` months (current month included), per currency"""
+    start = _months_before(datetime.now(timezone.utc).date().replace(day=1), months - 1)
+    query = db.query(
+        SpendRollup.period,
+        SpendRollup.currency,
+        func.sum(SpendRollup.total_amount),
+        func.sum(SpendRollup.transaction_count)
+    ).filter(
+        SpendRollup.transaction_type == 'purchase',
+        SpendRollup.period >= start
+    )
+    if supplier is not None:
+        query = query.filter(SpendRollup.supplier == supplier)
+    if currency:
+        query = query.filter(SpendRollup.currency == currency)
+    rows = query.group_by(SpendRollup.period, SpendRollup.currency).order_by(
+        SpendRollup.period, SpendRollup.currency
     ).all()
     
-    if not transactions:
-        return {
-            "chemical_id": chemical_id,
-            "total_purchased": 0,
-            "total_spent": 0,
-            "last_purchase_date": None,
-            "average_unit_price": 0,
-            "currency": "USD"
+    return [
+        {
+            "period": period,
+            "currency": row_currency,
+            "total_spent": float(amount or 0),
+            "transaction_count": int(count or 0)
         }
-    
-    total_purchased = sum(t.quantity for t in transactions)
-    total_spent = sum(t.amount for t in transactions)
-    last_purchase_date = max(t.created_at for t in transactions)
-    average_unit_price = total_spent / total_purchased if total_purchased > 0 else 0
-    
+        for period, row_currency, amount, count in rows
+    ]
+
+def _purchase_stats_query(db: Session):
+    return db.query(
+        ChemicalInventory.id,
+        ChemicalInventory.name,
+        ChemicalPurchaseStats.total_quantity,
+        ChemicalPurchaseStats.total_spent,
+        ChemicalPurchaseStats.purchase_count,
+        ChemicalPurchaseStats.last_purchase_date,
+        ChemicalPurchaseStats.average_unit_price
+    ).outerjoin(ChemicalPurchaseStats, ChemicalPurchaseStats.chemical_id == ChemicalInventory.id)
+
+def _purchase_stats_row(row) -> dict:
+    chemical_id, name, total_quantity, total_spent, purchase_count, last_purchase_date, average_unit_price = row
     return {
         "chemical_id": chemical_id,
-        "total_purchased": float(total_purchased),
-        "total_spent": float(total_spent),
+        "chemical_name": name,
+        "total_purchased": float(total_quantity or 0),
+        "total_spent": float(total_spent or 0),
+        "purchase_count": int(purchase_count or 0),
         "last_purchase_date": last_purchase_date,
-        "average_unit_price": float(average_unit_price),
+        "average_unit_price": float(average_unit_price or 0),
         "currency": "USD"
     }
 
+def get_chemical_purchase_history(db: Session, chemical_id: int) -> Optional[dict]:
+    """Get purchase history for a specific chemical (None if the chemical does not exist)"""
+    row = _purchase_stats_query(db).filter(ChemicalInventory.id == chemical_id).first()
+    return _purchase_stats_row(row) if row else None
+
+def get_chemicals_purchase_stats(db: Session, chemical_ids: Optional[List[int]] = None,
+                                 skip: int = 0, limit: int = 100) -> List[dict]:
+    """Purchase stats for many chemicals in one query.
+
+    With chemical_ids, every listed chemical that exists is returned (zeros when never purchased);
+    without, chemicals that have purchases, highest spend first.
+    """
+    query = _purchase_stats_query(db)
+    if chemical_ids:
+        query = query.filter(ChemicalInventory.id.in_(chemical_ids)).order_by(ChemicalInventory.id)
+    else:
+        query = query.filter(ChemicalPurchaseStats.purchase_count > 0).order_by(
+            ChemicalPurchaseStats.total_spent.desc(), ChemicalInventory.id
+        ).offset(skip).limit(limit)
+    return [_purchase_stats_row(row) for row in query.all()]
+
 def get_recent_transactions(db: Session, limit: int = 10) -> List[AccountTransaction]:
     """Get recent transactions"""
     return db.query(AccountTransaction).order_by(
@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.chemical_forecasts import ChemicalForecast
+from app.services.forecasting import FORECAST_HORIZON_DAYS
+from typing import List
+from datetime import datetime, timedelta, timezone
+
+def _stockout_date(today, days_of_stock):
+    """None when there is no usage or the stock-out is beyond the forecast horizon"""
+    if days_of_stock is None or days_of_stock > FORECAST_HORIZON_DAYS:
+        return None
+    return today + timedelta(days=int(days_of_stock))
+
+def get_chemical_forecasts(db: Session, below_reorder_point: bool = False, skip: int = 0, limit: int = 100) -> List[dict]:
+    """Stored forecasts with days of stock recomputed from the current quantity, soonest stock-out first"""
+    days_of_stock = case(
+        (ChemicalForecast.daily_usage > 0, ChemicalInventory.quantity / ChemicalForecast.daily_usage),
+        else_=None
+    )
+    query = db.query(
+        ChemicalInventory.id,
+        ChemicalInventory.name,
+        ChemicalInventory.unit,
+        ChemicalInventory.quantity,
+        ChemicalForecast.daily_usage,
+        ChemicalForecast.usage_stddev,
+        ChemicalForecast.lead_time_days,
+        ChemicalForecast.safety_stock,
+        ChemicalForecast.reorder_point,
+        days_of_stock.label("days_of_stock"),
+        ChemicalForecast.computed_through
+    ).join(ChemicalForecast, ChemicalForecast.chemical_id == ChemicalInventory.id)
+    if below_reorder_point:
+        query = query.filter(
+            ChemicalForecast.reorder_point > 0,
+            ChemicalInventory.quantity <= ChemicalForecast.reorder_point
+        )
+    rows = query.order_by(days_of_stock.asc().nulls_last(), ChemicalInventory.id).offset(skip).limit(limit).all()
+    
+    today = datetime.now(timezone.utc).date()
+    return [
+        {
+            "chemical_id": row.id,
+            "name": row.name,
+            "unit": row.unit,
+            "quantity": row.quantity,
+            "daily_usage": row.daily_usage,
+            "usage_stddev": row.usage_stddev,
+            "lead_time_days": row.lead_time_days,
+            "safety_stock": row.safety_stock,
+            "reorder_point": row.reorder_point,
+            "days_of_stock": row.days_of_stock,
+            "stockout_date": _stockout_date(today, row.days_of_stock),
+            "below_reorder_point": row.reorder_point > 0 and row.quantity <= row.reorder_point,
+            "computed_through": row.computed_through
+        }
+        for row in rows
+    ]
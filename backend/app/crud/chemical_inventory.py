@@ -1,15 +1,47 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import and_, case, or_, update, func, select
+from typing import Collection, List, Optional
 from app.models.chemical_inventory import ChemicalInventory
 from app.models.activity_log import ActivityLog
 from app.models.user import User, UserRole
-from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate, ChemicalInventoryAddNote
+from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate, ChemicalInventoryAddNote, ChemicalStockChange, ChemicalStockTransfer
+from app.crud.stock_movements import record_stock_movement
+from app.crud.notifications import evaluate_stock_alerts, detach_chemical_notifications
+from app.crud.rows import ChemicalRow, row_columns, materialize, as_dicts
+from app.services.fieldsets import load_only_columns
+from app.services.read_cache import queue_cache_invalidation, chemical_cache_keys, formulation_detail_cache
 from datetime import datetime
 
-def get_chemical_inventory(db: Session, skip: int = 0, limit: int = 100, user_role: UserRole = None) -> List[ChemicalInventory]:
-    """Get all chemical inventory items with role-based filtering"""
-    query = db.query(ChemicalInventory)
+# Roles allowed to change stock quantities
+QUANTITY_EDITOR_ROLES = [UserRole.ADMIN, UserRole.LAB_STAFF, UserRole.PRODUCT, UserRole.ACCOUNT]
+
+# include= expansions on the chemical list/detail endpoints, and how each is loaded.
+# Every expansion is a fixed number of queries however many chemicals are on the page
+CHEMICAL_INCLUDES = {
+    "formulations": lambda: selectinload(ChemicalInventory.formulation_details),
+    "updated_by_user": lambda: joinedload(ChemicalInventory.user),
+    "purchase_stats": lambda: joinedload(ChemicalInventory.purchase_stats),
+}
+
+def _include_options(include: Collection[str]) -> list:
+    return [CHEMICAL_INCLUDES[name]() for name in sorted(include)]
+
+class InsufficientStockError(ValueError):
+    """Raised when a consume would take the quantity below zero"""
+
+class VersionConflictError(ValueError):
+    """Raised when an If-Match version no longer matches the stored row"""
+
+def get_chemical_inventory(db: Session, skip: int = 0, limit: int = 100, user_role: UserRole = None,
+                           include: Collection[str] = (), fields: Optional[Collection[str]] = None) -> List[ChemicalInventory]:
+    """Get all chemical inventory items with role-based filtering, eager-loading the include= relations.
+
+    With fields, only those columns are selected; the rest stay deferred and must not be read.
+    """
+    query = db.query(ChemicalInventory).options(*_include_options(include))
+    if fields is not None:
+        query = query.options(load_only_columns(ChemicalInventory, fields))
     
     # Apply role-based filtering if specified
     if user_role == UserRole.ALL_USERS:
@@ -21,9 +53,46 @@ def get_chemical_inventory(db: Session, skip: int = 0, limit: int = 100, user_ro
     
     return query.offset(skip).limit(limit).all()
 
-def get_chemical_inventory_by_id(db: Session, chemical_id: int, user_role: UserRole = None) -> Optional[ChemicalInventory]:
+def get_chemical_rows(db: Session, skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None) -> list:
+    """ORM-free list read: ChemicalRow objects, or dicts of just `fields` (same rows as get_chemical_inventory)"""
+    if fields is None:
+        stmt = select(*row_columns(ChemicalInventory, ChemicalRow)).offset(skip).limit(limit)
+        return materialize(db.execute(stmt), ChemicalRow)
+    stmt = select(*(getattr(ChemicalInventory, name) for name in fields)).offset(skip).limit(limit)
+    return as_dicts(db.execute(stmt), fields)
+
+def get_chemical_inventory_by_status(db: Session, stock_status: str, skip: int = 0, limit: int = 100) -> List[ChemicalInventory]:
+    """Get chemicals in a given stock status (served by the partial stock-alert index)"""
+    return db.query(ChemicalInventory).filter(
+        ChemicalInventory.stock_status == stock_status
+    ).order_by(ChemicalInventory.quantity, ChemicalInventory.id).offset(skip).limit(limit).all()
+
+def get_low_stock_chemicals(db: Session, skip: int = 0, limit: int = 100) -> List[ChemicalInventory]:
+    """Get chemicals below their alert threshold but not depleted"""
+    return get_chemical_inventory_by_status(db, "low_stock", skip=skip, limit=limit)
+
+def get_out_of_stock_chemicals(db: Session, skip: int = 0, limit: int = 100) -> List[ChemicalInventory]:
+    """Get depleted chemicals"""
+    return get_chemical_inventory_by_status(db, "out_of_stock", skip=skip, limit=limit)
+
+def get_stock_status_counts(db: Session) -> dict:
+    """Count chemicals per stock status"""
+    rows = db.query(
+        ChemicalInventory.stock_status, func.count(ChemicalInventory.id)
+    ).group_by(ChemicalInventory.stock_status).all()
+    
+    counts = {"in_stock": 0, "low_stock": 0, "out_of_stock": 0}
+    for stock_status, count in rows:
+        counts[stock_status] = count
+    counts["total"] = sum(counts.values())
+    return counts
+
+def get_chemical_inventory_by_id(db: Session, chemical_id: int, user_role: UserRole = None,
+                                 include: Collection[str] = ()) -> Optional[ChemicalInventory]:
     """Get a specific chemical inventory item by ID"""
-    return db.query(ChemicalInventory).filter(ChemicalInventory.id == chemical_id).first()
+    return db.query(ChemicalInventory).options(*_include_options(include)).filter(
+        ChemicalInventory.id == chemical_id
+    ).first()
 
 def create_chemical_inventory(
     db: Session, 
@@ -42,6 +111,20 @@ def create_chemical_inventory(
         updated_by=user_uid
     )
     db.add(db_chemical)
+    db.flush()
+    
+    # Opening balance goes into the ledger in the same transaction
+    record_stock_movement(
+        db=db,
+        chemical_id=db_chemical.id,
+        movement_type="adjust",
+        quantity_delta=chemical.quantity,
+        balance_after=chemical.quantity,
+        user_uid=user_uid,
+        note="Opening balance"
+    )
+    db.flush()
+    evaluate_stock_alerts(db, [db_chemical])
     db.commit()
     db.refresh(db_chemical)
     
@@ -62,7 +145,8 @@ def update_chemical_inventory(
     chemical_id: int, 
     chemical_update: ChemicalInventoryUpdate, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    expected_version: Optional[int] = None
 ) -> Optional[ChemicalInventory]:
     """Update a chemical inventory item with role-based access control"""
     
@@ -70,13 +154,20 @@ def update_chemical_inventory(
     if not db_chemical:
         return None
     
+    # Optimistic concurrency check for If-Match requests
+    if expected_version is not None and db_chemical.version != expected_version:
+        raise VersionConflictError(
+            f"Chemical inventory item was modified (current version {db_chemical.version})"
+        )
+    
     # Get old values for logging
     old_values = {
         "name": db_chemical.name,
         "quantity": db_chemical.quantity,
         "unit": db_chemical.unit,
         "formulation": db_chemical.formulation,
-        "notes": db_chemical.notes
+        "notes": db_chemical.notes,
+        "alert_threshold": db_chemical.alert_threshold
     }
     
     # Apply role-based update restrictions
@@ -86,8 +177,8 @@ def update_chemical_inventory(
         # Admin can update everything
         pass
     elif user_role in [UserRole.LAB_STAFF, UserRole.PRODUCT]:
-        # Lab Staff and Product can update: quantity, formulation, notes
-        allowed_fields = {"quantity", "formulation", "notes"}
+        # Lab Staff and Product can update: quantity, formulation, notes, alert threshold
+        allowed_fields = {"quantity", "formulation", "notes", "alert_threshold"}
         update_data = {k: v for k, v in update_data.items() if k in allowed_fields}
     elif user_role == UserRole.ACCOUNT:
         # Account can only update amounts (quantity) and notes
@@ -104,7 +195,27 @@ def update_chemical_inventory(
         setattr(db_chemical, field, value)
     
     db_chemical.updated_by = user_uid
-    db.commit()
+    queue_cache_invalidation(db, chemical_cache_keys(chemical_id))
+    try:
+        # Absolute quantity edits are recorded as adjustments in the same transaction
+        if "quantity" in update_data and update_data["quantity"] != old_values["quantity"]:
+            record_stock_movement(
+                db=db,
+                chemical_id=chemical_id,
+                movement_type="adjust",
+                quantity_delta=update_data["quantity"] - old_values["quantity"],
+                balance_after=update_data["quantity"],
+                user_uid=user_uid
+            )
+        # Re-evaluate stock alerts in the same transaction as the change (counted units are never low stock)
+        if update_data.keys() & {"quantity", "alert_threshold", "unit"}:
+            db.flush()
+            evaluate_stock_alerts(db, [db_chemical])
+        db.commit()
+    except StaleDataError:
+        # Another writer committed between our read and this update
+        db.rollback()
+        raise VersionConflictError("Chemical inventory item was modified concurrently")
     db.refresh(db_chemical)
     
     # Log changes
@@ -124,6 +235,169 @@ def update_chemical_inventory(
     
     return db_chemical
 
+def _apply_stock_delta(
+    db: Session,
+    chemical_id: int,
+    delta: float,
+    user_uid: str,
+    user_role: UserRole,
+    movement_type: str,
+    note: Optional[str] = None,
+    counterparty_chemical_id: Optional[int] = None
+) -> Optional[ChemicalInventory]:
+    """Atomically add delta to the stored quantity in a single UPDATE ... RETURNING"""
+    
+    if user_role not in QUANTITY_EDITOR_ROLES:
+        raise PermissionError("Insufficient permissions to change chemical stock")
+    
+    stmt = (
+        update(ChemicalInventory)
+        .where(ChemicalInventory.id == chemical_id)
+        .values(
+            quantity=ChemicalInventory.quantity + delta,
+            version=ChemicalInventory.version + 1,
+            movement_count=ChemicalInventory.movement_count + 1,
+            updated_by=user_uid,
+            last_updated=func.now()
+        )
+        .returning(ChemicalInventory)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    if delta < 0:
+        # Guard in the same statement so concurrent consumers can never overdraw
+        stmt = stmt.where(ChemicalInventory.quantity >= -delta)
+    
+    db_chemical = db.scalars(stmt).first()
+    if db_chemical:
+        queue_cache_invalidation(db, chemical_cache_keys(chemical_id))
+        record_stock_movement(
+            db=db,
+            chemical_id=chemical_id,
+            movement_type=movement_type,
+            quantity_delta=delta,
+            balance_after=db_chemical.quantity,
+            user_uid=user_uid,
+            note=note,
+            counterparty_chemical_id=counterparty_chemical_id,
+            movement_count=db_chemical.movement_count
+        )
+        evaluate_stock_alerts(db, [db_chemical])
+        return db_chemical
+    
+    db.rollback()
+    exists = db.query(ChemicalInventory.id).filter(ChemicalInventory.id == chemical_id).first()
+    if not exists:
+        return None
+    raise InsufficientStockError("Insufficient stock for this consumption")
+
+def consume_chemical_inventory(
+    db: Session,
+    chemical_id: int,
+    stock_change: ChemicalStockChange,
+    user_uid: str,
+    user_role: UserRole
+) -> Optional[ChemicalInventory]:
+    """Consume stock without a read-modify-write race"""
+    
+    db_chemical = _apply_stock_delta(
+        db, chemical_id, -stock_change.amount, user_uid, user_role, "consume", stock_change.note
+    )
+    if not db_chemical:
+        return None
+    
+    # Log the consumption (commits together with the quantity update)
+    log_activity(
+        db=db,
+        user_uid=user_uid,
+        action="consume_chemical_inventory",
+        table_modified="chemical_inventory",
+        field_modified="quantity",
+        description=f"Consumed {stock_change.amount} {db_chemical.unit} of chemical: {db_chemical.name}"
+                    + (f" ({stock_change.note})" if stock_change.note else ""),
+        old_value=str(db_chemical.quantity + stock_change.amount),
+        new_value=str(db_chemical.quantity)
+    )
+    
+    return db_chemical
+
+def receive_chemical_inventory(
+    db: Session,
+    chemical_id: int,
+    stock_change: ChemicalStockChange,
+    user_uid: str,
+    user_role: UserRole
+) -> Optional[ChemicalInventory]:
+    """Receive stock without a read-modify-write race"""
+    
+    db_chemical = _apply_stock_delta(
+        db, chemical_id, stock_change.amount, user_uid, user_role, "receive", stock_change.note
+    )
+    if not db_chemical:
+        return None
+    
+    # Log the receipt (commits together with the quantity update)
+    log_activity(
+        db=db,
+        user_uid=user_uid,
+        action="receive_chemical_inventory",
+        table_modified="chemical_inventory",
+        field_modified="quantity",
+        description=f"Received {stock_change.amount} {db_chemical.unit} of chemical: {db_chemical.name}"
+                    + (f" ({stock_change.note})" if stock_change.note else ""),
+        old_value=str(db_chemical.quantity - stock_change.amount),
+        new_value=str(db_chemical.quantity)
+    )
+    
+    return db_chemical
+
+def transfer_chemical_inventory(
+    db: Session,
+    chemical_id: int,
+    transfer: ChemicalStockTransfer,
+    user_uid: str,
+    user_role: UserRole
+) -> Optional[ChemicalInventory]:
+    """Move stock from one chemical item to another in one transaction"""
+    
+    if transfer.target_chemical_id == chemical_id:
+        raise ValueError("Cannot transfer stock to the same chemical")
+    
+    # Lock rows in id order so opposite transfers cannot deadlock
+    deltas = {chemical_id: -transfer.amount, transfer.target_chemical_id: transfer.amount}
+    updated = {}
+    for target_id in sorted(deltas):
+        counterparty_id = transfer.target_chemical_id if target_id == chemical_id else chemical_id
+        db_chemical = _apply_stock_delta(
+            db, target_id, deltas[target_id], user_uid, user_role, "transfer",
+            transfer.note, counterparty_id
+        )
+        if not db_chemical:
+            db.rollback()
+            if target_id == chemical_id:
+                return None
+            raise ValueError("Target chemical inventory item not found")
+        updated[target_id] = db_chemical
+    
+    source = updated[chemical_id]
+    target = updated[transfer.target_chemical_id]
+    if source.unit != target.unit:
+        db.rollback()
+        raise ValueError(f"Unit mismatch: cannot transfer {source.unit} into {target.unit}")
+    
+    # Log the transfer (commits together with both quantity updates)
+    log_activity(
+        db=db,
+        user_uid=user_uid,
+        action="transfer_chemical_inventory",
+        table_modified="chemical_inventory",
+        field_modified="quantity",
+        description=f"Transferred {transfer.amount} {source.unit} from {source.name} to {target.name}",
+        old_value=str(source.quantity + transfer.amount),
+        new_value=str(source.quantity)
+    )
+    
+    return source
+
 def add_note_to_chemical_inventory(
     db: Session, 
     chemical_id: int, 
@@ -133,24 +407,31 @@ def add_note_to_chemical_inventory(
 ) -> Optional[ChemicalInventory]:
     """Add a note to a chemical inventory item (append-only)"""
     
-    db_chemical = get_chemical_inventory_by_id(db, chemical_id)
-    if not db_chemical:
-        return None
-    
     # All users can add notes
-    current_notes = db_chemical.notes or ""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     new_note = f"[{timestamp}] {note_data.note}"
     
-    if current_notes:
-        updated_notes = f"{current_notes}\n{new_note}"
-    else:
-        updated_notes = new_note
-    
-    db_chemical.notes = updated_notes
-    db_chemical.updated_by = user_uid
+    # Appended in one UPDATE ... RETURNING (like stock changes), so a concurrent
+    # consume/receive bumping the version can never make the note's write stale
+    notes = ChemicalInventory.notes
+    stmt = (
+        update(ChemicalInventory)
+        .where(ChemicalInventory.id == chemical_id)
+        .values(
+            notes=case((or_(notes.is_(None), notes == ""), new_note), else_=notes + "\n" + new_note),
+            version=ChemicalInventory.version + 1,
+            updated_by=user_uid,
+            last_updated=func.now()
+        )
+        .returning(ChemicalInventory)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_chemical = db.scalars(stmt).first()
+    if not db_chemical:
+        db.rollback()
+        return None
+    queue_cache_invalidation(db, chemical_cache_keys(chemical_id))
     db.commit()
-    db.refresh(db_chemical)
     
     # Log the note addition
     log_activity(
@@ -193,8 +474,20 @@ def delete_chemical_inventory(
         old_value=f"ID: {chemical_id}, Name: {chemical_name}"
     )
     
+    # Keep notification history but detach and close it
+    detach_chemical_notifications(db, chemical_id)
+    
+    queue_cache_invalidation(db, chemical_cache_keys(chemical_id))
+    queue_cache_invalidation(db, [
+        (formulation_detail_cache, str(formulation.id)) for formulation in db_chemical.formulation_details
+    ])
     db.delete(db_chemical)
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        # A stock change committed between our read and the delete
+        db.rollback()
+        raise VersionConflictError("Chemical inventory item was modified concurrently")
     
     return True
 
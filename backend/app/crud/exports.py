@@ -0,0 +1,95 @@
+from sqlalchemy import select, Select
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem
+from app.models.activity_log import ActivityLog
+from app.models.user import User
+from typing import Optional
+from datetime import datetime
+
+# Export statements: flat Core selects in id order (stable across runs). Column labels become
+# the CSV header / NDJSON keys. Time windows are [start, end), like the list endpoints
+
+def chemical_export(stock_status: Optional[str] = None, name: Optional[str] = None,
+                    updated_since: Optional[datetime] = None) -> Select:
+    stmt = select(ChemicalInventory.__table__)
+    if stock_status:
+        stmt = stmt.where(ChemicalInventory.stock_status == stock_status)
+    if name:
+        stmt = stmt.where(ChemicalInventory.name.ilike(f"%{name}%"))
+    if updated_since:
+        stmt = stmt.where(ChemicalInventory.last_updated >= updated_since)
+    return stmt.order_by(ChemicalInventory.id)
+
+def transaction_export(chemical_id: Optional[int] = None, transaction_type: Optional[str] = None,
+                       status: Optional[str] = None, supplier: Optional[str] = None,
+                       start: Optional[datetime] = None, end: Optional[datetime] = None) -> Select:
+    stmt = select(AccountTransaction.__table__)
+    if chemical_id:
+        stmt = stmt.where(AccountTransaction.chemical_id == chemical_id)
+    if transaction_type:
+        stmt = stmt.where(AccountTransaction.transaction_type == transaction_type)
+    if status:
+        stmt = stmt.where(AccountTransaction.status == status)
+    if supplier:
+        stmt = stmt.where(AccountTransaction.supplier == supplier)
+    if start:
+        stmt = stmt.where(AccountTransaction.created_at >= start)
+    if end:
+        stmt = stmt.where(AccountTransaction.created_at < end)
+    return stmt.order_by(AccountTransaction.id)
+
+def purchase_order_export(status: Optional[str] = None, supplier: Optional[str] = None,
+                          start: Optional[datetime] = None, end: Optional[datetime] = None) -> Select:
+    """One row per order item, with the order's columns repeated (orders without items get one row)"""
+    stmt = select(
+        PurchaseOrder.id,
+        PurchaseOrder.order_number,
+        PurchaseOrder.supplier,
+        PurchaseOrder.status,
+        PurchaseOrder.currency,
+        PurchaseOrder.total_amount,
+        PurchaseOrder.order_date,
+        PurchaseOrder.expected_delivery,
+        PurchaseOrder.created_by,
+        PurchaseOrder.approved_by,
+        PurchaseOrderItem.id.label("item_id"),
+        PurchaseOrderItem.chemical_id.label("item_chemical_id"),
+        PurchaseOrderItem.quantity.label("item_quantity"),
+        PurchaseOrderItem.unit.label("item_unit"),
+        PurchaseOrderItem.unit_price.label("item_unit_price"),
+        PurchaseOrderItem.total_price.label("item_total_price"),
+    ).outerjoin(PurchaseOrderItem, PurchaseOrderItem.purchase_order_id == PurchaseOrder.id)
+    if status:
+        stmt = stmt.where(PurchaseOrder.status == status)
+    if supplier:
+        stmt = stmt.where(PurchaseOrder.supplier == supplier)
+    if start:
+        stmt = stmt.where(PurchaseOrder.order_date >= start)
+    if end:
+        stmt = stmt.where(PurchaseOrder.order_date < end)
+    return stmt.order_by(PurchaseOrder.id, PurchaseOrderItem.id)
+
+def activity_log_export(user_id: Optional[int] = None, action: Optional[str] = None,
+                        start: Optional[datetime] = None, end: Optional[datetime] = None) -> Select:
+    stmt = select(
+        ActivityLog.id,
+        ActivityLog.timestamp,
+        ActivityLog.user_id,
+        User.email.label("user_email"),
+        ActivityLog.action,
+        ActivityLog.description,
+        ActivityLog.table_modified,
+        ActivityLog.field_modified,
+        ActivityLog.old_value,
+        ActivityLog.new_value,
+        ActivityLog.note,
+    ).outerjoin(User, User.id == ActivityLog.user_id)
+    if user_id:
+        stmt = stmt.where(ActivityLog.user_id == user_id)
+    if action:
+        stmt = stmt.where(ActivityLog.action == action)
+    if start:
+        stmt = stmt.where(ActivityLog.timestamp >= start)
+    if end:
+        stmt = stmt.where(ActivityLog.timestamp < end)
+    return stmt.order_by(ActivityLog.id)
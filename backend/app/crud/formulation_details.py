@@ -1,22 +1,40 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from sqlalchemy import and_, select
+from typing import Collection, List, Optional
 from app.models.formulation_details import FormulationDetails
 from app.models.chemical_inventory import ChemicalInventory
 from app.models.activity_log import ActivityLog
 from app.models.user import User, UserRole
 from app.schema.formulation_details import FormulationDetailsCreate, FormulationDetailsUpdate, FormulationDetailsAddNote
+from app.crud.rows import FormulationRow, row_columns, materialize, as_dicts
+from app.services.fieldsets import load_only_columns
+from app.services.read_cache import queue_cache_invalidation, chemical_cache_keys, formulation_cache_keys
 from datetime import datetime
 
-def get_formulation_details(db: Session, skip: int = 0, limit: int = 100, chemical_id: int = None) -> List[FormulationDetails]:
-    """Get all formulation details with optional chemical filtering"""
+def get_formulation_details(db: Session, skip: int = 0, limit: int = 100, chemical_id: int = None,
+                            fields: Optional[Collection[str]] = None) -> List[FormulationDetails]:
+    """Get all formulation details with optional chemical filtering (only the given columns when fields is set)"""
     query = db.query(FormulationDetails)
+    if fields is not None:
+        query = query.options(load_only_columns(FormulationDetails, fields))
     
     if chemical_id:
         query = query.filter(FormulationDetails.chemical_id == chemical_id)
     
     return query.offset(skip).limit(limit).all()
 
+def get_formulation_rows(db: Session, skip: int = 0, limit: int = 100, chemical_id: int = None,
+                         fields: Optional[List[str]] = None) -> list:
+    """ORM-free list read: FormulationRow objects, or dicts of just `fields` (same rows as get_formulation_details)"""
+    columns = row_columns(FormulationDetails, FormulationRow) if fields is None else [
+        getattr(FormulationDetails, name) for name in fields
+    ]
+    stmt = select(*columns)
+    if chemical_id:
+        stmt = stmt.where(FormulationDetails.chemical_id == chemical_id)
+    result = db.execute(stmt.offset(skip).limit(limit))
+    return materialize(result, FormulationRow) if fields is None else as_dicts(result, fields)
+
 def get_formulation_details_by_id(db: Session, formulation_id: int) -> Optional[FormulationDetails]:
     """Get a specific formulation detail by ID"""
     return db.query(FormulationDetails).filter(FormulationDetails.id == formulation_id).first()
@@ -47,6 +65,8 @@ def create_formulation_details(
         updated_by=user_uid
     )
     db.add(db_formulation)
+    # The chemical detail embeds its formulation list
+    queue_cache_invalidation(db, chemical_cache_keys(formulation.chemical_id))
     db.commit()
     db.refresh(db_formulation)
     
@@ -110,6 +130,7 @@ def update_formulation_details(
         setattr(db_formulation, field, value)
     
     db_formulation.updated_by = user_uid
+    queue_cache_invalidation(db, formulation_cache_keys(formulation_id, db_formulation.chemical_id))
     db.commit()
     db.refresh(db_formulation)
     
@@ -155,6 +176,7 @@ def add_note_to_formulation_details(
     
     db_formulation.notes = updated_notes
     db_formulation.updated_by = user_uid
+    queue_cache_invalidation(db, formulation_cache_keys(formulation_id, db_formulation.chemical_id))
     db.commit()
     db.refresh(db_formulation)
     
@@ -199,6 +221,7 @@ def delete_formulation_details(
         old_value=f"ID: {formulation_id}, Component: {component_name}"
     )
     
+    queue_cache_invalidation(db, formulation_cache_keys(formulation_id, db_formulation.chemical_id))
     db.delete(db_formulation)
     db.commit()
     
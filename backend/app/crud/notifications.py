@@ -1,71 +1,537 @@
-from sqlalchemy.orm import Session
-from app.models.notifications import Notification
-from app.schema.notifications import NotificationCreate, NotificationUpdate
-from typing import List, Optional
-import json
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, or_, func, exists, update, insert, select, literal, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.notifications import Notification, NotificationRecipient, NotificationReadMark, NotificationReceipt
+from app.schema.notifications import NotificationCreate, NotificationUpdate, NotificationBulkAction
+from app.crud.rows import NotificationRow, row_columns, materialize
+from app.services.notification_broker import queue_notification_event
+from typing import List, Optional, Tuple
+
+# Stock alert types maintained by the server (one active row per chemical)
+STOCK_ALERT_SEVERITY = {"low_stock": "warning", "out_of_stock": "critical"}
+STOCK_ALERT_RECIPIENTS = ["admin", "product"]
+
+# Compaction: how long closed notifications are kept, and how many each role keeps
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 90))
+NOTIFICATION_ROLE_CAP = int(os.getenv("NOTIFICATION_ROLE_CAP", 1000))
+
+# Must match the predicate of uq_notifications_active_stock_alert
+ACTIVE_STOCK_ALERT_WHERE = and_(
+    Notification.resolved_at.is_(None),
+    Notification.type.in_(list(STOCK_ALERT_SEVERITY))
+)
+
+def _role_value(user_role) -> str:
+    """Accept either a UserRole or its string value"""
+    return getattr(user_role, "value", user_role)
+
+def _filter_by_role(query, user_role):
+    """Restrict a notification query to one recipient role (index lookup on notification_recipients)"""
+    if not user_role:
+        return query
+    return query.join(
+        NotificationRecipient, NotificationRecipient.notification_id == Notification.id
+    ).filter(NotificationRecipient.role == _role_value(user_role))
+
+# Columns sent to stream subscribers (per-user read state is not part of the event)
+EVENT_COLUMNS = (
+    Notification.id, Notification.type, Notification.severity, Notification.message,
+    Notification.chemical_id, Notification.user_id, Notification.timestamp, Notification.resolved_at
+)
+
+def _event_data(row, recipients: List[str]) -> dict:
+    data = {column.key: getattr(row, column.key) for column in EVENT_COLUMNS}
+    data["recipients"] = list(recipients)
+    return data
+
+def _recipients_by_notification(db: Session, notification_ids: List[int]) -> dict:
+    recipients = {notification_id: [] for notification_id in notification_ids}
+    if notification_ids:
+        for notification_id, role in db.query(NotificationRecipient.notification_id, NotificationRecipient.role).filter(
+            NotificationRecipient.notification_id.in_(notification_ids)
+        ):
+            recipients[notification_id].append(role)
+    return recipients
+
+def _queue_events(db: Session, event_type: str, rows) -> None:
+    """Publish one stream event per returned notification row after commit"""
+    rows = list(rows)
+    recipients = _recipients_by_notification(db, [row.id for row in rows])
+    for row in rows:
+        queue_notification_event(db, event_type, recipients[row.id], _event_data(row, recipients[row.id]))
 
 def create_notification(db: Session, notification: NotificationCreate, user_id: Optional[str] = None) -> Notification:
+    """Create one notification row fanned out to its recipient roles on read"""
     db_notification = Notification(
         type=notification.type,
         severity=notification.severity,
         message=notification.message,
         chemical_id=notification.chemical_id,
         user_id=user_id,
-        recipients=json.dumps(notification.recipients) if notification.recipients else None
+        recipient_roles=[
+            NotificationRecipient(role=_role_value(role))
+            for role in dict.fromkeys(notification.recipients or [])
+        ]
     )
     db.add(db_notification)
+    db.flush()
+    queue_notification_event(
+        db, "notification", db_notification.recipients, _event_data(db_notification, db_notification.recipients)
+    )
     db.commit()
     db.refresh(db_notification)
     return db_notification
 
-def get_notifications(db: Session, skip: int = 0, limit: int = 100, user_role: Optional[str] = None) -> List[Notification]:
-    query = db.query(Notification)
+def create_notifications(db: Session, notifications: List[NotificationCreate], user_id: Optional[str] = None) -> List[int]:
+    """Create many notifications with one INSERT for the rows and one for all their recipients"""
+    if not notifications:
+        return []
     
-    # Filter by user role if specified
-    if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+    rows = [
+        {
+            "type": notification.type,
+            "severity": notification.severity,
+            "message": notification.message,
+            "chemical_id": notification.chemical_id,
+            "user_id": user_id
+        }
+        for notification in notifications
+    ]
+    created = db.execute(insert(Notification).returning(*EVENT_COLUMNS, sort_by_parameter_order=True), rows).all()
     
-    return query.offset(skip).limit(limit).all()
+    recipients = {
+        row.id: [_role_value(role) for role in dict.fromkeys(notification.recipients or [])]
+        for row, notification in zip(created, notifications)
+    }
+    recipient_rows = [
+        {"notification_id": notification_id, "role": role}
+        for notification_id, roles in recipients.items()
+        for role in roles
+    ]
+    if recipient_rows:
+        db.execute(insert(NotificationRecipient), recipient_rows)
+    for row in created:
+        queue_notification_event(db, "notification", recipients[row.id], _event_data(row, recipients[row.id]))
+    db.commit()
+    return [row.id for row in created]
 
-def get_notification(db: Session, notification_id: int) -> Optional[Notification]:
-    return db.query(Notification).filter(Notification.id == notification_id).first()
+def get_read_watermark(db: Session, user_uid: str) -> int:
+    """Highest notification id the user has read everything up to"""
+    return db.query(NotificationReadMark.last_read_id).filter(
+        NotificationReadMark.user_uid == user_uid
+    ).scalar() or 0
 
-def update_notification(db: Session, notification_id: int, notification_update: NotificationUpdate) -> Optional[Notification]:
-    db_notification = get_notification(db, notification_id)
-    if db_notification:
-        update_data = notification_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_notification, field, value)
-        db.commit()
-        db.refresh(db_notification)
-    return db_notification
+def _has_receipt(user_uid: str, column):
+    """EXISTS check for a receipt of this user with the given timestamp column set"""
+    return exists().where(
+        NotificationReceipt.user_uid == user_uid,
+        NotificationReceipt.notification_id == Notification.id,
+        column.isnot(None)
+    )
+
+def _annotate_user_state(db: Session, notifications: List[Notification], user_uid: Optional[str]) -> List[Notification]:
+    """Fill in is_read / is_dismissed for one user from the watermark and sparse receipts"""
+    if not user_uid or not notifications:
+        return notifications
+    
+    watermark = get_read_watermark(db, user_uid)
+    receipts = {
+        receipt.notification_id: receipt
+        for receipt in db.query(NotificationReceipt).filter(
+            NotificationReceipt.user_uid == user_uid,
+            NotificationReceipt.notification_id.in_([n.id for n in notifications])
+        )
+    }
+    for notification in notifications:
+        receipt = receipts.get(notification.id)
+        notification.is_read = notification.id <= watermark or bool(receipt and receipt.read_at)
+        notification.is_dismissed = bool(receipt and receipt.dismissed_at)
+    return notifications
+
+def get_notifications(db: Session, skip: int = 0, limit: int = 100, user_role: Optional[str] = None, user_uid: Optional[str] = None) -> List[Notification]:
+    query = _filter_by_role(db.query(Notification), user_role)
+    
+    notifications = query.order_by(Notification.id.desc()).offset(skip).limit(limit).all()
+    return _annotate_user_state(db, notifications, user_uid)
+
+def get_notification(db: Session, notification_id: int, user_uid: Optional[str] = None) -> Optional[Notification]:
+    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    if notification:
+        _annotate_user_state(db, [notification], user_uid)
+    return notification
+
+def _upsert_receipt(db: Session, user_uid: str, notification_id: int, **timestamps) -> None:
+    """Set receipt timestamps for one user and notification, keeping the earliest (no commit)"""
+    stmt = pg_insert(NotificationReceipt).values(
+        user_uid=user_uid, notification_id=notification_id, **timestamps
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationReceipt.user_uid, NotificationReceipt.notification_id],
+        set_={
+            column: func.coalesce(getattr(NotificationReceipt, column), stmt.excluded[column])
+            for column in timestamps
+        }
+    )
+    db.execute(stmt)
+
+def update_notification(db: Session, notification_id: int, notification_update: NotificationUpdate, user_uid: str) -> Optional[Notification]:
+    """Change the requesting user's read/dismissed state for a notification"""
+    db_notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    if not db_notification:
+        return None
+    
+    update_data = notification_update.dict(exclude_unset=True)
+    timestamps = {}
+    cleared = {}
+    if update_data.get("is_dismissed") is True:
+        # Dismissing also counts as reading
+        timestamps.update(read_at=func.now(), dismissed_at=func.now())
+    elif update_data.get("is_dismissed") is False:
+        cleared["dismissed_at"] = None
+    if update_data.get("is_read") is True:
+        if notification_id > get_read_watermark(db, user_uid):
+            timestamps["read_at"] = func.now()
+    elif update_data.get("is_read") is False:
+        # Reads at or below the watermark are implied and cannot be undone individually
+        cleared["read_at"] = None
+    
+    if timestamps:
+        _upsert_receipt(db, user_uid, notification_id, **timestamps)
+    if cleared:
+        db.query(NotificationReceipt).filter(
+            NotificationReceipt.user_uid == user_uid,
+            NotificationReceipt.notification_id == notification_id
+        ).update(cleared, synchronize_session=False)
+    db.commit()
+    
+    return get_notification(db, notification_id, user_uid)
 
 def delete_notification(db: Session, notification_id: int) -> bool:
-    db_notification = get_notification(db, notification_id)
+    db_notification = db.query(Notification).filter(Notification.id == notification_id).first()
     if db_notification:
+        queue_notification_event(db, "deleted", db_notification.recipients, {"id": notification_id})
         db.delete(db_notification)
         db.commit()
         return True
     return False
 
-def dismiss_notification(db: Session, notification_id: int) -> Optional[Notification]:
-    return update_notification(db, notification_id, NotificationUpdate(is_dismissed=True))
+def dismiss_notification(db: Session, notification_id: int, user_uid: str) -> Optional[Notification]:
+    return update_notification(db, notification_id, NotificationUpdate(is_dismissed=True), user_uid)
 
-def mark_notification_read(db: Session, notification_id: int) -> Optional[Notification]:
-    return update_notification(db, notification_id, NotificationUpdate(is_read=True))
+def mark_notification_read(db: Session, notification_id: int, user_uid: str) -> Optional[Notification]:
+    return update_notification(db, notification_id, NotificationUpdate(is_read=True), user_uid)
 
-def get_unread_notifications(db: Session, user_role: Optional[str] = None) -> List[Notification]:
-    query = db.query(Notification).filter(Notification.is_read == False)
+def mark_all_notifications_read(db: Session, user_uid: str, user_role) -> int:
+    """Advance the user's watermark to the newest notification for their role (one row upsert)"""
+    newest_id = db.query(func.max(NotificationRecipient.notification_id)).filter(
+        NotificationRecipient.role == _role_value(user_role)
+    ).scalar_subquery()
     
-    if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+    stmt = pg_insert(NotificationReadMark).values(
+        user_uid=user_uid, last_read_id=func.coalesce(newest_id, 0)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationReadMark.user_uid],
+        set_={
+            "last_read_id": func.greatest(NotificationReadMark.last_read_id, stmt.excluded.last_read_id),
+            "updated_at": func.now()
+        }
+    ).returning(NotificationReadMark.last_read_id)
+    last_read_id = db.execute(stmt).scalar()
+    db.commit()
+    return last_read_id
+
+def _bulk_target_select(action: NotificationBulkAction, user_role, *columns, min_id: int = 0):
+    """SELECT over the notifications a bulk action applies to, limited to the user's role"""
+    stmt = select(*columns).select_from(Notification).join(
+        NotificationRecipient, NotificationRecipient.notification_id == Notification.id
+    ).where(NotificationRecipient.role == _role_value(user_role))
     
-    return query.all()
+    if action.ids is not None:
+        stmt = stmt.where(Notification.id.in_(action.ids))
+    if action.type is not None:
+        stmt = stmt.where(Notification.type == action.type)
+    if action.chemical_id is not None:
+        stmt = stmt.where(Notification.chemical_id == action.chemical_id)
+    if action.before is not None:
+        stmt = stmt.where(Notification.timestamp < action.before)
+    if min_id:
+        stmt = stmt.where(Notification.id > min_id)
+    return stmt
 
-def get_active_notifications(db: Session, user_role: Optional[str] = None) -> List[Notification]:
-    query = db.query(Notification).filter(Notification.is_dismissed == False)
+def bulk_update_receipts(db: Session, action: NotificationBulkAction, user_uid: str, user_role, dismiss: bool = False) -> int:
+    """Mark matching notifications read (or dismissed) for one user with a single INSERT ... SELECT upsert"""
+    columns = ["read_at", "dismissed_at"] if dismiss else ["read_at"]
+    # Reads at or below the watermark are already implied
+    min_id = 0 if dismiss else get_read_watermark(db, user_uid)
+    targets = _bulk_target_select(
+        action, user_role, literal(user_uid), Notification.id, *[func.now() for _ in columns], min_id=min_id
+    )
     
-    if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+    stmt = pg_insert(NotificationReceipt).from_select(["user_uid", "notification_id", *columns], targets)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationReceipt.user_uid, NotificationReceipt.notification_id],
+        set_={
+            column: func.coalesce(getattr(NotificationReceipt, column), stmt.excluded[column])
+            for column in columns
+        }
+    )
+    updated = db.execute(stmt).rowcount
+    db.commit()
+    return updated
+
+def count_unread_notifications(db: Session, user_role, user_uid: str) -> int:
+    """Unread count from the role index range above the watermark, minus out-of-order reads"""
+    return db.query(func.count(NotificationRecipient.notification_id)).filter(
+        NotificationRecipient.role == _role_value(user_role),
+        NotificationRecipient.notification_id > get_read_watermark(db, user_uid),
+        ~exists().where(
+            NotificationReceipt.user_uid == user_uid,
+            NotificationReceipt.notification_id == NotificationRecipient.notification_id,
+            NotificationReceipt.read_at.isnot(None)
+        )
+    ).scalar()
+
+def _page(query, skip: int, limit: int, since: Optional[datetime]):
+    """Newest first, bounded, optionally only notifications newer than `since`"""
+    if since is not None:
+        query = query.filter(Notification.timestamp > since)
+    return query.order_by(Notification.id.desc()).offset(skip).limit(limit).all()
+
+def get_unread_notifications(db: Session, user_role: Optional[str] = None, user_uid: Optional[str] = None, skip: int = 0, limit: int = 100, since: Optional[datetime] = None) -> List[Notification]:
+    query = _filter_by_role(db.query(Notification), user_role)
+    
+    if user_uid:
+        query = query.filter(
+            Notification.id > get_read_watermark(db, user_uid),
+            ~_has_receipt(user_uid, NotificationReceipt.read_at)
+        )
+    
+    return _annotate_user_state(db, _page(query, skip, limit, since), user_uid)
+
+def get_active_notifications(db: Session, user_role: Optional[str] = None, user_uid: Optional[str] = None, skip: int = 0, limit: int = 100, since: Optional[datetime] = None) -> List[Notification]:
+    query = _filter_by_role(db.query(Notification), user_role).filter(
+        Notification.resolved_at.is_(None)
+    )
+    
+    if user_uid:
+        query = query.filter(~_has_receipt(user_uid, NotificationReceipt.dismissed_at))
+    
+    return _annotate_user_state(db, _page(query, skip, limit, since), user_uid)
+
+# Columns of the ORM-free read path; the per-user state and recipients are filled in separately
+NOTIFICATION_ROW_COLUMNS = row_columns(Notification, NotificationRow, exclude=("is_read", "is_dismissed", "recipients"))
+
+def get_notification_rows(db: Session, user_role: Optional[str] = None, user_uid: Optional[str] = None, skip: int = 0,
+                          limit: int = 100, since: Optional[datetime] = None, unread: bool = False,
+                          active: bool = False) -> List[NotificationRow]:
+    """ORM-free list read (same rows as get_notifications / get_unread_notifications / get_active_notifications).
+
+    is_read / is_dismissed are computed in the SELECT; recipients come from one extra query.
+    """
+    if user_uid:
+        watermark = get_read_watermark(db, user_uid)
+        read_receipt = _has_receipt(user_uid, NotificationReceipt.read_at)
+        dismissed = _has_receipt(user_uid, NotificationReceipt.dismissed_at)
+        is_read, is_dismissed = or_(Notification.id <= watermark, read_receipt), dismissed
+    else:
+        is_read = is_dismissed = literal(False)
+    
+    stmt = _filter_by_role(select(*NOTIFICATION_ROW_COLUMNS, is_read.label("is_read"), is_dismissed.label("is_dismissed")), user_role)
+    if unread and user_uid:
+        stmt = stmt.where(Notification.id > watermark, ~read_receipt)
+    if active:
+        stmt = stmt.where(Notification.resolved_at.is_(None))
+        if user_uid:
+            stmt = stmt.where(~dismissed)
+    if since is not None:
+        stmt = stmt.where(Notification.timestamp > since)
     
-    return query.all() 
\ No newline at end of file
+    rows = materialize(db.execute(stmt.order_by(Notification.id.desc()).offset(skip).limit(limit)), NotificationRow)
+    recipients = _recipients_by_notification(db, [row.id for row in rows])
+    for row in rows:
+        row.recipients = sorted(recipients[row.id])
+    return rows
+
+def get_active_stock_alert(db: Session, alert_type: str, chemical_id: int) -> Optional[Notification]:
+    return db.query(Notification).filter(
+        ACTIVE_STOCK_ALERT_WHERE,
+        Notification.type == alert_type,
+        Notification.chemical_id == chemical_id
+    ).first()
+
+def upsert_stock_alerts(db: Session, alerts: List[dict]) -> Tuple[List[int], List[int]]:
+    """Insert stock alerts, updating the existing active row per (type, chemical_id) instead of duplicating (no commit)
+
+    Returns the ids of inserted rows and of updated rows (an unchanged message is neither).
+    """
+    if not alerts:
+        return [], []
+    
+    # ON CONFLICT cannot touch one row twice in a statement: keep the last alert per (type, chemical_id)
+    latest = {(alert["type"], alert["chemical_id"]): alert for alert in alerts}
+    recipients_by_key = {key: alert.get("recipients") or STOCK_ALERT_RECIPIENTS for key, alert in latest.items()}
+    rows = [{k: v for k, v in alert.items() if k != "recipients"} for alert in latest.values()]
+    existing = {
+        row.id for row in db.query(Notification.id).filter(
+            ACTIVE_STOCK_ALERT_WHERE,
+            tuple_(Notification.type, Notification.chemical_id).in_(list(latest))
+        )
+    }
+    
+    stmt = pg_insert(Notification).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Notification.type, Notification.chemical_id],
+        index_where=ACTIVE_STOCK_ALERT_WHERE,
+        set_={
+            "severity": stmt.excluded.severity,
+            "message": stmt.excluded.message
+        },
+        where=Notification.message != stmt.excluded.message
+    ).returning(*EVENT_COLUMNS)
+    
+    # Rows whose message did not change return nothing; their recipients already exist
+    changed = db.execute(stmt).all()
+    recipient_rows = [
+        {"notification_id": row.id, "role": _role_value(role)}
+        for row in changed
+        for role in recipients_by_key[(row.type, row.chemical_id)]
+    ]
+    if recipient_rows:
+        db.execute(pg_insert(NotificationRecipient).values(recipient_rows).on_conflict_do_nothing())
+    _queue_events(db, "notification", changed)
+    return (
+        [row.id for row in changed if row.id not in existing],
+        [row.id for row in changed if row.id in existing]
+    )
+
+def resolve_stock_alerts(db: Session, chemical_ids: List[int], alert_types: List[str]) -> int:
+    """Mark active stock alerts of the given types as resolved (no commit)"""
+    if not chemical_ids or not alert_types:
+        return 0
+    
+    stmt = update(Notification).where(
+        ACTIVE_STOCK_ALERT_WHERE,
+        Notification.chemical_id.in_(chemical_ids),
+        Notification.type.in_(alert_types)
+    ).values(resolved_at=func.now()).returning(*EVENT_COLUMNS)
+    resolved = db.execute(stmt.execution_options(synchronize_session=False)).all()
+    _queue_events(db, "resolved", resolved)
+    return len(resolved)
+
+def detach_chemical_notifications(db: Session, chemical_id: int) -> int:
+    """Unlink notifications from a chemical about to be deleted, resolving open ones (no commit)"""
+    stmt = update(Notification).where(Notification.chemical_id == chemical_id).values(
+        chemical_id=None, resolved_at=func.coalesce(Notification.resolved_at, func.now())
+    ).returning(*EVENT_COLUMNS)
+    detached = db.execute(stmt.execution_options(synchronize_session=False)).all()
+    _queue_events(db, "resolved", detached)
+    return len(detached)
+
+def evaluate_stock_alerts(db: Session, chemicals: list) -> None:
+    """Bring stock alerts in line with the chemicals' current stock_status, inside the caller's transaction"""
+    alerts = []
+    clear = {"in_stock": [], "low_stock": [], "out_of_stock": []}
+    
+    for chemical in chemicals:
+        stock_status = chemical.stock_status
+        clear[stock_status].append(chemical.id)
+        if stock_status == "low_stock":
+            message = (
+                f"Low stock alert: {chemical.name} has only {chemical.quantity} {chemical.unit} remaining "
+                f"(threshold: {chemical.alert_threshold} {chemical.unit})"
+            )
+        elif stock_status == "out_of_stock":
+            message = f"Out of stock: {chemical.name} is completely depleted"
+        else:
+            continue
+        alerts.append({
+            "type": stock_status,
+            "severity": STOCK_ALERT_SEVERITY[stock_status],
+            "message": message,
+            "chemical_id": chemical.id,
+            "recipients": STOCK_ALERT_RECIPIENTS
+        })
+    
+    # Auto-resolve alerts whose condition no longer holds
+    resolve_stock_alerts(db, clear["in_stock"], ["low_stock", "out_of_stock"])
+    resolve_stock_alerts(db, clear["low_stock"], ["out_of_stock"])
+    resolve_stock_alerts(db, clear["out_of_stock"], ["low_stock"])
+    
+    upsert_stock_alerts(db, alerts)
+
+
+def collapse_superseded_stock_alerts(db: Session) -> int:
+    """Delete resolved stock alerts that have a newer alert of the same type for the same chemical (no commit)"""
+    newer = aliased(Notification)
+    return db.query(Notification).filter(
+        Notification.type.in_(list(STOCK_ALERT_SEVERITY)),
+        Notification.resolved_at.isnot(None),
+        exists().where(
+            newer.type == Notification.type,
+            newer.chemical_id == Notification.chemical_id,
+            newer.id > Notification.id
+        )
+    ).delete(synchronize_session=False)
+
+def purge_closed_notifications(db: Session, cutoff: datetime) -> int:
+    """Delete notifications older than cutoff that are closed (no commit)
+
+    A stock alert is closed once it was resolved before cutoff; an open alert is never
+    purged, whoever dismissed it. Other notifications are never resolved, so they are
+    closed once anyone has dismissed them: past the retention window the shared row goes.
+    """
+    stock_alert = Notification.type.in_(list(STOCK_ALERT_SEVERITY))
+    dismissed = exists().where(
+        NotificationReceipt.notification_id == Notification.id,
+        NotificationReceipt.dismissed_at.isnot(None)
+    )
+    return db.query(Notification).filter(
+        Notification.timestamp < cutoff,
+        or_(
+            and_(stock_alert, Notification.resolved_at.isnot(None), Notification.resolved_at < cutoff),
+            and_(~stock_alert, dismissed)
+        )
+    ).delete(synchronize_session=False)
+
+def enforce_role_cap(db: Session, cap: int) -> dict:
+    """Keep only the newest `cap` notifications per role; open stock alerts are never dropped (no commit)"""
+    ranked = select(
+        NotificationRecipient.notification_id,
+        NotificationRecipient.role,
+        func.row_number().over(
+            partition_by=NotificationRecipient.role,
+            order_by=NotificationRecipient.notification_id.desc()
+        ).label("rank")
+    ).subquery()
+    over_cap = select(ranked.c.notification_id, ranked.c.role).where(ranked.c.rank > cap)
+    open_alerts = select(Notification.id).where(ACTIVE_STOCK_ALERT_WHERE)
+    
+    dropped = db.query(NotificationRecipient).filter(
+        tuple_(NotificationRecipient.notification_id, NotificationRecipient.role).in_(over_cap),
+        NotificationRecipient.notification_id.notin_(open_alerts)
+    ).delete(synchronize_session=False)
+    
+    # Rows no role can see any more
+    orphaned = db.query(Notification).filter(
+        ~exists().where(NotificationRecipient.notification_id == Notification.id),
+        ~ACTIVE_STOCK_ALERT_WHERE
+    ).delete(synchronize_session=False) if dropped else 0
+    return {"capped_recipients": dropped, "orphaned": orphaned}
+
+def compact_notifications(db: Session, retention_days: int = NOTIFICATION_RETENTION_DAYS, role_cap: int = NOTIFICATION_ROLE_CAP) -> dict:
+    """Retention and compaction pass, committed as one transaction"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    try:
+        result = {
+            "superseded": collapse_superseded_stock_alerts(db),
+            "purged": purge_closed_notifications(db, cutoff),
+            **enforce_role_cap(db, role_cap)
+        }
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
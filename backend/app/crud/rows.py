@@ -0,0 +1,79 @@
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+# Slotted row objects for the ORM-free list read path: list endpoints fill them straight
+# from Core select() results (no identity map, instrumentation or change tracking).
+# Each mirrors its response schema, which validates it with from_attributes like an ORM object
+
+@dataclass(slots=True)
+class ChemicalRow:
+    id: int
+    name: str
+    quantity: float
+    unit: str
+    formulation: Optional[str]
+    notes: Optional[str]
+    alert_threshold: float
+    pack_size: Optional[float]
+    last_updated: datetime
+    updated_by: Optional[str]
+    version: int
+    stock_status: Optional[str]
+
+@dataclass(slots=True)
+class FormulationRow:
+    id: int
+    chemical_id: int
+    component_name: str
+    amount: float
+    unit: str
+    available_quantity: float
+    required_quantity: float
+    notes: Optional[str]
+    last_updated: datetime
+    updated_by: Optional[str]
+
+@dataclass(slots=True)
+class TransactionRow:
+    id: int
+    chemical_id: int
+    transaction_type: str
+    quantity: float
+    unit: str
+    amount: float
+    currency: Optional[str]
+    supplier: Optional[str]
+    delivery_date: Optional[datetime]
+    status: Optional[str]
+    notes: Optional[str]
+    created_by: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+@dataclass(slots=True)
+class NotificationRow:
+    id: int
+    type: str
+    severity: str
+    message: str
+    chemical_id: Optional[int]
+    user_id: Optional[str]
+    timestamp: datetime
+    resolved_at: Optional[datetime]
+    is_read: bool
+    is_dismissed: bool
+    recipients: Optional[List[str]] = None
+
+def row_columns(model, row_class, exclude: Iterable[str] = ()) -> list:
+    """The model columns backing a row class, in field order"""
+    skipped = set(exclude)
+    return [getattr(model, field.name) for field in fields(row_class) if field.name not in skipped]
+
+def materialize(result, row_class) -> list:
+    """One row object per result row (columns must be selected in field order)"""
+    return [row_class(*row) for row in result]
+
+def as_dicts(result, names: List[str]) -> List[dict]:
+    """Rows as plain dicts keyed by the selected column names, for sparse responses"""
+    return [dict(zip(names, row)) for row in result]
@@ -0,0 +1,129 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from app.models.stock_movements import StockMovement, StockSnapshot
+from app.models.chemical_inventory import ChemicalInventory
+from typing import List, Optional
+from datetime import datetime
+import os
+
+# Write a balance snapshot every N movements per chemical, so an as-of query
+# replays at most one interval of the ledger
+SNAPSHOT_INTERVAL = int(os.getenv("STOCK_SNAPSHOT_INTERVAL", 100))
+
+# Balances closer than this are considered equal (float accumulation noise)
+RECONCILE_TOLERANCE = 1e-6
+
+MOVEMENT_TYPES = {"receive", "consume", "adjust", "transfer"}
+
+def record_stock_movement(
+    db: Session,
+    chemical_id: int,
+    movement_type: str,
+    quantity_delta: float,
+    balance_after: float,
+    user_uid: Optional[str],
+    note: Optional[str] = None,
+    counterparty_chemical_id: Optional[int] = None,
+    movement_count: Optional[int] = None
+) -> StockMovement:
+    """Append a ledger entry in the caller's transaction (the caller commits).
+
+    movement_count is the chemical's counter after this movement, when the caller
+    already incremented it in its own UPDATE ... RETURNING (the atomic stock path).
+    Otherwise it is incremented here.
+    """
+    if movement_type not in MOVEMENT_TYPES:
+        raise ValueError(f"Unknown stock movement type: {movement_type}")
+    
+    movement = StockMovement(
+        chemical_id=chemical_id,
+        movement_type=movement_type,
+        quantity_delta=quantity_delta,
+        counterparty_chemical_id=counterparty_chemical_id,
+        note=note,
+        created_by=user_uid
+    )
+    db.add(movement)
+    db.flush()
+    
+    if movement_count is None:
+        movement_count = db.execute(
+            update(ChemicalInventory)
+            .where(ChemicalInventory.id == chemical_id)
+            .values(movement_count=ChemicalInventory.movement_count + 1)
+            .returning(ChemicalInventory.movement_count)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    
+    # Snapshot every SNAPSHOT_INTERVAL-th movement of the chemical
+    if movement_count and movement_count % SNAPSHOT_INTERVAL == 0:
+        db.add(StockSnapshot(
+            chemical_id=chemical_id,
+            movement_id=movement.id,
+            balance=balance_after
+        ))
+    
+    return movement
+
+def get_stock_movements(db: Session, chemical_id: int, skip: int = 0, limit: int = 100) -> List[StockMovement]:
+    """Get ledger entries for a chemical, newest first"""
+    return db.query(StockMovement).filter(
+        StockMovement.chemical_id == chemical_id
+    ).order_by(StockMovement.id.desc()).offset(skip).limit(limit).all()
+
+def get_quantity_as_of(db: Session, chemical_id: int, as_of: datetime) -> dict:
+    """Replay the ledger from the nearest snapshot at or before as_of"""
+    snapshot = db.query(StockSnapshot).filter(
+        StockSnapshot.chemical_id == chemical_id,
+        StockSnapshot.created_at <= as_of
+    ).order_by(StockSnapshot.movement_id.desc()).first()
+    
+    base_balance = snapshot.balance if snapshot else 0.0
+    base_movement_id = snapshot.movement_id if snapshot else 0
+    
+    delta, replayed = db.query(
+        func.coalesce(func.sum(StockMovement.quantity_delta), 0.0),
+        func.count(StockMovement.id)
+    ).filter(
+        StockMovement.chemical_id == chemical_id,
+        StockMovement.id > base_movement_id,
+        StockMovement.created_at <= as_of
+    ).one()
+    
+    return {
+        "chemical_id": chemical_id,
+        "as_of": as_of,
+        "quantity": float(base_balance + delta),
+        "replayed_movements": replayed
+    }
+
+def reconcile_stock_balances(db: Session) -> List[dict]:
+    """Compare every materialized quantity with its full ledger sum in one query"""
+    ledger = select(
+        StockMovement.chemical_id,
+        func.sum(StockMovement.quantity_delta).label("ledger_quantity")
+    ).group_by(StockMovement.chemical_id).subquery()
+    
+    ledger_quantity = func.coalesce(ledger.c.ledger_quantity, 0.0)
+    rows = db.execute(
+        select(
+            ChemicalInventory.id,
+            ChemicalInventory.name,
+            ChemicalInventory.quantity,
+            ledger_quantity.label("ledger_quantity")
+        )
+        .outerjoin(ledger, ledger.c.chemical_id == ChemicalInventory.id)
+        .where(func.abs(ChemicalInventory.quantity - ledger_quantity) > RECONCILE_TOLERANCE)
+        .order_by(ChemicalInventory.id)
+    ).all()
+    
+    return [
+        {
+            "chemical_id": row.id,
+            "name": row.name,
+            "materialized_quantity": float(row.quantity),
+            "ledger_quantity": float(row.ledger_quantity),
+            "difference": float(row.quantity - row.ledger_quantity)
+        }
+        for row in rows
+    ]
@@ -30,6 +30,9 @@ Base = declarative_base()
 # Import all models to ensure they are registered
 from app.models import User, ActivityLog
 
+# Bump collection versions (used for ETags) whenever a session commits writes
+from app.services import collection_versions
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
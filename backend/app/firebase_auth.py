@@ -4,7 +4,7 @@ from firebase_admin import credentials, auth
 from fastapi import HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.crud.user import get_user_by_uid
 from app.models.user import UserRole
 
@@ -51,6 +51,36 @@ def get_current_user(
     
     return user
 
+def get_stream_user(request: Request):
+    """Authenticate a long-lived stream request without holding a DB session for its lifetime.
+
+    EventSource cannot send an Authorization header, so the ID token may also be
+    passed as the `token` query parameter.
+    """
+    auth_header = request.headers.get("Authorization")
+    token = auth_header.split(" ")[-1] if auth_header else request.query_params.get("token")
+    if not token:
+        raise HTTPException(status_code=401, detail="Authorization header missing")
+
+    try:
+        decoded_token = auth.verify_id_token(token)
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=f"Token invalid: {str(e)}")
+
+    db = SessionLocal()
+    try:
+        user = get_user_by_uid(db, decoded_token["uid"])
+    finally:
+        db.close()
+
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if not user.is_approved:
+        raise HTTPException(status_code=403, detail="User not approved")
+    
+    return user
+
 def get_admin_user(
     current_user = Depends(get_current_user)
 ):
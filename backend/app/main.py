@@ -1,7 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, check_database_connection
-from app.models import user, activity_log, chemical_inventory, formulation_details, notifications, account_transactions
+from app.models import user, activity_log, chemical_inventory, formulation_details, notifications, account_transactions, stock_movements, collection_versions, chemical_forecasts
+from app.services.change_feed import CHANGE_FEED_ENABLED, ChangeFeedListener, listener_dsn
+from app.services.response_encoding import ResponseEncodingMiddleware
 import os
 
 app = FastAPI(title="Chemical Inventory API", version="1.0.0")
@@ -15,6 +17,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# MessagePack negotiation and br/gzip compression (see app/services/response_encoding.py)
+app.add_middleware(ResponseEncodingMiddleware)
+
 @app.on_event("startup")
 async def startup_event():
     """Create database tables on startup"""
@@ -26,6 +31,9 @@ async def startup_event():
         formulation_details.Base.metadata.create_all(bind=engine)
         notifications.Base.metadata.create_all(bind=engine)
         account_transactions.Base.metadata.create_all(bind=engine)
+        stock_movements.Base.metadata.create_all(bind=engine)
+        collection_versions.Base.metadata.create_all(bind=engine)
+        chemical_forecasts.Base.metadata.create_all(bind=engine)
         print("✅ Database tables created successfully!")
         
         # Check database connection
@@ -37,6 +45,19 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Error creating database tables: {e}")
         raise
+    
+    # Cross-worker cache invalidation (PostgreSQL LISTEN/NOTIFY)
+    dsn = listener_dsn(engine)
+    if CHANGE_FEED_ENABLED and dsn:
+        app.state.change_feed = ChangeFeedListener(dsn)
+        app.state.change_feed.start()
+        print("✅ Change feed listener started")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    change_feed = getattr(app.state, "change_feed", None)
+    if change_feed:
+        await change_feed.stop()
 
 # Include routers
 from app.routers.auth import router as auth_router
@@ -46,6 +67,7 @@ from app.routers.chemical_inventory import router as chemical_inventory_router
 from app.routers.formulation_details import router as formulation_details_router
 from app.routers.notifications import router as notifications_router
 from app.routers.account_transactions import router as account_transactions_router
+from app.routers.export import router as export_router
 
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(admin_router, prefix="/admin", tags=["Admin"])
@@ -54,6 +76,7 @@ app.include_router(chemical_inventory_router, prefix="/chemicals", tags=["Chemic
 app.include_router(formulation_details_router, prefix="/formulations", tags=["Formulation Details"])
 app.include_router(notifications_router, prefix="/notifications", tags=["Notifications"])
 app.include_router(account_transactions_router, prefix="/account", tags=["Account Transactions"])
+app.include_router(export_router, prefix="/export", tags=["Export"])
 
 @app.get("/")
 def root():
@@ -66,5 +89,5 @@ def health_check():
     return {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
-        "tables": ["users", "activity_logs", "chemical_inventory", "formulation_details", "notifications", "account_transactions", "purchase_orders", "purchase_order_items"]
+        "tables": ["users", "activity_logs", "chemical_inventory", "formulation_details", "notifications", "notification_recipients", "notification_read_marks", "notification_receipts", "account_transactions", "purchase_orders", "purchase_order_items", "spend_rollup", "chemical_purchase_stats", "stock_movements", "stock_snapshots", "collection_versions", "chemical_forecasts"]
     }
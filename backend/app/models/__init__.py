@@ -3,7 +3,10 @@ from .invitation import Invitation, InvitationStatus
 from .activity_log import ActivityLog
 from .chemical_inventory import ChemicalInventory
 from .formulation_details import FormulationDetails
-from .notifications import Notification
-from .account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem
+from .notifications import Notification, NotificationRecipient, NotificationReadMark, NotificationReceipt
+from .account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem, SpendRollup, ChemicalPurchaseStats
+from .stock_movements import StockMovement, StockSnapshot
+from .collection_versions import CollectionVersion
+from .chemical_forecasts import ChemicalForecast
 
-__all__ = ["User", "UserRole", "Invitation", "InvitationStatus", "ActivityLog", "ChemicalInventory", "FormulationDetails", "Notification", "AccountTransaction", "PurchaseOrder", "PurchaseOrderItem"] 
\ No newline at end of file
+__all__ = ["User", "UserRole", "Invitation", "InvitationStatus", "ActivityLog", "ChemicalInventory", "FormulationDetails", "Notification", "NotificationRecipient", "NotificationReadMark", "NotificationReceipt", "AccountTransaction", "PurchaseOrder", "PurchaseOrderItem", "SpendRollup", "ChemicalPurchaseStats", "StockMovement", "StockSnapshot", "CollectionVersion", "ChemicalForecast"] 
\ No newline at end of file
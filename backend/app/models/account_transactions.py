@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Float, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, Date, Text, Float, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -19,12 +19,19 @@ class AccountTransaction(Base):
     status = Column(String, default="pending")  # 'pending', 'ordered', 'delivered', 'cancelled'
     notes = Column(Text, nullable=True)
     created_by = Column(String, ForeignKey("users.uid"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)  # Analytics refresh high-water mark
     
     # Relationships
     chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id])
     user = relationship("User", foreign_keys=[created_by])
+    
+    # Fetch created_at with the INSERT (RETURNING) so rollups can bucket the row without a reload
+    __mapper_args__ = {"eager_defaults": True}
+    
+    __table_args__ = (
+        Index("ix_account_transactions_chemical_id_created_at", "chemical_id", "created_at"),
+    )
 
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
@@ -47,13 +54,20 @@ class PurchaseOrder(Base):
     creator = relationship("User", foreign_keys=[created_by])
     approver = relationship("User", foreign_keys=[approved_by])
     items = relationship("PurchaseOrderItem", back_populates="purchase_order", cascade="all, delete-orphan")
+    
+    # List filters: status or supplier, newest first
+    __table_args__ = (
+        Index("ix_purchase_orders_status_order_date", "status", "order_date"),
+        Index("ix_purchase_orders_supplier_order_date", "supplier", "order_date"),
+        Index("ix_purchase_orders_order_date", "order_date"),
+    )
 
 class PurchaseOrderItem(Base):
     __tablename__ = "purchase_order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    purchase_order_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
-    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id"), nullable=False)
+    purchase_order_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False, index=True)  # selectinload lookups
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id"), nullable=False, index=True)  # Stock on order
     quantity = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
     unit_price = Column(Float, nullable=False)
@@ -62,4 +76,28 @@ class PurchaseOrderItem(Base):
     
     # Relationships
     purchase_order = relationship("PurchaseOrder", back_populates="items")
-    chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id]) 
\ No newline at end of file
+    chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id])
+
+class SpendRollup(Base):
+    """Per-month totals of account_transactions, maintained by the transaction CRUD"""
+    __tablename__ = "spend_rollup"
+
+    period = Column(Date, primary_key=True)  # First day of the month (UTC) the transaction was created in
+    supplier = Column(String, primary_key=True, default="")  # '' when the transaction has no supplier
+    currency = Column(String, primary_key=True, default="USD")
+    transaction_type = Column(String, primary_key=True)  # 'purchase', 'adjustment', 'usage'
+    total_amount = Column(Float, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ChemicalPurchaseStats(Base):
+    """Per-chemical purchase totals, maintained by the transaction CRUD"""
+    __tablename__ = "chemical_purchase_stats"
+
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="CASCADE"), primary_key=True)
+    total_quantity = Column(Float, nullable=False, default=0)
+    total_spent = Column(Float, nullable=False, default=0)
+    purchase_count = Column(Integer, nullable=False, default=0)
+    average_unit_price = Column(Float, nullable=False, default=0)  # total_spent / total_quantity
+    last_purchase_date = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, Date, Float, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ChemicalForecast(Base):
+    __tablename__ = "chemical_forecasts"
+
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="CASCADE"), primary_key=True)
+    daily_usage = Column(Float, nullable=False, default=0)  # EWMA of daily consumption
+    usage_stddev = Column(Float, nullable=False, default=0)  # EW standard deviation of daily consumption
+    lead_time_days = Column(Float, nullable=False)  # Mean delivery_date - purchase_date of past purchases (or the default)
+    safety_stock = Column(Float, nullable=False, default=0)
+    reorder_point = Column(Float, nullable=False, default=0)  # daily_usage * lead_time_days + safety_stock
+    days_of_stock = Column(Float, nullable=True)  # At refresh time; NULL when there is no usage
+    # Incremental EWMA state: decayed sums of weights, usage and squared usage through computed_through
+    weight_sum = Column(Float, nullable=False, default=0)
+    usage_sum = Column(Float, nullable=False, default=0)
+    usage_sq_sum = Column(Float, nullable=False, default=0)
+    computed_through = Column(Date, nullable=False)  # Last complete UTC day folded into the state
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
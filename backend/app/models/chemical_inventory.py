@@ -1,8 +1,18 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Float, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Text, Float, ForeignKey, Computed, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Counted units are never reported as low stock (a few bottles on the shelf is normal), only as out of stock
+COUNTED_UNITS = ("pieces", "bottles")
+
+# Generated stock status, evaluated by Postgres on every write
+STOCK_STATUS_SQL = (
+    "CASE WHEN quantity <= 0 THEN 'out_of_stock' "
+    f"WHEN quantity < alert_threshold AND unit NOT IN ({', '.join(repr(unit) for unit in COUNTED_UNITS)}) THEN 'low_stock' "
+    "ELSE 'in_stock' END"
+)
+
 class ChemicalInventory(Base):
     __tablename__ = "chemical_inventory"
 
@@ -14,7 +24,25 @@ class ChemicalInventory(Base):
     notes = Column(Text, nullable=True)
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     updated_by = Column(String, ForeignKey("users.uid"), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Optimistic concurrency counter
+    alert_threshold = Column(Float, nullable=False, default=10.0, server_default="10")
+    pack_size = Column(Float, nullable=True)  # Purchase unit; replenishment rounds order quantities up to multiples of it
+    movement_count = Column(Integer, nullable=False, default=0, server_default="0")  # Ledger entries so far; paces balance snapshots
+    stock_status = Column(String, Computed(STOCK_STATUS_SQL, persisted=True))  # 'in_stock', 'low_stock', 'out_of_stock'
     
     # Relationships
     user = relationship("User", foreign_keys=[updated_by])
-    formulation_details = relationship("FormulationDetails", back_populates="chemical", cascade="all, delete-orphan") 
\ No newline at end of file
+    formulation_details = relationship("FormulationDetails", back_populates="chemical", cascade="all, delete-orphan")
+    purchase_stats = relationship("ChemicalPurchaseStats", uselist=False, viewonly=True)  # Maintained by the account CRUD
+    
+    # Every ORM flush checks and bumps version, so concurrent read-modify-write updates fail instead of overwriting
+    __mapper_args__ = {"version_id_col": version}
+    
+    # Partial index: only the (few) rows needing attention are indexed
+    __table_args__ = (
+        Index(
+            "ix_chemical_inventory_stock_alerts",
+            "stock_status", "quantity",
+            postgresql_where=text("stock_status <> 'in_stock'")
+        ),
+    )
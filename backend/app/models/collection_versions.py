@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)  # Table name, e.g. 'chemical_inventory'
+    version = Column(BigInteger, nullable=False, default=1)  # Bumped once per committed transaction that writes the table
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -10,13 +10,65 @@ class Notification(Base):
     type = Column(String, nullable=False)  # 'low_stock', 'out_of_stock', 'expiry', etc.
     severity = Column(String, nullable=False)  # 'critical', 'warning', 'info'
     message = Column(Text, nullable=False)
-    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id"), nullable=True)
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="SET NULL"), nullable=True)
     user_id = Column(String, ForeignKey("users.uid"), nullable=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    is_read = Column(Boolean, default=False)
-    is_dismissed = Column(Boolean, default=False)
-    recipients = Column(Text, nullable=True)  # JSON string of recipient roles
+    resolved_at = Column(DateTime(timezone=True), nullable=True)  # Set when the underlying condition clears
     
     # Relationships
     chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id])
-    user = relationship("User", foreign_keys=[user_id]) 
\ No newline at end of file
+    user = relationship("User", foreign_keys=[user_id])
+    recipient_roles = relationship(
+        "NotificationRecipient",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="selectin",
+        order_by="NotificationRecipient.role"
+    )
+    
+    # Per-user state, filled in by crud.notifications for the requesting user
+    is_read = False
+    is_dismissed = False
+    
+    @property
+    def recipients(self):
+        """Recipient roles as a plain list (API shape)"""
+        return [recipient.role for recipient in self.recipient_roles]
+    
+    # At most one unresolved stock alert per (type, chemical); the alert evaluator upserts against this
+    __table_args__ = (
+        Index(
+            "uq_notifications_active_stock_alert",
+            "type", "chemical_id",
+            unique=True,
+            postgresql_where=text("resolved_at IS NULL AND type IN ('low_stock', 'out_of_stock')")
+        ),
+    )
+
+class NotificationRecipient(Base):
+    __tablename__ = "notification_recipients"
+
+    notification_id = Column(Integer, ForeignKey("notifications.id", ondelete="CASCADE"), primary_key=True)
+    role = Column(String, primary_key=True)  # UserRole value
+    
+    # Role-filtered notification lists are index lookups on (role, notification_id)
+    __table_args__ = (
+        Index("ix_notification_recipients_role_notification_id", "role", "notification_id"),
+    )
+
+class NotificationReadMark(Base):
+    __tablename__ = "notification_read_marks"
+
+    user_uid = Column(String, ForeignKey("users.uid", ondelete="CASCADE"), primary_key=True)
+    last_read_id = Column(Integer, nullable=False, default=0)  # Everything up to this notification id is read
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class NotificationReceipt(Base):
+    __tablename__ = "notification_receipts"
+
+    # Sparse: only dismissals and reads above the user's watermark get a row
+    user_uid = Column(String, ForeignKey("users.uid", ondelete="CASCADE"), primary_key=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id", ondelete="CASCADE"), primary_key=True)
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    dismissed_at = Column(DateTime(timezone=True), nullable=True)
+
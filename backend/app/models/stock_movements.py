@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Float, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="CASCADE"), nullable=False)
+    movement_type = Column(String, nullable=False)  # 'receive', 'consume', 'adjust', 'transfer'
+    quantity_delta = Column(Float, nullable=False)  # Signed change applied to chemical_inventory.quantity
+    counterparty_chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="SET NULL"), nullable=True)  # Other side of a transfer
+    note = Column(Text, nullable=True)
+    created_by = Column(String, ForeignKey("users.uid"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id])
+    user = relationship("User", foreign_keys=[created_by])
+    
+    __table_args__ = (
+        Index("ix_stock_movements_chemical_id_id", "chemical_id", "id"),
+        Index("ix_stock_movements_chemical_id_created_at", "chemical_id", "created_at"),
+    )
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="CASCADE"), nullable=False)
+    movement_id = Column(Integer, ForeignKey("stock_movements.id", ondelete="CASCADE"), nullable=False)  # Last movement included in balance
+    balance = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # Same transaction time as the movement
+    
+    __table_args__ = (
+        Index("ix_stock_snapshots_chemical_id_movement_id", "chemical_id", "movement_id"),
+        Index("ix_stock_snapshots_chemical_id_created_at", "chemical_id", "created_at"),
+    )
@@ -1,40 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.firebase_auth import get_current_user
+from app.models.user import User, UserRole
 from app.crud import account_transactions as crud_account
+from app.services.read_cache import account_summary_cache
+from app.services.transaction_analytics import transaction_analytics, label_chemicals
+from app.services.replenishment import draft_replenishment_orders
+from app.services.json_responses import fast_json_enabled, rows_response
 from app.schema.account_transactions import (
     AccountTransactionCreate, AccountTransactionResponse, AccountTransactionUpdate,
     PurchaseOrderCreate, PurchaseOrderResponse, PurchaseOrderUpdate,
-    AccountSummary, ChemicalPurchaseHistory
+    AccountSummary, ChemicalPurchaseHistory, SpendTrendPoint, TransactionAnalyticsResult,
+    ReplenishmentResult
 )
-from typing import List
-import json
+from datetime import datetime
+from typing import List, Optional
 
-router = APIRouter(prefix="/account", tags=["account"])
+FAST_JSON = fast_json_enabled("account")
+
+router = APIRouter()
+
+# Roles allowed to record transactions and purchase orders
+ACCOUNT_WRITER_ROLES = [UserRole.ADMIN, UserRole.ACCOUNT]
 
 # Account Transaction Endpoints
 @router.post("/transactions", response_model=AccountTransactionResponse)
 def create_transaction(
     transaction: AccountTransactionCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new account transaction"""
+    # Check if user has account role
+    if current_user.role not in ACCOUNT_WRITER_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only account team members can create transactions"
+        )
+    
     try:
-        # Check if user has account role
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        if not user_info or user_info.role not in ['admin', 'account']:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only account team members can create transactions"
-            )
-        
         db_transaction = crud_account.create_account_transaction(
-            db, transaction, current_user.get("uid")
+            db, transaction, current_user.uid
         )
         return db_transaction
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -46,15 +57,17 @@ def get_transactions(
     skip: int = 0,
     limit: int = 100,
     chemical_id: int = None,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get account transactions"""
     try:
-        transactions = crud_account.get_account_transactions(
+        transactions = crud_account.get_account_transaction_rows(
             db, skip=skip, limit=limit, chemical_id=chemical_id
         )
-        return transactions
+        return rows_response(transactions) if FAST_JSON else transactions
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -64,7 +77,7 @@ def get_transactions(
 @router.get("/transactions/{transaction_id}", response_model=AccountTransactionResponse)
 def get_transaction(
     transaction_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific transaction"""
@@ -80,7 +93,7 @@ def get_transaction(
 def update_transaction(
     transaction_id: int,
     transaction_update: AccountTransactionUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a transaction"""
@@ -94,6 +107,8 @@ def update_transaction(
                 detail="Transaction not found"
             )
         return transaction
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -103,20 +118,18 @@ def update_transaction(
 @router.delete("/transactions/{transaction_id}")
 def delete_transaction(
     transaction_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a transaction (admin only)"""
+    # Check if user is admin
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can delete transactions"
+        )
+    
     try:
-        # Check if user is admin
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        if not user_info or user_info.role != "admin":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only admins can delete transactions"
-            )
-        
         success = crud_account.delete_account_transaction(db, transaction_id)
         if not success:
             raise HTTPException(
@@ -124,6 +137,8 @@ def delete_transaction(
                 detail="Transaction not found"
             )
         return {"message": "Transaction deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -134,24 +149,24 @@ def delete_transaction(
 @router.post("/purchase-orders", response_model=PurchaseOrderResponse)
 def create_purchase_order(
     purchase_order: PurchaseOrderCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new purchase order"""
+    # Check if user has account role
+    if current_user.role not in ACCOUNT_WRITER_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only account team members can create purchase orders"
+        )
+    
     try:
-        # Check if user has account role
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        if not user_info or user_info.role not in ['admin', 'account']:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only account team members can create purchase orders"
-            )
-        
         db_order = crud_account.create_purchase_order(
-            db, purchase_order, current_user.get("uid")
+            db, purchase_order, current_user.uid
         )
         return db_order
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -162,26 +177,55 @@ def create_purchase_order(
 def get_purchase_orders(
     skip: int = 0,
     limit: int = 100,
-    status: str = None,
-    current_user: dict = Depends(get_current_user),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    supplier: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Orders dated on or after this time"),
+    end: Optional[datetime] = Query(None, description="Orders dated before this time"),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get purchase orders"""
+    """Get purchase orders, newest first, with their items"""
     try:
         orders = crud_account.get_purchase_orders(
-            db, skip=skip, limit=limit, status=status
+            db, skip=skip, limit=limit, status=status_filter, supplier=supplier, start=start, end=end
         )
         return orders
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch purchase orders: {str(e)}"
         )
 
+@router.post("/purchase-orders/replenish", response_model=ReplenishmentResult)
+def replenish_purchase_orders(
+    dry_run: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Draft one purchase order per supplier for every chemical below its reorder point"""
+    if current_user.role not in ACCOUNT_WRITER_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only account team members can create purchase orders"
+        )
+    
+    try:
+        return draft_replenishment_orders(db, current_user.uid, dry_run=dry_run)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to draft replenishment orders: {str(e)}"
+        )
+
 @router.get("/purchase-orders/{order_id}", response_model=PurchaseOrderResponse)
 def get_purchase_order(
     order_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific purchase order"""
@@ -197,7 +241,7 @@ def get_purchase_order(
 def update_purchase_order(
     order_id: int,
     order_update: PurchaseOrderUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a purchase order"""
@@ -211,6 +255,8 @@ def update_purchase_order(
                 detail="Purchase order not found"
             )
         return order
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -220,20 +266,18 @@ def update_purchase_order(
 @router.delete("/purchase-orders/{order_id}")
 def delete_purchase_order(
     order_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a purchase order (admin only)"""
+    # Check if user is admin
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can delete purchase orders"
+        )
+    
     try:
-        # Check if user is admin
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        if not user_info or user_info.role != "admin":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Only admins can delete purchase orders"
-            )
-        
         success = crud_account.delete_purchase_order(db, order_id)
         if not success:
             raise HTTPException(
@@ -241,6 +285,8 @@ def delete_purchase_order(
                 detail="Purchase order not found"
             )
         return {"message": "Purchase order deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -250,29 +296,126 @@ def delete_purchase_order(
 # Summary and Analytics Endpoints
 @router.get("/summary", response_model=AccountSummary)
 def get_account_summary(
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get account summary statistics"""
+    """Get account summary statistics (cached; concurrent misses share one computation)"""
     try:
-        summary = crud_account.get_account_summary(db)
-        return summary
+        return account_summary_cache.get_or_load("summary", lambda: crud_account.get_account_summary(db))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch account summary: {str(e)}"
         )
 
+@router.get("/spend-trend", response_model=List[SpendTrendPoint])
+def get_spend_trend(
+    months: int = Query(12, ge=1, le=120),
+    supplier: Optional[str] = None,
+    currency: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Monthly purchase spend per currency, read from the spend rollup"""
+    try:
+        return crud_account.get_spend_trend(db, months=months, supplier=supplier, currency=currency)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch spend trend: {str(e)}"
+        )
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()] if value else []
+
+@router.get("/analytics", response_model=TransactionAnalyticsResult)
+def get_transaction_analytics(
+    group_by: Optional[str] = Query(None, description="Comma-separated: chemical, supplier, currency, transaction_type, status"),
+    bucket: Optional[str] = Query(None, description="Group by period of created_at: day, week, month, quarter, year"),
+    metrics: str = Query("amount,count", description="Comma-separated: amount, quantity, count, unit_price"),
+    transaction_type: Optional[List[str]] = Query(None),
+    supplier: Optional[List[str]] = Query(None),
+    currency: Optional[List[str]] = Query(None),
+    status_filter: Optional[List[str]] = Query(None, alias="status"),
+    chemical_id: Optional[List[int]] = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    order_by: Optional[str] = Query(None, description="Metric to sort descending by (top-N with limit)"),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Ad-hoc group-by / filter / time-bucket aggregation over all account transactions (in-memory column store)"""
+    filters = {
+        dimension: values for dimension, values in (
+            ("transaction_type", transaction_type),
+            ("supplier", supplier),
+            ("currency", currency),
+            ("status", status_filter),
+            ("chemical", chemical_id)
+        ) if values
+    }
+    try:
+        transaction_analytics.refresh(db)
+        result = transaction_analytics.query(
+            group_by=_split(group_by), bucket=bucket, metrics=_split(metrics) or ["amount", "count"],
+            filters=filters, start=start, end=end, order_by=order_by, limit=limit
+        )
+        label_chemicals(db, result["rows"])
+        return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to run analytics query: {str(e)}"
+        )
+
+@router.get("/chemicals/purchase-stats", response_model=List[ChemicalPurchaseHistory])
+def get_chemicals_purchase_stats(
+    chemical_ids: Optional[List[int]] = Query(None, max_length=1000),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Purchase stats for many chemicals at once (repeat chemical_ids, or omit for the top spenders)"""
+    try:
+        return crud_account.get_chemicals_purchase_stats(db, chemical_ids, skip=skip, limit=limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch purchase stats: {str(e)}"
+        )
+
 @router.get("/chemicals/{chemical_id}/purchase-history", response_model=ChemicalPurchaseHistory)
 def get_chemical_purchase_history(
     chemical_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get purchase history for a specific chemical"""
     try:
         history = crud_account.get_chemical_purchase_history(db, chemical_id)
+        if history is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chemical not found"
+            )
         return history
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -282,13 +425,15 @@ def get_chemical_purchase_history(
 @router.get("/recent-transactions", response_model=List[AccountTransactionResponse])
 def get_recent_transactions(
     limit: int = 10,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get recent transactions"""
     try:
         transactions = crud_account.get_recent_transactions(db, limit)
         return transactions
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -297,13 +442,15 @@ def get_recent_transactions(
 
 @router.get("/pending-purchases", response_model=List[AccountTransactionResponse])
 def get_pending_purchases(
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get pending purchase transactions"""
     try:
         transactions = crud_account.get_pending_purchases(db)
         return transactions
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
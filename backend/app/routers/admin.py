@@ -11,10 +11,18 @@ from app.crud.activity_log import (
 from app.schema.user import UserUpdate, UserResponse
 from app.schema.activity_log import ActivityLogFilter, ActivityLogListResponse, ActivityLogNote
 from app.firebase_auth import get_admin_user
-from app.models.user import UserRole
+from app.services.read_cache import cache_stats
+from app.services.json_responses import fast_json_enabled, validated_response
+from app.models.user import User, UserRole
 from typing import List, Optional
 import firebase_admin
 from firebase_admin import auth
+from pydantic import TypeAdapter
+
+FAST_JSON = fast_json_enabled("admin")
+
+# Built once at import: validating a log page reuses the compiled validator/serializer
+ACTIVITY_LOG_PAGE = TypeAdapter(ActivityLogListResponse)
 
 router = APIRouter()
 
@@ -184,18 +192,17 @@ async def get_activity_logs_admin(
     
     logs, total = get_activity_logs(db, filters)
     
-    # Add user email to each log for easier frontend display
+    # Add user email to each log for easier frontend display (one lookup for the page)
+    user_ids = {log.user_id for log in logs if log.user_id}
+    emails = dict(db.query(User.id, User.email).filter(User.id.in_(user_ids)).all()) if user_ids else {}
     for log in logs:
         if log.user_id:
-            user = get_user_by_id(db, log.user_id)
-            log.user_email = user.email if user else None
+            log.user_email = emails.get(log.user_id)
     
-    return ActivityLogListResponse(
-        logs=logs,
-        total=total,
-        limit=limit,
-        offset=offset
-    )
+    page = {"logs": logs, "total": total, "limit": limit, "offset": offset}
+    if FAST_JSON:
+        return validated_response(ACTIVITY_LOG_PAGE, page)
+    return ActivityLogListResponse(**page)
 
 @router.patch("/logs/{log_id}/note")
 async def update_log_note(
@@ -218,4 +225,10 @@ async def update_log_note(
         f"Updated note on activity log: {log_id}"
     )
     
-    return {"message": "Note updated successfully", "log": updated_log} 
\ No newline at end of file
+    return {"message": "Note updated successfully", "log": updated_log} 
+@router.get("/cache/stats")
+async def get_cache_stats(
+    admin_user = Depends(get_admin_user)
+):
+    """Read cache hit ratios per endpoint (Admin only)"""
+    return {"caches": cache_stats()}
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request, Response, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from app.database import get_db
 from app.firebase_auth import get_current_user
 from app.models.user import User, UserRole
@@ -8,39 +9,237 @@ from app.schema.chemical_inventory import (
     ChemicalInventoryCreate, 
     ChemicalInventoryUpdate, 
     ChemicalInventoryResponse, 
-    ChemicalInventoryWithFormulations,
-    ChemicalInventoryAddNote
+    ChemicalInventoryExpanded,
+    ChemicalInventoryListItem,
+    CHEMICAL_LIST_FIELDS,
+    ChemicalUpdatedByUser,
+    ChemicalPurchaseStatsSummary,
+    ChemicalInventoryAddNote,
+    ChemicalStockChange,
+    ChemicalStockTransfer,
+    ChemicalStockStatusCounts,
+    ChemicalForecastResponse,
+    ForecastRefreshResult
 )
+from app.schema.formulation_details import FormulationDetailsResponse
+from app.schema.stock_movements import StockMovementResponse, StockBalanceAsOf, StockReconciliationItem
 from app.crud import chemical_inventory as crud_chemical_inventory
-from app.crud import formulation_details as crud_formulation_details
+from app.crud import stock_movements as crud_stock_movements
+from app.crud import chemical_forecasts as crud_chemical_forecasts
+from app.services.forecasting import refresh_forecasts
+from app.services.fieldsets import parse_fields, pick
+from app.services.collection_versions import collection_etag, cache_headers, is_not_modified
+from app.services.read_cache import chemical_detail_cache
+from app.services.json_responses import fast_json_enabled, rows_response
+
+FAST_JSON = fast_json_enabled("chemicals")
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ChemicalInventoryResponse])
+def _etag(chemical) -> str:
+    """Build the ETag for a chemical from its version counter"""
+    return f'"{chemical.version}"'
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Extract the expected version from an If-Match header (None means no check)"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid If-Match header"
+        )
+
+# Tables each include= expansion reads (they version the list ETag)
+INCLUDE_TABLES = {
+    "formulations": "formulation_details",
+    "updated_by_user": "users",
+    "purchase_stats": "chemical_purchase_stats",
+}
+
+INCLUDE_DESCRIPTION = f"Comma-separated expansions: {', '.join(INCLUDE_TABLES)}"
+
+def _parse_include(include: Optional[str]) -> List[str]:
+    """Validate include= and return the expansions in a stable order"""
+    names = {name.strip() for name in (include or "").split(",") if name.strip()}
+    unknown = names - set(crud_chemical_inventory.CHEMICAL_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}. Allowed: {', '.join(INCLUDE_TABLES)}"
+        )
+    return sorted(names)
+
+def _expansions(chemical, include: List[str]) -> dict:
+    """Serialize the requested expansions of a chemical loaded with the matching include options"""
+    data = {}
+    if "formulations" in include:
+        data["formulation_details"] = [
+            FormulationDetailsResponse.model_validate(formulation).model_dump()
+            for formulation in chemical.formulation_details
+        ]
+    if "updated_by_user" in include:
+        data["updated_by_user"] = ChemicalUpdatedByUser.model_validate(chemical.user).model_dump() if chemical.user else None
+    if "purchase_stats" in include:
+        stats = chemical.purchase_stats
+        data["purchase_stats"] = (
+            ChemicalPurchaseStatsSummary.model_validate(stats) if stats else ChemicalPurchaseStatsSummary()
+        ).model_dump()
+    return data
+
+@router.get("/", response_model=List[ChemicalInventoryListItem], response_model_exclude_unset=True)
 def get_chemical_inventory(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (default: all but formulation and notes)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all chemical inventory items"""
+    """Get all chemical inventory items (conditional GET via ETag / If-None-Match)"""
     if not current_user.is_approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not approved"
         )
+    include = _parse_include(include)
+    try:
+        fields = parse_fields(fields, list(ChemicalInventoryResponse.model_fields), CHEMICAL_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # Answer revalidations from the collection version before touching the table
+    etag, last_modified = collection_etag(
+        db, ["chemical_inventory"] + [INCLUDE_TABLES[name] for name in include],
+        current_user.role.value, skip, limit, include, fields
+    )
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
+    headers = cache_headers(etag, last_modified)
+    response.headers.update(headers)
+    
+    if not include:
+        # No relations to load: Core rows straight into dicts
+        rows = crud_chemical_inventory.get_chemical_rows(db, skip=skip, limit=limit, fields=fields)
+        return rows_response(rows, headers) if FAST_JSON else rows
     
     chemicals = crud_chemical_inventory.get_chemical_inventory(
         db=db, 
         skip=skip, 
         limit=limit, 
-        user_role=current_user.role
+        user_role=current_user.role,
+        include=include,
+        fields=fields
+    )
+    rows = [{**pick(chemical, fields), **_expansions(chemical, include)} for chemical in chemicals]
+    return rows_response(rows, headers) if FAST_JSON else rows
+
+@router.get("/low-stock", response_model=List[ChemicalInventoryResponse])
+def get_low_stock_chemicals(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get chemicals below their alert threshold"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_chemical_inventory.get_low_stock_chemicals(db, skip=skip, limit=limit)
+
+@router.get("/out-of-stock", response_model=List[ChemicalInventoryResponse])
+def get_out_of_stock_chemicals(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get depleted chemicals"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_chemical_inventory.get_out_of_stock_chemicals(db, skip=skip, limit=limit)
+
+@router.get("/stock-status", response_model=ChemicalStockStatusCounts)
+def get_stock_status_counts(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the number of chemicals per stock status"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_chemical_inventory.get_stock_status_counts(db)
+
+@router.get("/ledger/reconcile", response_model=List[StockReconciliationItem])
+def reconcile_stock_ledger(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List chemicals whose stored quantity disagrees with the stock ledger (Admin only)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return crud_stock_movements.reconcile_stock_balances(db)
+
+@router.get("/forecast", response_model=List[ChemicalForecastResponse])
+def get_chemical_forecasts(
+    below_reorder_point: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Usage rate, days of stock and reorder point per chemical, soonest stock-out first"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_chemical_forecasts.get_chemical_forecasts(
+        db, below_reorder_point=below_reorder_point, skip=skip, limit=limit
     )
-    return chemicals
 
-@router.get("/{chemical_id}", response_model=ChemicalInventoryWithFormulations)
+@router.post("/forecast/refresh", response_model=ForecastRefreshResult)
+def refresh_chemical_forecasts(
+    full: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Fold usage since the last refresh into the forecasts (Admin only; normally run by scripts/refresh_forecasts.py)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    return refresh_forecasts(db, full=full)
+
+@router.get("/{chemical_id}", response_model=ChemicalInventoryExpanded, response_model_exclude_unset=True)
 def get_chemical_inventory_by_id(
     chemical_id: int,
+    response: Response,
+    include: Optional[str] = Query(None, description=f"{INCLUDE_DESCRIPTION} (default: formulations)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -50,38 +249,49 @@ def get_chemical_inventory_by_id(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not approved"
         )
+    include = _parse_include(include) if include is not None else ["formulations"]
     
-    chemical = crud_chemical_inventory.get_chemical_inventory_by_id(
-        db=db, 
-        chemical_id=chemical_id, 
-        user_role=current_user.role
-    )
-    if not chemical:
+    def load_chemical():
+        chemical = crud_chemical_inventory.get_chemical_inventory_by_id(
+            db=db, 
+            chemical_id=chemical_id, 
+            user_role=current_user.role,
+            include=["formulations"]
+        )
+        if not chemical:
+            return None
+        
+        # Create response with formulation details
+        return {
+            **ChemicalInventoryResponse.model_validate(chemical).model_dump(mode="json"),
+            "formulation_details": [
+                FormulationDetailsResponse.model_validate(formulation).model_dump(mode="json")
+                for formulation in chemical.formulation_details
+            ]
+        }
+    
+    # The cached entry (chemical + formulations) is invalidated by chemical and formulation writes
+    chemical_response = chemical_detail_cache.get_or_load(str(chemical_id), load_chemical)
+    if not chemical_response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chemical inventory item not found"
         )
     
-    # Get formulation details
-    formulation_details = crud_formulation_details.get_formulation_details_by_chemical(
-        db=db, 
-        chemical_id=chemical_id
-    )
+    response.headers["ETag"] = f'"{chemical_response["version"]}"'
+    if include == ["formulations"]:
+        return chemical_response
     
-    # Create response with formulation details
-    response = ChemicalInventoryWithFormulations(
-        id=chemical.id,
-        name=chemical.name,
-        quantity=chemical.quantity,
-        unit=chemical.unit,
-        formulation=chemical.formulation,
-        notes=chemical.notes,
-        last_updated=chemical.last_updated,
-        updated_by=chemical.updated_by,
-        formulation_details=formulation_details
-    )
-    
-    return response
+    chemical_response = dict(chemical_response)
+    if "formulations" not in include:
+        del chemical_response["formulation_details"]
+    # User and purchase stats change without touching the chemical, so they are loaded fresh (one query)
+    extra = [name for name in include if name != "formulations"]
+    if extra:
+        chemical = crud_chemical_inventory.get_chemical_inventory_by_id(db=db, chemical_id=chemical_id, include=extra)
+        if chemical:
+            chemical_response.update(_expansions(chemical, extra))
+    return chemical_response
 
 @router.post("/", response_model=ChemicalInventoryResponse)
 def create_chemical_inventory(
@@ -113,35 +323,202 @@ def create_chemical_inventory(
 def update_chemical_inventory(
     chemical_id: int,
     chemical_update: ChemicalInventoryUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update a chemical inventory item"""
+    """Update a chemical inventory item (send If-Match with the ETag for optimistic concurrency)"""
     if not current_user.is_approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not approved"
         )
     
+    expected_version = _parse_if_match(if_match)
+    
     try:
         updated_chemical = crud_chemical_inventory.update_chemical_inventory(
             db=db,
             chemical_id=chemical_id,
             chemical_update=chemical_update,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            expected_version=expected_version
         )
         if not updated_chemical:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Chemical inventory item not found"
             )
+        response.headers["ETag"] = _etag(updated_chemical)
         return updated_chemical
     except PermissionError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
+    except crud_chemical_inventory.VersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(e)
+        )
+
+@router.post("/{chemical_id}/consume", response_model=ChemicalInventoryResponse)
+def consume_chemical_inventory(
+    chemical_id: int,
+    stock_change: ChemicalStockChange,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Atomically consume stock from a chemical inventory item"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    try:
+        updated_chemical = crud_chemical_inventory.consume_chemical_inventory(
+            db=db,
+            chemical_id=chemical_id,
+            stock_change=stock_change,
+            user_uid=current_user.uid,
+            user_role=current_user.role
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except crud_chemical_inventory.InsufficientStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not updated_chemical:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chemical inventory item not found"
+        )
+    response.headers["ETag"] = _etag(updated_chemical)
+    return updated_chemical
+
+@router.post("/{chemical_id}/receive", response_model=ChemicalInventoryResponse)
+def receive_chemical_inventory(
+    chemical_id: int,
+    stock_change: ChemicalStockChange,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Atomically receive stock into a chemical inventory item"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    try:
+        updated_chemical = crud_chemical_inventory.receive_chemical_inventory(
+            db=db,
+            chemical_id=chemical_id,
+            stock_change=stock_change,
+            user_uid=current_user.uid,
+            user_role=current_user.role
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    if not updated_chemical:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chemical inventory item not found"
+        )
+    response.headers["ETag"] = _etag(updated_chemical)
+    return updated_chemical
+
+@router.post("/{chemical_id}/transfer", response_model=ChemicalInventoryResponse)
+def transfer_chemical_inventory(
+    chemical_id: int,
+    transfer: ChemicalStockTransfer,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Atomically move stock from this chemical to another one"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    try:
+        source_chemical = crud_chemical_inventory.transfer_chemical_inventory(
+            db=db,
+            chemical_id=chemical_id,
+            transfer=transfer,
+            user_uid=current_user.uid,
+            user_role=current_user.role
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except crud_chemical_inventory.InsufficientStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not source_chemical:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chemical inventory item not found"
+        )
+    response.headers["ETag"] = _etag(source_chemical)
+    return source_chemical
+
+@router.get("/{chemical_id}/movements", response_model=List[StockMovementResponse])
+def get_stock_movements(
+    chemical_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the stock ledger for a chemical, newest first"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_stock_movements.get_stock_movements(db, chemical_id, skip=skip, limit=limit)
+
+@router.get("/{chemical_id}/quantity-as-of", response_model=StockBalanceAsOf)
+def get_quantity_as_of(
+    chemical_id: int,
+    as_of: datetime,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the quantity a chemical had at a point in time, replayed from the ledger"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_stock_movements.get_quantity_as_of(db, chemical_id, as_of)
 
 @router.post("/{chemical_id}/notes", response_model=ChemicalInventoryResponse)
 def add_note_to_chemical_inventory(
@@ -201,4 +578,9 @@ def delete_chemical_inventory(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
+        )
+    except crud_chemical_inventory.VersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
         ) 
\ No newline at end of file
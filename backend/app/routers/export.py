@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.firebase_auth import get_current_user, get_admin_user
+from app.models.user import User
+from app.crud import exports as crud_exports
+from app.services.exports import EXPORT_FORMATS, export_response
+from typing import Optional
+from datetime import datetime
+
+router = APIRouter()
+
+FORMAT_DESCRIPTION = f"Output format: {', '.join(EXPORT_FORMATS)}"
+
+def _check_format(export_format: str) -> str:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format: {export_format}. Allowed: {', '.join(EXPORT_FORMATS)}"
+        )
+    return export_format
+
+@router.get("/chemicals", response_class=StreamingResponse)
+def export_chemicals(
+    export_format: str = Query("csv", alias="format", description=FORMAT_DESCRIPTION),
+    stock_status: Optional[str] = Query(None, description="in_stock, low_stock or out_of_stock"),
+    name: Optional[str] = Query(None, description="Case-insensitive substring of the chemical name"),
+    updated_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the chemical inventory as CSV or NDJSON"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    stmt = crud_exports.chemical_export(stock_status=stock_status, name=name, updated_since=updated_since)
+    return export_response(stmt, _check_format(export_format), "chemicals")
+
+@router.get("/transactions", response_class=StreamingResponse)
+def export_transactions(
+    export_format: str = Query("csv", alias="format", description=FORMAT_DESCRIPTION),
+    chemical_id: Optional[int] = None,
+    transaction_type: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    supplier: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Transactions created on or after this time"),
+    end: Optional[datetime] = Query(None, description="Transactions created before this time"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream account transactions as CSV or NDJSON"""
+    stmt = crud_exports.transaction_export(
+        chemical_id=chemical_id, transaction_type=transaction_type, status=status_filter,
+        supplier=supplier, start=start, end=end
+    )
+    return export_response(stmt, _check_format(export_format), "transactions")
+
+@router.get("/purchase-orders", response_class=StreamingResponse)
+def export_purchase_orders(
+    export_format: str = Query("csv", alias="format", description=FORMAT_DESCRIPTION),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    supplier: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Orders dated on or after this time"),
+    end: Optional[datetime] = Query(None, description="Orders dated before this time"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream purchase orders as CSV or NDJSON, one row per order item"""
+    stmt = crud_exports.purchase_order_export(status=status_filter, supplier=supplier, start=start, end=end)
+    return export_response(stmt, _check_format(export_format), "purchase-orders")
+
+@router.get("/logs", response_class=StreamingResponse)
+def export_activity_logs(
+    export_format: str = Query("csv", alias="format", description=FORMAT_DESCRIPTION),
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="Logs on or after this time"),
+    end: Optional[datetime] = Query(None, description="Logs before this time"),
+    admin_user: User = Depends(get_admin_user)
+):
+    """Stream activity logs as CSV or NDJSON (Admin only)"""
+    stmt = crud_exports.activity_log_export(user_id=user_id, action=action, start=start, end=end)
+    return export_response(stmt, _check_format(export_format), "logs")
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.firebase_auth import get_current_user
 from app.models.user import User, UserRole
@@ -8,17 +8,23 @@ from app.schema.formulation_details import (
     FormulationDetailsCreate, 
     FormulationDetailsUpdate, 
     FormulationDetailsResponse,
-    FormulationDetailsAddNote
+    FormulationDetailsAddNote,
+    FormulationDetailsListItem,
+    FORMULATION_LIST_FIELDS
 )
 from app.crud import formulation_details as crud_formulation_details
+from app.services.fieldsets import parse_fields
+from app.services.collection_versions import collection_etag, cache_headers, is_not_modified
+from app.services.read_cache import formulation_detail_cache, chemical_formulations_cache
 
 router = APIRouter()
 
-@router.get("/", response_model=List[FormulationDetailsResponse])
+@router.get("/", response_model=List[FormulationDetailsListItem], response_model_exclude_unset=True)
 def get_formulation_details(
     skip: int = 0,
     limit: int = 100,
     chemical_id: int = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (default: all but notes)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -28,14 +34,18 @@ def get_formulation_details(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not approved"
         )
+    try:
+        fields = parse_fields(fields, list(FormulationDetailsResponse.model_fields), FORMULATION_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    formulations = crud_formulation_details.get_formulation_details(
+    return crud_formulation_details.get_formulation_rows(
         db=db, 
         skip=skip, 
         limit=limit, 
-        chemical_id=chemical_id
+        chemical_id=chemical_id,
+        fields=fields
     )
-    return formulations
 
 @router.get("/{formulation_id}", response_model=FormulationDetailsResponse)
 def get_formulation_details_by_id(
@@ -50,10 +60,14 @@ def get_formulation_details_by_id(
             detail="User not approved"
         )
     
-    formulation = crud_formulation_details.get_formulation_details_by_id(
-        db=db, 
-        formulation_id=formulation_id
-    )
+    def load_formulation():
+        formulation = crud_formulation_details.get_formulation_details_by_id(
+            db=db, 
+            formulation_id=formulation_id
+        )
+        return FormulationDetailsResponse.model_validate(formulation).model_dump(mode="json") if formulation else None
+    
+    formulation = formulation_detail_cache.get_or_load(str(formulation_id), load_formulation)
     if not formulation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,21 +78,31 @@ def get_formulation_details_by_id(
 @router.get("/chemical/{chemical_id}", response_model=List[FormulationDetailsResponse])
 def get_formulation_details_by_chemical(
     chemical_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all formulation details for a specific chemical"""
+    """Get all formulation details for a specific chemical (conditional GET via ETag / If-None-Match)"""
     if not current_user.is_approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not approved"
         )
     
-    formulations = crud_formulation_details.get_formulation_details_by_chemical(
-        db=db, 
-        chemical_id=chemical_id
-    )
-    return formulations
+    etag, last_modified = collection_etag(db, ["formulation_details"], chemical_id)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
+    response.headers.update(cache_headers(etag, last_modified))
+    
+    def load_formulations():
+        formulations = crud_formulation_details.get_formulation_details_by_chemical(
+            db=db, 
+            chemical_id=chemical_id
+        )
+        return [FormulationDetailsResponse.model_validate(f).model_dump(mode="json") for f in formulations]
+    
+    return chemical_formulations_cache.get_or_load(str(chemical_id), load_formulations)
 
 @router.post("/", response_model=FormulationDetailsResponse)
 def create_formulation_details(
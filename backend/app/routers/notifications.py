@@ -1,63 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.firebase_auth import get_current_user
+from app.firebase_auth import get_current_user, get_stream_user
+from app.models.user import User, UserRole
 from app.crud import notifications as crud_notifications
-from app.schema.notifications import NotificationCreate, NotificationResponse, NotificationUpdate, NotificationSend
-from typing import List
-import json
+from app.schema.notifications import (
+    NotificationCreate, NotificationResponse, NotificationUpdate, NotificationSend,
+    NotificationBulkAction, NotificationBulkResult, NotificationBatchResult, NotificationUnreadCount
+)
+from app.services.collection_versions import collection_etag, cache_headers, is_not_modified
+from app.services.notification_broker import broker, NOTIFICATION_STREAM_HEARTBEAT, NOTIFICATION_STREAM_RETRY_MS
+from app.services.json_responses import fast_json_enabled, rows_response
+from typing import List, Optional
+from datetime import datetime
+import asyncio
 
-router = APIRouter(prefix="/notifications", tags=["notifications"])
+FAST_JSON = fast_json_enabled("notifications")
+
+router = APIRouter()
 
 @router.post("/send", response_model=NotificationResponse)
 def send_notification(
     notification: NotificationSend,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Send a notification to specified recipients"""
     try:
-        # Create notification for each recipient role
-        notifications = []
-        for recipient_role in notification.recipients:
-            notification_data = NotificationCreate(
-                type=notification.type,
-                severity=notification.severity,
-                message=notification.message,
-                chemical_id=notification.chemical_id,
-                recipients=[recipient_role]
-            )
-            db_notification = crud_notifications.create_notification(
-                db, notification_data, current_user.get("uid")
-            )
-            notifications.append(db_notification)
+        # Stock alerts are deduplicated: repeats update the one active row per chemical
+        if notification.type in crud_notifications.STOCK_ALERT_SEVERITY and notification.chemical_id:
+            crud_notifications.upsert_stock_alerts(db, [{
+                "type": notification.type,
+                "severity": notification.severity,
+                "message": notification.message,
+                "chemical_id": notification.chemical_id,
+                "user_id": current_user.uid,
+                "recipients": notification.recipients
+            }])
+            db.commit()
+            return crud_notifications.get_active_stock_alert(db, notification.type, notification.chemical_id)
         
-        # Return the first notification (they're all the same except for recipients)
-        return notifications[0] if notifications else None
+        # One row for all recipient roles; read state is tracked per user
+        notification_data = NotificationCreate(
+            type=notification.type,
+            severity=notification.severity,
+            message=notification.message,
+            chemical_id=notification.chemical_id,
+            recipients=notification.recipients
+        )
+        return crud_notifications.create_notification(db, notification_data, current_user.uid)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to send notification: {str(e)}"
         )
 
+@router.post("/send/batch", response_model=NotificationBatchResult)
+def send_notifications_batch(
+    notifications: List[NotificationSend],
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Send many notifications in one transaction (one INSERT for rows, one for recipients)"""
+    stock_alerts, others = [], []
+    for n in notifications:
+        is_stock_alert = n.type in crud_notifications.STOCK_ALERT_SEVERITY and n.chemical_id
+        (stock_alerts if is_stock_alert else others).append(n)
+    try:
+        inserted, updated = crud_notifications.upsert_stock_alerts(db, [
+            {
+                "type": n.type,
+                "severity": n.severity,
+                "message": n.message,
+                "chemical_id": n.chemical_id,
+                "user_id": current_user.uid,
+                "recipients": n.recipients
+            }
+            for n in stock_alerts
+        ])
+        if others:
+            inserted += crud_notifications.create_notifications(db, [
+                NotificationCreate(
+                    type=n.type,
+                    severity=n.severity,
+                    message=n.message,
+                    chemical_id=n.chemical_id,
+                    recipients=n.recipients
+                )
+                for n in others
+            ], current_user.uid)
+        else:
+            db.commit()
+        return {"created": len(inserted), "updated": len(updated), "ids": inserted + updated}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to send notifications: {str(e)}"
+        )
+
 @router.get("/", response_model=List[NotificationResponse])
 def get_notifications(
     skip: int = 0,
     limit: int = 100,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get notifications for the current user's role"""
     try:
-        # Get user role from the database
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        user_role = user_info.role if user_info else "all_users"
-        
-        notifications = crud_notifications.get_notifications(
-            db, skip=skip, limit=limit, user_role=user_role
+        notifications = crud_notifications.get_notification_rows(
+            db, current_user.role, current_user.uid, skip=skip, limit=limit
         )
-        return notifications
+        return rows_response(notifications) if FAST_JSON else notifications
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -66,17 +121,18 @@ def get_notifications(
 
 @router.get("/unread", response_model=List[NotificationResponse])
 def get_unread_notifications(
-    current_user: dict = Depends(get_current_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    since: Optional[datetime] = Query(None, description="Only notifications created after this time"),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get unread notifications for the current user's role"""
     try:
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        user_role = user_info.role if user_info else "all_users"
-        
-        notifications = crud_notifications.get_unread_notifications(db, user_role)
-        return notifications
+        notifications = crud_notifications.get_notification_rows(
+            db, current_user.role, current_user.uid, skip=skip, limit=limit, since=since, unread=True
+        )
+        return rows_response(notifications) if FAST_JSON else notifications
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -85,31 +141,136 @@ def get_unread_notifications(
 
 @router.get("/active", response_model=List[NotificationResponse])
 def get_active_notifications(
-    current_user: dict = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    since: Optional[datetime] = Query(None, description="Only notifications created after this time"),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get active (non-dismissed) notifications for the current user's role"""
+    """Get active (non-dismissed) notifications for the current user's role (conditional GET via ETag)"""
+    # Dismissals are per user, so the ETag covers receipts and varies by user
+    etag, last_modified = collection_etag(
+        db, ["notifications", "notification_recipients", "notification_receipts"],
+        current_user.uid, current_user.role.value, skip, limit, since
+    )
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
+    headers = cache_headers(etag, last_modified)
+    response.headers.update(headers)
+    
     try:
-        from app.crud import users as crud_users
-        user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-        user_role = user_info.role if user_info else "all_users"
-        
-        notifications = crud_notifications.get_active_notifications(db, user_role)
-        return notifications
+        notifications = crud_notifications.get_notification_rows(
+            db, current_user.role, current_user.uid, skip=skip, limit=limit, since=since, active=True
+        )
+        return rows_response(notifications, headers) if FAST_JSON else notifications
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch active notifications: {str(e)}"
         )
 
+@router.get("/unread-count", response_model=NotificationUnreadCount)
+def get_unread_count(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Number of unread notifications for the current user (no rows loaded)"""
+    return {"unread": crud_notifications.count_unread_notifications(db, current_user.role, current_user.uid)}
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_stream_user)
+):
+    """Server-Sent Events stream of notification changes for the current user's role.
+
+    Events: `notification` (created or updated), `resolved`, `deleted`, and `resync`
+    when the client missed more than the replay buffer holds and should refetch.
+    Reconnecting clients get everything after their Last-Event-ID replayed.
+    """
+    role = current_user.role.value
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    async def event_stream():
+        subscriber = broker.subscribe(role, resume_from)
+        try:
+            yield f"retry: {NOTIFICATION_STREAM_RETRY_MS}\n\n"
+            while True:
+                if subscriber.lagged:
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.lagged = False
+                    subscriber.last_id = broker.last_event_id
+                    yield f"id: {subscriber.last_id}\nevent: resync\ndata: {{}}\n\n"
+                    continue
+                try:
+                    notification_event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=NOTIFICATION_STREAM_HEARTBEAT
+                    )
+                    yield notification_event.encode()
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/read-all")
+def mark_all_notifications_read(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark every notification for the current user's role as read"""
+    last_read_id = crud_notifications.mark_all_notifications_read(db, current_user.uid, current_user.role)
+    return {"message": "All notifications marked as read", "last_read_id": last_read_id}
+
+def _require_bulk_criteria(action: NotificationBulkAction):
+    if not action.has_criteria():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids or at least one filter (type, chemical_id, before); use /read-all to mark everything"
+        )
+
+@router.post("/bulk/read", response_model=NotificationBulkResult)
+def bulk_mark_read(
+    action: NotificationBulkAction,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark notifications read by id list or filter in one statement"""
+    _require_bulk_criteria(action)
+    updated = crud_notifications.bulk_update_receipts(db, action, current_user.uid, current_user.role)
+    return {"updated": updated}
+
+@router.post("/bulk/dismiss", response_model=NotificationBulkResult)
+def bulk_dismiss(
+    action: NotificationBulkAction,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Dismiss notifications by id list or filter in one statement"""
+    _require_bulk_criteria(action)
+    updated = crud_notifications.bulk_update_receipts(db, action, current_user.uid, current_user.role, dismiss=True)
+    return {"updated": updated}
+
 @router.get("/{notification_id}", response_model=NotificationResponse)
 def get_notification(
     notification_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific notification by ID"""
-    notification = crud_notifications.get_notification(db, notification_id)
+    notification = crud_notifications.get_notification(db, notification_id, current_user.uid)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,11 +282,11 @@ def get_notification(
 def update_notification(
     notification_id: int,
     notification_update: NotificationUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Update a notification"""
-    notification = crud_notifications.update_notification(db, notification_id, notification_update)
+    """Update the current user's read/dismissed state for a notification"""
+    notification = crud_notifications.update_notification(db, notification_id, notification_update, current_user.uid)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,11 +297,11 @@ def update_notification(
 @router.post("/{notification_id}/dismiss", response_model=NotificationResponse)
 def dismiss_notification(
     notification_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Dismiss a notification"""
-    notification = crud_notifications.dismiss_notification(db, notification_id)
+    """Dismiss a notification for the current user"""
+    notification = crud_notifications.dismiss_notification(db, notification_id, current_user.uid)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,11 +312,11 @@ def dismiss_notification(
 @router.post("/{notification_id}/read", response_model=NotificationResponse)
 def mark_notification_read(
     notification_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Mark a notification as read"""
-    notification = crud_notifications.mark_notification_read(db, notification_id)
+    """Mark a notification as read for the current user"""
+    notification = crud_notifications.mark_notification_read(db, notification_id, current_user.uid)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -166,14 +327,12 @@ def mark_notification_read(
 @router.delete("/{notification_id}")
 def delete_notification(
     notification_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a notification (admin only)"""
     # Check if user is admin
-    from app.crud import users as crud_users
-    user_info = crud_users.get_user_by_uid(db, current_user.get("uid"))
-    if not user_info or user_info.role != "admin":
+    if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can delete notifications"
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
+from typing import Any, Dict, Optional, List
+from datetime import date, datetime
 
 # Account Transaction Schemas
 class AccountTransactionBase(BaseModel):
@@ -48,7 +48,7 @@ class PurchaseOrderItemBase(BaseModel):
     notes: Optional[str] = None
 
 class PurchaseOrderItemCreate(PurchaseOrderItemBase):
-    pass
+    total_price: Optional[float] = None  # Ignored: priced as quantity * unit_price
 
 class PurchaseOrderItemResponse(PurchaseOrderItemBase):
     id: int
@@ -67,11 +67,11 @@ class PurchaseOrderBase(BaseModel):
     notes: Optional[str] = None
 
 class PurchaseOrderCreate(PurchaseOrderBase):
+    total_amount: Optional[float] = None  # Ignored: summed from the items
     items: List[PurchaseOrderItemCreate]
 
 class PurchaseOrderUpdate(BaseModel):
     supplier: Optional[str] = None
-    total_amount: Optional[float] = None
     currency: Optional[str] = None
     expected_delivery: Optional[datetime] = None
     status: Optional[str] = None
@@ -100,11 +100,57 @@ class AccountSummary(BaseModel):
     total_spent_this_year: float
     currency: str = "USD"
 
+class SpendTrendPoint(BaseModel):
+    period: date  # First day of the month
+    currency: str
+    total_spent: float
+    transaction_count: int
+
 class ChemicalPurchaseHistory(BaseModel):
     chemical_id: int
     chemical_name: str
     total_purchased: float
     total_spent: float
+    purchase_count: int = 0
     last_purchase_date: Optional[datetime] = None
     average_unit_price: float
-    currency: str = "USD" 
\ No newline at end of file
+    currency: str = "USD"
+
+class TransactionAnalyticsResult(BaseModel):
+    rows: List[Dict[str, Any]]
+    matched_transactions: int
+    loaded_transactions: int
+    elapsed_ms: float
+
+class ReplenishmentLine(BaseModel):
+    chemical_id: int
+    name: str
+    unit: str
+    pack_size: float
+    quantity: float
+    unit_price: float  # Last price paid to this supplier
+    total_price: float
+    lead_time_days: float
+
+class ReplenishmentOrder(BaseModel):
+    order_id: Optional[int] = None  # None on a dry run
+    order_number: Optional[str] = None
+    supplier: str
+    currency: str
+    total_amount: float
+    topped_up: bool  # Extra packs were added to reach the minimum order value
+    expected_delivery: datetime
+    items: List[ReplenishmentLine]
+
+class ReplenishmentSkip(BaseModel):
+    chemical_id: int
+    name: str
+    reason: str
+
+class ReplenishmentResult(BaseModel):
+    status: str
+    dry_run: bool
+    orders: List[ReplenishmentOrder] = []
+    skipped: List[ReplenishmentSkip] = []
+    elapsed_ms: float = 0
+    reason: Optional[str] = None  # Why the run was skipped
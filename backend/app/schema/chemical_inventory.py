@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from app.models.user import UserRole
 
 # Base schema
@@ -10,6 +10,8 @@ class ChemicalInventoryBase(BaseModel):
     unit: str = Field(..., min_length=1, max_length=50)
     formulation: Optional[str] = None
     notes: Optional[str] = None
+    alert_threshold: float = Field(10.0, ge=0)
+    pack_size: Optional[float] = Field(None, gt=0)
 
 # Create schema
 class ChemicalInventoryCreate(ChemicalInventoryBase):
@@ -22,20 +24,40 @@ class ChemicalInventoryUpdate(BaseModel):
     unit: Optional[str] = Field(None, min_length=1, max_length=50)
     formulation: Optional[str] = None
     notes: Optional[str] = None
+    alert_threshold: Optional[float] = Field(None, ge=0)
+    pack_size: Optional[float] = Field(None, gt=0)
 
 # Add note schema (for appending notes)
 class ChemicalInventoryAddNote(BaseModel):
     note: str = Field(..., min_length=1)
 
+# Stock change schema (for atomic consume/receive)
+class ChemicalStockChange(BaseModel):
+    amount: float = Field(..., gt=0)
+    note: Optional[str] = None
+
+# Stock transfer schema (moves stock between two chemical items)
+class ChemicalStockTransfer(ChemicalStockChange):
+    target_chemical_id: int
+
 # Response schema
 class ChemicalInventoryResponse(ChemicalInventoryBase):
     id: int
     last_updated: datetime
     updated_by: Optional[str] = None
+    version: int = 1
+    stock_status: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+# Stock status counts for dashboards
+class ChemicalStockStatusCounts(BaseModel):
+    in_stock: int = 0
+    low_stock: int = 0
+    out_of_stock: int = 0
+    total: int = 0
+
 # Response with formulation details
 class ChemicalInventoryWithFormulations(ChemicalInventoryResponse):
     formulation_details: List["FormulationDetailsResponse"] = []
@@ -44,4 +66,77 @@ class ChemicalInventoryWithFormulations(ChemicalInventoryResponse):
         from_attributes = True
 
 # Import for forward reference
-from app.schema.formulation_details import FormulationDetailsResponse 
\ No newline at end of file
+from app.schema.formulation_details import FormulationDetailsResponse
+
+# include= expansions (GET /chemicals/ and /chemicals/{id})
+class ChemicalUpdatedByUser(BaseModel):
+    uid: str
+    email: str
+    first_name: str
+    last_name: Optional[str] = None
+    role: UserRole
+    
+    class Config:
+        from_attributes = True
+
+class ChemicalPurchaseStatsSummary(BaseModel):
+    total_quantity: float = 0.0
+    total_spent: float = 0.0
+    purchase_count: int = 0
+    average_unit_price: float = 0.0
+    last_purchase_date: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Expansion fields are only present when requested
+class ChemicalInventoryExpanded(ChemicalInventoryResponse):
+    formulation_details: Optional[List[FormulationDetailsResponse]] = None
+    updated_by_user: Optional[ChemicalUpdatedByUser] = None
+    purchase_stats: Optional[ChemicalPurchaseStatsSummary] = None
+
+# Fields the list endpoint returns unless fields= asks otherwise (the Text columns can be large)
+CHEMICAL_LIST_FIELDS = [name for name in ChemicalInventoryResponse.model_fields if name not in ("formulation", "notes")]
+
+# List row: only the fields that were selected (fields=) are present
+class ChemicalInventoryListItem(BaseModel):
+    id: int
+    name: Optional[str] = None
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    formulation: Optional[str] = None
+    notes: Optional[str] = None
+    alert_threshold: Optional[float] = None
+    pack_size: Optional[float] = None
+    last_updated: Optional[datetime] = None
+    updated_by: Optional[str] = None
+    version: Optional[int] = None
+    stock_status: Optional[str] = None
+    formulation_details: Optional[List[FormulationDetailsResponse]] = None
+    updated_by_user: Optional[ChemicalUpdatedByUser] = None
+    purchase_stats: Optional[ChemicalPurchaseStatsSummary] = None
+
+# Consumption forecast (see app/services/forecasting.py)
+class ChemicalForecastResponse(BaseModel):
+    chemical_id: int
+    name: str
+    unit: str
+    quantity: float
+    daily_usage: float
+    usage_stddev: float
+    lead_time_days: float
+    safety_stock: float
+    reorder_point: float
+    days_of_stock: Optional[float] = None  # None when the chemical is not being used
+    stockout_date: Optional[date] = None
+    below_reorder_point: bool
+    computed_through: date
+
+class ForecastRefreshResult(BaseModel):
+    status: str
+    mode: Optional[str] = None
+    chemicals: int = 0
+    days_folded: int = 0
+    through: Optional[date] = None
+    elapsed_ms: float = 0
+    reason: Optional[str] = None
@@ -36,4 +36,20 @@ class FormulationDetailsResponse(FormulationDetailsBase):
     updated_by: Optional[str] = None
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+# Fields the list endpoint returns unless fields= asks otherwise (notes can be large)
+FORMULATION_LIST_FIELDS = [name for name in FormulationDetailsResponse.model_fields if name != "notes"]
+
+# List row: only the fields that were selected (fields=) are present
+class FormulationDetailsListItem(BaseModel):
+    id: int
+    chemical_id: Optional[int] = None
+    component_name: Optional[str] = None
+    amount: Optional[float] = None
+    unit: Optional[str] = None
+    available_quantity: Optional[float] = None
+    required_quantity: Optional[float] = None
+    notes: Optional[str] = None
+    last_updated: Optional[datetime] = None
+    updated_by: Optional[str] = None
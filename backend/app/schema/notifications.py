@@ -18,6 +18,7 @@ class NotificationResponse(NotificationBase):
     timestamp: datetime
     is_read: bool
     is_dismissed: bool
+    resolved_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -32,4 +33,25 @@ class NotificationSend(BaseModel):
     message: str
     chemical_id: Optional[int] = None
     timestamp: Optional[datetime] = None
-    recipients: List[str] = ['admin', 'product'] 
\ No newline at end of file
+    recipients: List[str] = ['admin', 'product'] 
+
+class NotificationBulkAction(BaseModel):
+    """Select notifications by id list and/or filters; at least one must be given"""
+    ids: Optional[List[int]] = None
+    type: Optional[str] = None
+    chemical_id: Optional[int] = None
+    before: Optional[datetime] = None
+
+    def has_criteria(self) -> bool:
+        return any(value is not None for value in (self.ids, self.type, self.chemical_id, self.before))
+
+class NotificationBulkResult(BaseModel):
+    updated: int
+
+class NotificationBatchResult(BaseModel):
+    created: int
+    updated: int = 0  # Active stock alerts whose message was replaced
+    ids: List[int]
+
+class NotificationUnreadCount(BaseModel):
+    unread: int
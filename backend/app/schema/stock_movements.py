@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class StockMovementResponse(BaseModel):
+    id: int
+    chemical_id: int
+    movement_type: str
+    quantity_delta: float
+    counterparty_chemical_id: Optional[int] = None
+    note: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class StockBalanceAsOf(BaseModel):
+    chemical_id: int
+    as_of: datetime
+    quantity: float
+    replayed_movements: int
+
+class StockReconciliationItem(BaseModel):
+    chemical_id: int
+    name: str
+    materialized_quantity: float
+    ledger_quantity: float
+    difference: float
@@ -0,0 +1,163 @@
+import os
+import json
+import asyncio
+import logging
+from typing import List, Optional
+from sqlalchemy.engine import Engine
+from app.services import collection_versions
+from app.services.read_cache import CACHES, chemical_cache_keys, formulation_cache_keys
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_ENABLED = os.getenv("CHANGE_FEED_ENABLED", "true").lower() == "true"
+CHANGE_FEED_CHANNEL = "table_changes"
+# Seconds to wait before reconnecting a dropped listener connection
+CHANGE_FEED_RECONNECT_DELAY = float(os.getenv("CHANGE_FEED_RECONNECT_DELAY", 5))
+
+# Tables whose row changes are broadcast to every worker. collection_versions is bumped after
+# the data commits, so its own change is what tells workers the memoized version is final
+FEED_TABLES = ["chemical_inventory", "formulation_details", "users", "notifications", "collection_versions"]
+
+NOTIFY_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+    PERFORM pg_notify('{CHANGE_FEED_CHANNEL}', json_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'id', row_data->'id',
+        'chemical_id', row_data->'chemical_id',
+        'name', row_data->'name'
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+def _missing_triggers(connection) -> List[str]:
+    """FEED_TABLES without a change feed trigger (installed by scripts/migrate_change_feed.py)"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tgname FROM pg_trigger WHERE tgname = ANY(%s)",
+                       ([f"{table}_change_feed" for table in FEED_TABLES],))
+        installed = {row[0] for row in cursor.fetchall()}
+    return [table for table in FEED_TABLES if f"{table}_change_feed" not in installed]
+
+def apply_change(change: dict) -> None:
+    """Evict whatever this worker holds for a changed row"""
+    table = change.get("table")
+    row_id = change.get("id")
+    if table == "collection_versions":
+        collection_versions.forget_collection_versions([change.get("name")])
+        return
+    collection_versions.forget_collection_versions([table])
+
+    if row_id is None:
+        return
+    if table == "chemical_inventory":
+        entries = chemical_cache_keys(row_id)
+    elif table == "formulation_details":
+        entries = formulation_cache_keys(row_id, change.get("chemical_id"))
+    else:
+        return
+    # Local only: this runs on the event loop, and the writing worker bumped the Redis generation at commit
+    for cache, key in entries:
+        cache.evict_local(key)
+
+def _reset_local_state() -> None:
+    """Drop everything cached in-process (used when notifications may have been missed)"""
+    collection_versions.forget_collection_versions()
+    for cache in CACHES:
+        cache.clear_local()
+
+class ChangeFeedListener:
+    """LISTENs on the change channel with a dedicated psycopg2 connection on the event loop"""
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._task: Optional[asyncio.Task] = None
+        self._connection = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._close()
+
+    def _close(self) -> None:
+        collection_versions.disable_version_memo()
+        if self._connection is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._connection.fileno())
+            except Exception:
+                pass
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+        connection = psycopg2.connect(self.dsn)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANGE_FEED_CHANNEL}")
+        return connection
+
+    def _drain(self, lost: asyncio.Future) -> None:
+        try:
+            self._connection.poll()
+        except Exception as e:
+            if not lost.done():
+                lost.set_exception(e)
+            return
+        while self._connection.notifies:
+            notify = self._connection.notifies.pop(0)
+            try:
+                apply_change(json.loads(notify.payload))
+            except Exception as e:
+                logger.warning(f"⚠️ Change feed: could not apply {notify.payload!r}: {e}")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self._connection = await loop.run_in_executor(None, self._connect)
+                missing = await loop.run_in_executor(None, _missing_triggers, self._connection)
+                if missing:
+                    # Without triggers nothing is ever notified, so memoized versions would never refresh
+                    logger.warning(f"⚠️ Change feed disabled: no trigger on {', '.join(missing)}. "
+                                   f"Run scripts/migrate_change_feed.py")
+                    self._close()
+                    return
+                # Anything cached before (re)connecting may have missed notifications
+                _reset_local_state()
+                collection_versions.enable_version_memo(set(FEED_TABLES))
+                logger.info(f"✅ Change feed listening on '{CHANGE_FEED_CHANNEL}'")
+
+                lost = loop.create_future()
+                loop.add_reader(self._connection.fileno(), self._drain, lost)
+                await lost
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Change feed connection lost: {e}. Reconnecting in {CHANGE_FEED_RECONNECT_DELAY}s")
+            self._close()
+            _reset_local_state()
+            await asyncio.sleep(CHANGE_FEED_RECONNECT_DELAY)
+
+def listener_dsn(engine: Engine) -> Optional[str]:
+    """libpq DSN for the engine, or None when the database is not PostgreSQL"""
+    if engine.dialect.name != "postgresql":
+        return None
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi import Request
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.collection_versions import CollectionVersion
+
+logger = logging.getLogger(__name__)
+
+# Tables whose writes bump a collection version (read endpoints build ETags from these)
+VERSIONED_TABLES = {
+    "chemical_inventory",
+    "formulation_details",
+    "users",
+    "chemical_purchase_stats",
+    "notifications",
+    "notification_recipients",
+    "notification_receipts",
+}
+
+# Session.info key collecting versioned tables written in the current transaction
+TOUCHED_TABLES_KEY = "touched_collections"
+# Session.info key holding the touched tables between before_commit and after_commit
+COMMITTED_TABLES_KEY = "committed_collections"
+
+# In-process memo of version rows, only used for tables a live change feed reports on
+_memo_lock = threading.Lock()
+_memo: Dict[str, tuple] = {}
+_memo_generation = 0
+_memo_tables: Set[str] = set()
+
+def enable_version_memo(tables: Set[str]) -> None:
+    """Memoize versions of these tables; the caller must forget them on every change"""
+    global _memo_tables
+    with _memo_lock:
+        _memo_tables = set(tables)
+    forget_collection_versions()
+
+def disable_version_memo() -> None:
+    enable_version_memo(set())
+
+def forget_collection_versions(names: Optional[List[str]] = None) -> None:
+    """Drop memoized versions (all of them when names is None)"""
+    global _memo_generation
+    with _memo_lock:
+        _memo_generation += 1
+        if names is None:
+            _memo.clear()
+        else:
+            for name in names:
+                _memo.pop(name, None)
+
+def _touch(session: Session, table_name: Optional[str]) -> None:
+    if table_name in VERSIONED_TABLES:
+        session.info.setdefault(TOUCHED_TABLES_KEY, set()).add(table_name)
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_objects(session: Session, flush_context) -> None:
+    for instance in chain(session.new, session.dirty, session.deleted):
+        _touch(session, getattr(instance, "__tablename__", None))
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state) -> None:
+    # Bulk query.update()/delete() and Core insert/update/delete bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        _touch(orm_execute_state.session, getattr(table, "name", None))
+
+@event.listens_for(Session, "before_commit")
+def _collect_touched_tables(session: Session) -> None:
+    # Flush first so objects still pending at commit time are counted
+    session.flush()
+    touched = session.info.pop(TOUCHED_TABLES_KEY, None)
+    if touched:
+        session.info.setdefault(COMMITTED_TABLES_KEY, set()).update(touched)
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_versions(session: Session) -> None:
+    committed = session.info.pop(COMMITTED_TABLES_KEY, None)
+    if not committed:
+        return
+    try:
+        bump_collection_versions(session.get_bind(), sorted(committed))
+    except Exception as e:
+        # The write itself is committed; clients revalidate against the old ETag until the next bump
+        logger.error(f"❌ Could not bump collection versions {sorted(committed)}: {e}")
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_touched_tables(session: Session, previous_transaction) -> None:
+    session.info.pop(TOUCHED_TABLES_KEY, None)
+    session.info.pop(COMMITTED_TABLES_KEY, None)
+
+def bump_collection_versions(bind, names: List[str]) -> None:
+    """Increment the version of each collection in its own short transaction.
+
+    Runs after the writing transaction has committed, so stock writes never queue
+    on the version rows. Readers may briefly see new rows under the old ETag, which
+    only costs one extra full response. Rows are locked in sorted order.
+    """
+    stmt = pg_insert(CollectionVersion).values([{"name": name, "version": 1} for name in names])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CollectionVersion.name],
+        set_={"version": CollectionVersion.version + 1, "updated_at": func.now()}
+    )
+    if isinstance(bind, Engine):
+        with bind.begin() as connection:
+            connection.execute(stmt)
+    else:
+        # Session bound to a caller-managed connection: the caller owns the transaction
+        bind.execute(stmt)
+
+def _load_versions(db: Session, names: List[str]) -> Dict[str, tuple]:
+    """(version, updated_at) per collection; collections never written are (0, None)"""
+    with _memo_lock:
+        memoizable = set(names) <= _memo_tables
+        generation = _memo_generation
+        if memoizable and all(name in _memo for name in names):
+            return {name: _memo[name] for name in names}
+    
+    versions = {name: (0, None) for name in names}
+    for row in db.query(CollectionVersion.name, CollectionVersion.version, CollectionVersion.updated_at).filter(
+        CollectionVersion.name.in_(names)
+    ):
+        versions[row.name] = (row.version, row.updated_at)
+    
+    if memoizable:
+        with _memo_lock:
+            # Skip if a change arrived while we were reading
+            if generation == _memo_generation:
+                _memo.update(versions)
+    return versions
+
+def collection_etag(db: Session, names: List[str], *variant) -> Tuple[str, Optional[datetime]]:
+    """Weak ETag and Last-Modified for a response built from the given collections.
+
+    `variant` holds whatever else shapes the representation (role, paging, ...).
+    """
+    versions = _load_versions(db, names)
+    token = ".".join(str(versions[name][0]) for name in names)
+    if variant:
+        token += "-" + hashlib.sha1(repr(variant).encode()).hexdigest()[:12]
+    last_modified = max((updated_at for _, updated_at in versions.values() if updated_at), default=None)
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return f'W/"{token}"', last_modified
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the current version"""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        return _strip_weak(etag) in {_strip_weak(tag) for tag in if_none_match.split(",")}
+    
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
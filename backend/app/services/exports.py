@@ -0,0 +1,71 @@
+import os
+import csv
+import io
+import logging
+from datetime import datetime, timezone
+from typing import Iterator, List, Sequence
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+from app.services.json_responses import ORJSON_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip; also one streamed chunk. Worker memory is bounded by this, not the export size
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def encode_rows(names: List[str], rows: Sequence, export_format: str, header: bool = False) -> bytes:
+    """CSV lines (optionally preceded by the header row) or NDJSON lines for a batch of rows"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(names)
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        return buffer.getvalue().encode("utf-8")
+    return b"".join(orjson.dumps(dict(zip(names, row)), option=ORJSON_OPTIONS) + b"\n" for row in rows)
+
+def export_chunks(db: Session, stmt: Select, export_format: str) -> Iterator[bytes]:
+    """Encode a select as CSV (with a header row) or NDJSON, one chunk per batch of rows.
+
+    yield_per streams the result: a server-side cursor on PostgreSQL, so only one batch
+    of rows is held in memory at a time.
+    """
+    result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    names = list(result.keys())
+    header = export_format == "csv"
+    for batch in result.partitions():
+        yield encode_rows(names, batch, export_format, header)
+        header = False
+    if header:
+        # No rows: a CSV export is still a header line
+        yield encode_rows(names, [], export_format, header)
+
+def _stream(stmt: Select, export_format: str) -> Iterator[bytes]:
+    # The response outlives the request's get_db session, so the export reads on its own
+    db = SessionLocal()
+    try:
+        yield from export_chunks(db, stmt, export_format)
+    except Exception:
+        logger.exception("Export failed mid-stream")
+        raise
+    finally:
+        db.close()
+
+def export_response(stmt: Select, export_format: str, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        _stream(stmt, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    )
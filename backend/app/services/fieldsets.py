@@ -0,0 +1,26 @@
+from typing import Collection, Iterable, List, Optional
+from sqlalchemy.orm import load_only
+
+def parse_fields(fields: Optional[str], allowed: Collection[str], default: Iterable[str]) -> List[str]:
+    """Column names for a fields= parameter (comma-separated), always including id.
+
+    Omitted fields= means `default`. Raises ValueError naming any unknown field.
+    """
+    if fields is None:
+        names = set(default)
+    else:
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = names - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    names.add("id")
+    # Keep the schema's field order so responses look the same whatever order was asked for
+    return [name for name in allowed if name in names]
+
+def load_only_columns(model, fields: Iterable[str]):
+    """Loader option that selects just these columns (everything else stays deferred)"""
+    return load_only(*(getattr(model, name) for name in fields))
+
+def pick(obj, fields: Iterable[str]) -> dict:
+    """The given attributes of a loaded row; never touches deferred columns"""
+    return {name: getattr(obj, name) for name in fields}
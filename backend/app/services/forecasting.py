@@ -0,0 +1,225 @@
+import os
+import time
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+import numpy as np
+from sqlalchemy import Integer, cast, extract, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.stock_movements import StockMovement
+from app.models.account_transactions import AccountTransaction
+from app.models.chemical_forecasts import ChemicalForecast
+
+logger = logging.getLogger(__name__)
+
+# Days of history folded in on a full refresh (and the longest gap an incremental refresh will bridge)
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", 180))
+# A day's usage counts half as much after this many days
+FORECAST_HALFLIFE_DAYS = float(os.getenv("FORECAST_HALFLIFE_DAYS", 14))
+# Used for chemicals without a delivered purchase to learn from
+FORECAST_DEFAULT_LEAD_TIME_DAYS = float(os.getenv("FORECAST_DEFAULT_LEAD_TIME_DAYS", 14))
+# Safety stock in standard deviations of lead-time demand (1.65 ~ 95% cycle service level)
+FORECAST_SERVICE_LEVEL_Z = float(os.getenv("FORECAST_SERVICE_LEVEL_Z", 1.65))
+# Daily usage below this is treated as none (the decayed average never reaches 0 on its own)
+FORECAST_MIN_DAILY_USAGE = float(os.getenv("FORECAST_MIN_DAILY_USAGE", 1e-6))
+# Stock-outs further out than this are reported without a date
+FORECAST_HORIZON_DAYS = int(os.getenv("FORECAST_HORIZON_DAYS", 3650))
+# Where consumption is read from: 'ledger' (consume stock movements) and/or 'transactions' ('usage' account transactions)
+FORECAST_USAGE_SOURCES = {
+    source.strip() for source in os.getenv("FORECAST_USAGE_SOURCES", "ledger,transactions").split(",") if source.strip()
+}
+
+UPSERT_BATCH = 2000
+# Serializes refreshes across workers/cron (folding the same days twice would double-count them)
+REFRESH_LOCK_ID = 4_204_201
+
+EPOCH = date(1970, 1, 1)
+SECONDS_PER_DAY = literal_column("86400")
+
+def _day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+def _day_start(day_number: int) -> datetime:
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(days=day_number)
+
+def _day_of(column):
+    """UTC day number of a timestamp column"""
+    return cast(func.floor(extract("epoch", column) / SECONDS_PER_DAY), Integer)
+
+def _daily_usage(db: Session, first_day: int, last_day: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(chemical_id, day number, quantity consumed) per chemical and day in [first_day, last_day]"""
+    start, end = _day_start(first_day), _day_start(last_day + 1)
+    queries = []
+    if "ledger" in FORECAST_USAGE_SOURCES:
+        day = _day_of(StockMovement.created_at)
+        queries.append(
+            select(StockMovement.chemical_id, day, func.sum(-StockMovement.quantity_delta))
+            .where(
+                StockMovement.movement_type == "consume",
+                StockMovement.created_at >= start,
+                StockMovement.created_at < end
+            )
+            .group_by(StockMovement.chemical_id, day)
+        )
+    if "transactions" in FORECAST_USAGE_SOURCES:
+        day = _day_of(AccountTransaction.created_at)
+        queries.append(
+            select(AccountTransaction.chemical_id, day, func.sum(AccountTransaction.quantity))
+            .where(
+                AccountTransaction.transaction_type == "usage",
+                AccountTransaction.created_at >= start,
+                AccountTransaction.created_at < end
+            )
+            .group_by(AccountTransaction.chemical_id, day)
+        )
+
+    rows = [row for query in queries for row in db.execute(query).all()]
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64)
+    chemical_ids, days, quantities = zip(*rows)
+    return np.array(chemical_ids, np.int64), np.array(days, np.int64), np.array(quantities, np.float64)
+
+def _lead_times(db: Session) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean delivery_date - purchase_date (days) per chemical over delivered purchases"""
+    lead_days = (extract("epoch", AccountTransaction.delivery_date) - extract("epoch", AccountTransaction.purchase_date)) / SECONDS_PER_DAY
+    rows = db.execute(
+        select(AccountTransaction.chemical_id, func.avg(lead_days))
+        .where(
+            AccountTransaction.transaction_type == "purchase",
+            AccountTransaction.delivery_date.isnot(None),
+            AccountTransaction.purchase_date.isnot(None),
+            AccountTransaction.delivery_date >= AccountTransaction.purchase_date
+        )
+        .group_by(AccountTransaction.chemical_id)
+    ).all()
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.float64)
+    chemical_ids, leads = zip(*rows)
+    return np.array(chemical_ids, np.int64), np.array(leads, np.float64)
+
+def _positions(sorted_ids: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Row index of each id in sorted_ids, and which ids were found at all"""
+    positions = np.searchsorted(sorted_ids, ids)
+    clipped = np.minimum(positions, max(len(sorted_ids) - 1, 0))
+    found = (positions < len(sorted_ids)) & (sorted_ids[clipped] == ids) if len(sorted_ids) else np.zeros(len(ids), bool)
+    return clipped, found
+
+def refresh_forecasts(db: Session, through: Optional[date] = None, full: bool = False) -> dict:
+    """Fold the complete days since the last refresh into every chemical's EWMA and rewrite the forecasts.
+
+    Usage is laid out as a chemicals x days matrix; the exponentially weighted sums
+    are carried in chemical_forecasts, so an incremental refresh only reads and
+    multiplies the new days: state' = state * decay**k + X @ weights.
+    """
+    started = time.perf_counter()
+    if db.get_bind().dialect.name == "postgresql":
+        if not db.execute(text(f"SELECT pg_try_advisory_xact_lock({REFRESH_LOCK_ID})")).scalar():
+            return {"status": "skipped", "reason": "another refresh is running"}
+
+    through = through or datetime.now(timezone.utc).date() - timedelta(days=1)
+    last_day = _day_number(through)
+    decay = 0.5 ** (1 / FORECAST_HALFLIFE_DAYS)
+
+    chemicals = db.query(ChemicalInventory.id, ChemicalInventory.quantity).order_by(ChemicalInventory.id).all()
+    chemical_ids = np.array([row[0] for row in chemicals], np.int64)
+    quantity = np.array([row[1] or 0.0 for row in chemicals], np.float64)
+    count = len(chemical_ids)
+
+    weight_sum = np.zeros(count)
+    usage_sum = np.zeros(count)
+    usage_sq_sum = np.zeros(count)
+    state = db.query(
+        ChemicalForecast.chemical_id,
+        ChemicalForecast.weight_sum,
+        ChemicalForecast.usage_sum,
+        ChemicalForecast.usage_sq_sum,
+        ChemicalForecast.computed_through
+    ).all()
+    previous_day = max((_day_number(row[4]) for row in state), default=None)
+
+    if full or previous_day is None or last_day - previous_day > FORECAST_HISTORY_DAYS:
+        mode = "full"
+        first_day = last_day - FORECAST_HISTORY_DAYS + 1
+    else:
+        mode = "incremental"
+        first_day = previous_day + 1
+        if state:
+            state_ids = np.array([row[0] for row in state], np.int64)
+            positions, found = _positions(chemical_ids, state_ids)
+            for target, column in ((weight_sum, 1), (usage_sum, 2), (usage_sq_sum, 3)):
+                target[positions[found]] = np.array([row[column] for row in state], np.float64)[found]
+
+    days = max(last_day - first_day + 1, 0)
+    if days and count:
+        usage_ids, usage_days, usage_quantity = _daily_usage(db, first_day, last_day)
+        rows, found = _positions(chemical_ids, usage_ids)
+        usage = np.bincount(
+            rows[found] * days + (usage_days[found] - first_day),
+            weights=usage_quantity[found],
+            minlength=count * days
+        ).reshape(count, days)
+        # Newest day weighs 1, the one before decay, ...; the old state decays by the whole window
+        weights = decay ** np.arange(days - 1, -1, -1, dtype=np.float64)
+        carry = decay ** days
+        weight_sum = weight_sum * carry + weights.sum()
+        usage_sum = usage_sum * carry + usage @ weights
+        usage_sq_sum = usage_sq_sum * carry + (usage * usage) @ weights
+
+    daily_usage = np.divide(usage_sum, weight_sum, out=np.zeros(count), where=weight_sum > 0)
+    daily_usage[daily_usage < FORECAST_MIN_DAILY_USAGE] = 0.0
+    mean_square = np.divide(usage_sq_sum, weight_sum, out=np.zeros(count), where=weight_sum > 0)
+    usage_stddev = np.sqrt(np.maximum(mean_square - daily_usage ** 2, 0))
+
+    lead_time = np.full(count, FORECAST_DEFAULT_LEAD_TIME_DAYS)
+    lead_ids, lead_days = _lead_times(db)
+    positions, found = _positions(chemical_ids, lead_ids)
+    lead_time[positions[found]] = lead_days[found]
+
+    safety_stock = FORECAST_SERVICE_LEVEL_Z * usage_stddev * np.sqrt(lead_time)
+    reorder_point = daily_usage * lead_time + safety_stock
+    days_of_stock = np.divide(quantity, daily_usage, out=np.full(count, np.nan), where=daily_usage > 0)
+
+    records = [
+        {
+            "chemical_id": chemical_id,
+            "daily_usage": usage,
+            "usage_stddev": stddev,
+            "lead_time_days": lead,
+            "safety_stock": safety,
+            "reorder_point": reorder,
+            "days_of_stock": None if np.isnan(stock_days) else stock_days,
+            "weight_sum": weight,
+            "usage_sum": total,
+            "usage_sq_sum": total_sq,
+            "computed_through": through
+        }
+        for chemical_id, usage, stddev, lead, safety, reorder, stock_days, weight, total, total_sq in zip(
+            chemical_ids.tolist(), daily_usage.tolist(), usage_stddev.tolist(), lead_time.tolist(),
+            safety_stock.tolist(), reorder_point.tolist(), days_of_stock.tolist(), weight_sum.tolist(),
+            usage_sum.tolist(), usage_sq_sum.tolist()
+        )
+    ]
+    for start in range(0, len(records), UPSERT_BATCH):
+        stmt = pg_insert(ChemicalForecast).values(records[start:start + UPSERT_BATCH])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChemicalForecast.chemical_id],
+            set_={
+                **{name: stmt.excluded[name] for name in records[0] if name != "chemical_id"},
+                "updated_at": func.now()
+            }
+        )
+        db.execute(stmt)
+    db.commit()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"✅ Forecasts refreshed ({mode}, {count} chemicals, {days} days) in {elapsed:.2f}s")
+    return {
+        "status": "ok",
+        "mode": mode,
+        "chemicals": count,
+        "days_folded": days,
+        "through": through.isoformat(),
+        "elapsed_ms": round(elapsed * 1000, 1)
+    }
@@ -0,0 +1,38 @@
+import os
+from typing import Any, Dict, Optional
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+# Global switch and per-router switches (router names: chemicals, account, admin, notifications)
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true"
+FAST_JSON_DISABLED_ROUTERS = {
+    name.strip() for name in os.getenv("FAST_JSON_DISABLED_ROUTERS", "").split(",") if name.strip()
+}
+
+# UTC datetimes end in "Z", as pydantic writes them, so both paths emit the same JSON
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse encoded by orjson: also takes row dataclasses and datetimes as-is"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+def fast_json_enabled(router: str) -> bool:
+    """Whether a router's list endpoints take the fast path (read once, at import)"""
+    return FAST_JSON_ENABLED and router not in FAST_JSON_DISABLED_ROUTERS
+
+def rows_response(rows: Any, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Encode rows from our own Core reads (app/crud/rows.py dataclasses or dicts) directly.
+
+    Returning a Response makes FastAPI skip response_model validation, so only use this
+    for rows whose columns already match the response schema.
+    """
+    return ORJSONResponse(rows, headers=headers)
+
+def validated_response(adapter: TypeAdapter, content: Any, headers: Optional[Dict[str, str]] = None,
+                       **dump_options) -> Response:
+    """Validate ORM output once with a module-level TypeAdapter and encode it in pydantic-core"""
+    validated = adapter.validate_python(content, from_attributes=True)
+    return Response(adapter.dump_json(validated, **dump_options), media_type="application/json", headers=headers)
@@ -0,0 +1,146 @@
+import os
+import json
+import asyncio
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# How many recent events are kept for Last-Event-ID replay
+NOTIFICATION_REPLAY_BUFFER = int(os.getenv("NOTIFICATION_REPLAY_BUFFER", 1000))
+# Events queued per connected client before it is told to resync
+NOTIFICATION_SUBSCRIBER_QUEUE = int(os.getenv("NOTIFICATION_SUBSCRIBER_QUEUE", 256))
+# Seconds between keep-alive comments on an idle stream
+NOTIFICATION_STREAM_HEARTBEAT = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", 15))
+# Reconnect delay suggested to EventSource clients (milliseconds)
+NOTIFICATION_STREAM_RETRY_MS = int(os.getenv("NOTIFICATION_STREAM_RETRY_MS", 3000))
+
+# Session.info key holding events that are published once the transaction commits
+PENDING_EVENTS_KEY = "pending_notification_events"
+
+@dataclass
+class NotificationEvent:
+    id: int
+    event: str
+    roles: List[str]
+    data: dict
+
+    def encode(self) -> str:
+        """Render the event in text/event-stream format"""
+        payload = json.dumps(self.data, default=_json_default)
+        return f"id: {self.id}\nevent: {self.event}\ndata: {payload}\n\n"
+
+@dataclass(eq=False)
+class Subscriber:
+    role: str
+    queue: asyncio.Queue
+    last_id: int = 0
+    lagged: bool = False
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class NotificationBroker:
+    """In-process pub/sub for notification events.
+
+    Publishing is thread-safe (sync endpoints run in the threadpool); delivery
+    happens on the event loop that serves the SSE connections. Every event gets a
+    monotonically increasing id and the most recent ones are kept in a ring buffer
+    so a reconnecting client can replay from its Last-Event-ID.
+    """
+
+    def __init__(self, buffer_size: int = NOTIFICATION_REPLAY_BUFFER, queue_size: int = NOTIFICATION_SUBSCRIBER_QUEUE):
+        self._lock = threading.Lock()
+        self._buffer: Deque[NotificationEvent] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscriber] = set()
+        self._queue_size = queue_size
+        self._next_id = 1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def last_event_id(self) -> int:
+        return self._next_id - 1
+
+    def publish(self, event_type: str, roles: List[str], data: dict) -> NotificationEvent:
+        """Assign an id, buffer the event and hand it to the subscribers' loop"""
+        with self._lock:
+            notification_event = NotificationEvent(self._next_id, event_type, list(roles), data)
+            self._next_id += 1
+            self._buffer.append(notification_event)
+            loop = self._loop if self._subscribers else None
+
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._dispatch, notification_event)
+        return notification_event
+
+    def _dispatch(self, notification_event: NotificationEvent) -> None:
+        for subscriber in list(self._subscribers):
+            if subscriber.role in notification_event.roles:
+                self._deliver(subscriber, notification_event)
+
+    def _deliver(self, subscriber: Subscriber, notification_event: NotificationEvent) -> None:
+        # Replay and live dispatch can overlap right after subscribing
+        if notification_event.id <= subscriber.last_id or subscriber.lagged:
+            return
+        try:
+            subscriber.queue.put_nowait(notification_event)
+            subscriber.last_id = notification_event.id
+        except asyncio.QueueFull:
+            # Slow client: stop queueing and tell it to refetch instead
+            subscriber.lagged = True
+            logger.warning(f"⚠️ Notification stream subscriber ({subscriber.role}) fell behind; requesting resync")
+
+    def subscribe(self, role: str, last_event_id: Optional[int] = None) -> Subscriber:
+        """Register a subscriber on the running loop, replaying buffered events after last_event_id"""
+        subscriber = Subscriber(role=role, queue=asyncio.Queue(maxsize=self._queue_size))
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(subscriber)
+            replay = list(self._buffer)
+            oldest_id = replay[0].id if replay else self._next_id
+            newest_id = self._next_id - 1
+
+        if last_event_id is None:
+            subscriber.last_id = newest_id
+            return subscriber
+        if last_event_id < oldest_id - 1 or last_event_id > newest_id:
+            # Events were evicted from the buffer (or the server restarted)
+            subscriber.lagged = True
+            subscriber.last_id = newest_id
+            return subscriber
+
+        subscriber.last_id = last_event_id
+        for notification_event in replay:
+            if notification_event.id > last_event_id and role in notification_event.roles:
+                self._deliver(subscriber, notification_event)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+broker = NotificationBroker()
+
+def queue_notification_event(db: Session, event_type: str, roles: List[str], data: dict) -> None:
+    """Publish an event once the session's current transaction commits"""
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append((event_type, list(roles), data))
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    for event_type, roles, data in session.info.pop(PENDING_EVENTS_KEY, []):
+        broker.publish(event_type, roles, data)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_events(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_EVENTS_KEY, None)
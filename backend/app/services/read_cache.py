@@ -0,0 +1,290 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Global switch, per-endpoint switches and sizing
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "true").lower() == "true"
+READ_CACHE_DISABLED_ENDPOINTS = {
+    name.strip() for name in os.getenv("READ_CACHE_DISABLED_ENDPOINTS", "").split(",") if name.strip()
+}
+READ_CACHE_TTL = int(os.getenv("READ_CACHE_TTL", 300))
+READ_CACHE_L1_TTL = int(os.getenv("READ_CACHE_L1_TTL", 30))
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", 2048))
+READ_CACHE_REDIS_DB = int(os.getenv("READ_CACHE_REDIS_DB", os.getenv("REDIS_DB", 0)))
+# Longest a request waits on another request's in-flight load before loading itself
+READ_CACHE_SINGLEFLIGHT_TIMEOUT = float(os.getenv("READ_CACHE_SINGLEFLIGHT_TIMEOUT", 10))
+ACCOUNT_SUMMARY_TTL = int(os.getenv("ACCOUNT_SUMMARY_TTL", 60))
+
+# Bump when a cached response shape changes so old Redis entries are ignored
+CACHE_KEY_VERSION = 2
+
+# Session.info key holding cache keys to evict once the transaction commits
+PENDING_INVALIDATIONS_KEY = "pending_cache_invalidations"
+
+def _connect_redis() -> Optional[redis.Redis]:
+    if not READ_CACHE_ENABLED:
+        return None
+    try:
+        client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            password=os.getenv("REDIS_PASSWORD"),
+            db=READ_CACHE_REDIS_DB,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2
+        )
+        client.ping()
+        logger.info("✅ Redis read cache tier connected")
+        return client
+    except Exception as e:
+        logger.warning(f"⚠️ Redis not available for read cache: {e}. Using in-process cache only")
+        return None
+
+class _Flight:
+    """One in-progress load that concurrent misses for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.failed = False
+
+class ReadCache:
+    """Two-tier read-through cache for one endpoint.
+
+    L1 is a per-process LRU with a short TTL; L2 is Redis, shared by all workers.
+    Keys carry a generation number: invalidation bumps the generation (in-process
+    and in Redis) instead of racing a concurrent reader that is about to store a
+    value it loaded before the write committed. Concurrent misses for one key are
+    coalesced (singleflight): one request loads, the others wait for its result.
+
+    With check_generation, an L1 hit is only served while the Redis generation it
+    was loaded under is still current (one GET). Use it for keys that the change
+    feed does not evict from other workers' L1.
+    """
+
+    def __init__(self, name: str, redis_client: Optional[redis.Redis] = None, ttl: int = READ_CACHE_TTL,
+                 l1_ttl: int = READ_CACHE_L1_TTL, max_entries: int = READ_CACHE_MAX_ENTRIES,
+                 check_generation: bool = False):
+        self.name = name
+        self.redis = redis_client
+        self.ttl = ttl
+        self.l1_ttl = min(l1_ttl, ttl)
+        self.max_entries = max_entries
+        self.check_generation = check_generation
+        self.enabled = READ_CACHE_ENABLED and name not in READ_CACHE_DISABLED_ENDPOINTS
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, Redis generation it was loaded under or None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0, "redis_errors": 0}
+
+    def _redis_key(self, key: str, generation: int) -> str:
+        return f"cache:v{CACHE_KEY_VERSION}:{self.name}:{key}:g{generation}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"cache:v{CACHE_KEY_VERSION}:{self.name}:{key}:gen"
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _store_l1(self, key: str, value: Any, local_generation: int, generation: Optional[int]) -> None:
+        with self._lock:
+            # Skip if the key was invalidated while the value was being loaded
+            if self._generations.get(key, 0) != local_generation:
+                return
+            self._entries[key] = (time.monotonic() + self.l1_ttl, value, generation)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached JSON-compatible value for key, calling loader on a miss (None is not cached)"""
+        if not self.enabled:
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                if not self.check_generation:
+                    self._entries.move_to_end(key)
+                    self.stats["l1_hits"] += 1
+                    return entry[1]
+            else:
+                entry = None
+
+        if entry and self._generation_current(key, entry[2]):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.stats["l1_hits"] += 1
+            return entry[1]
+
+        with self._lock:
+            local_generation = self._generations.get(key, 0)
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(READ_CACHE_SINGLEFLIGHT_TIMEOUT) and not flight.failed:
+                self._count("coalesced")
+                return flight.value
+            # The leader failed or is stuck: load independently
+            return self._load(key, loader, local_generation)
+
+        try:
+            flight.value = self._load(key, loader, local_generation)
+            return flight.value
+        except Exception:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def _generation_current(self, key: str, generation: Optional[int]) -> bool:
+        """Whether another worker has invalidated key since it was loaded under generation"""
+        if self.redis is None or generation is None:
+            return True
+        try:
+            return int(self.redis.get(self._generation_key(key)) or 0) == generation
+        except redis.RedisError as e:
+            # Serve the L1 copy; its TTL still bounds how stale it can be
+            self._count("redis_errors")
+            logger.warning(f"⚠️ Read cache {self.name}: Redis error on generation check: {e}")
+            return True
+
+    def _load(self, key: str, loader: Callable[[], Any], local_generation: int) -> Any:
+        """L2 lookup, then loader; fills both tiers"""
+        generation = None
+        if self.redis is not None:
+            try:
+                generation = int(self.redis.get(self._generation_key(key)) or 0)
+                raw = self.redis.get(self._redis_key(key, generation))
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._store_l1(key, value, local_generation, generation)
+                    self._count("l2_hits")
+                    return value
+            except redis.RedisError as e:
+                generation = None
+                self._count("redis_errors")
+                logger.warning(f"⚠️ Read cache {self.name}: Redis error on get: {e}")
+
+        self._count("misses")
+        value = loader()
+        if value is None:
+            return None
+
+        self._store_l1(key, value, local_generation, generation)
+        if generation is not None:
+            try:
+                self.redis.set(self._redis_key(key, generation), json.dumps(value), ex=self.ttl)
+            except redis.RedisError as e:
+                self._count("redis_errors")
+                logger.warning(f"⚠️ Read cache {self.name}: Redis error on set: {e}")
+        return value
+
+    def evict_local(self, key: str) -> None:
+        """Drop the in-process entry only (another worker already bumped the shared generation)"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            # Requests arriving from now on must not join a load that started before the write
+            self._flights.pop(key, None)
+
+    def invalidate(self, key: str) -> None:
+        """Evict key from both tiers"""
+        self.evict_local(key)
+        self._count("invalidations")
+        if self.redis is not None:
+            try:
+                # New generation: entries stored by in-flight readers under the old one are never read again
+                self.redis.incr(self._generation_key(key))
+            except redis.RedisError as e:
+                self._count("redis_errors")
+                logger.warning(f"⚠️ Read cache {self.name}: Redis error on invalidate: {e}")
+
+    def clear_local(self) -> None:
+        with self._lock:
+            for key in self._entries:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._entries)
+        lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+        hits = stats["l1_hits"] + stats["l2_hits"]
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            "redis": self.redis is not None,
+            "l1_entries": size,
+            **stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "l1_hit_ratio": round(stats["l1_hits"] / lookups, 4) if lookups else None
+        }
+
+redis_client = _connect_redis()
+
+# One cache per cached endpoint, so each can be switched off on its own
+chemical_detail_cache = ReadCache("chemical_detail", redis_client)
+formulation_detail_cache = ReadCache("formulation_detail", redis_client)
+chemical_formulations_cache = ReadCache("chemical_formulations", redis_client)
+# Transaction and purchase-order writes are not on the change feed, so L1 hits confirm the Redis generation
+account_summary_cache = ReadCache("account_summary", redis_client, ttl=ACCOUNT_SUMMARY_TTL, check_generation=True)
+
+CACHES: List[ReadCache] = [
+    chemical_detail_cache, formulation_detail_cache, chemical_formulations_cache, account_summary_cache
+]
+
+def use_redis(client: Optional[redis.Redis]) -> None:
+    """Point every cache at a different Redis client (e.g. fakeredis in tests, None for L1 only)"""
+    for cache in CACHES:
+        cache.redis = client
+
+def cache_stats() -> List[dict]:
+    return [cache.snapshot() for cache in CACHES]
+
+def chemical_cache_keys(chemical_id: int) -> List[tuple]:
+    """Entries that embed a chemical or its formulation list"""
+    key = str(chemical_id)
+    return [(chemical_detail_cache, key), (chemical_formulations_cache, key)]
+
+def formulation_cache_keys(formulation_id: int, chemical_id: int) -> List[tuple]:
+    """Entries that embed a formulation (the chemical detail lists its formulations)"""
+    return [(formulation_detail_cache, str(formulation_id))] + chemical_cache_keys(chemical_id)
+
+def account_summary_cache_keys() -> List[tuple]:
+    """The account summary aggregates every transaction and purchase order"""
+    return [(account_summary_cache, "summary")]
+
+def queue_cache_invalidation(db: Session, entries: List[tuple]) -> None:
+    """Evict cache entries once the session's current transaction commits"""
+    db.info.setdefault(PENDING_INVALIDATIONS_KEY, []).extend(entries)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for cache, key in dict.fromkeys(session.info.pop(PENDING_INVALIDATIONS_KEY, [])):
+        cache.invalidate(key)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_invalidations(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
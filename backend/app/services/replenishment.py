@@ -0,0 +1,213 @@
+import os
+import math
+import time
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import and_, func, insert, select, text
+from sqlalchemy.orm import Session
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.chemical_forecasts import ChemicalForecast
+from app.models.account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem
+from app.crud.account_transactions import generate_order_number
+from app.services.read_cache import queue_cache_invalidation, account_summary_cache_keys
+
+logger = logging.getLogger(__name__)
+
+# Order up to the reorder point plus this many days of forecast usage
+REPLENISHMENT_COVER_DAYS = float(os.getenv("REPLENISHMENT_COVER_DAYS", 30))
+# Smallest draft order per supplier (in the order's currency); smaller orders are topped up
+REPLENISHMENT_MIN_ORDER_VALUE = float(os.getenv("REPLENISHMENT_MIN_ORDER_VALUE", 100))
+
+# Purchase orders in these statuses count as stock already on its way
+OPEN_ORDER_STATUSES = ["draft", "submitted", "approved", "ordered"]
+DRAFT_NOTE = "Drafted automatically by the replenishment job"
+# Serializes drafting across workers/cron (two overlapping runs would both see nothing on order)
+REPLENISHMENT_LOCK_ID = 4_204_202
+
+def _candidates(db: Session) -> list:
+    """Chemicals at or below their forecast reorder point"""
+    return db.query(
+        ChemicalInventory.id,
+        ChemicalInventory.name,
+        ChemicalInventory.unit,
+        ChemicalInventory.quantity,
+        ChemicalInventory.pack_size,
+        ChemicalForecast.daily_usage,
+        ChemicalForecast.reorder_point,
+        ChemicalForecast.lead_time_days
+    ).join(ChemicalForecast, ChemicalForecast.chemical_id == ChemicalInventory.id).filter(
+        ChemicalForecast.reorder_point > 0,
+        ChemicalInventory.quantity <= ChemicalForecast.reorder_point
+    ).all()
+
+def _on_order(db: Session, chemical_ids: List[int]) -> Dict[int, float]:
+    """Quantity per chemical on open purchase orders"""
+    rows = db.query(PurchaseOrderItem.chemical_id, func.sum(PurchaseOrderItem.quantity)).join(
+        PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.purchase_order_id
+    ).filter(
+        PurchaseOrder.status.in_(OPEN_ORDER_STATUSES),
+        PurchaseOrderItem.chemical_id.in_(chemical_ids)
+    ).group_by(PurchaseOrderItem.chemical_id).all()
+    return {chemical_id: float(quantity or 0) for chemical_id, quantity in rows}
+
+def _sources(db: Session, chemical_ids: List[int]) -> Dict[int, Tuple[str, float, str]]:
+    """(usual supplier, its last unit price, currency) per chemical, from purchase history in one query.
+
+    The usual supplier is the one purchased from most often (most recent breaks ties).
+    """
+    t = AccountTransaction
+    purchases = and_(
+        t.transaction_type == "purchase",
+        t.supplier.isnot(None),
+        t.supplier != "",
+        t.quantity > 0,
+        t.chemical_id.in_(chemical_ids)
+    )
+    usual = select(
+        t.chemical_id,
+        t.supplier,
+        func.row_number().over(
+            partition_by=t.chemical_id,
+            order_by=(func.count(t.id).desc(), func.max(t.created_at).desc())
+        ).label("rank")
+    ).where(purchases).group_by(t.chemical_id, t.supplier).subquery()
+    latest = select(
+        t.chemical_id,
+        t.supplier,
+        (t.amount / t.quantity).label("unit_price"),
+        func.coalesce(t.currency, "USD").label("currency"),
+        func.row_number().over(
+            partition_by=(t.chemical_id, t.supplier),
+            order_by=(t.created_at.desc(), t.id.desc())
+        ).label("recency")
+    ).where(purchases).subquery()
+    rows = db.execute(
+        select(usual.c.chemical_id, usual.c.supplier, latest.c.unit_price, latest.c.currency)
+        .join(latest, and_(
+            latest.c.chemical_id == usual.c.chemical_id,
+            latest.c.supplier == usual.c.supplier,
+            latest.c.recency == 1
+        ))
+        .where(usual.c.rank == 1)
+    ).all()
+    return {chemical_id: (supplier, float(unit_price), currency) for chemical_id, supplier, unit_price, currency in rows}
+
+def _round_up(quantity: float, pack_size: float) -> float:
+    # The epsilon keeps float noise (e.g. 3.0000000001 packs) from adding a whole pack
+    return math.ceil(quantity / pack_size - 1e-9) * pack_size
+
+def draft_replenishment_orders(db: Session, user_id: str, dry_run: bool = False) -> dict:
+    """Draft one purchase order per supplier (and currency) for every chemical below its reorder point.
+
+    Each line orders up to reorder_point + REPLENISHMENT_COVER_DAYS of usage, minus what
+    is on hand and on open orders, rounded up to whole packs. A supplier order below
+    REPLENISHMENT_MIN_ORDER_VALUE gets extra packs on its most urgent line. All orders
+    and items are written with two bulk INSERTs in one transaction.
+    """
+    started = time.perf_counter()
+    if not dry_run and db.get_bind().dialect.name == "postgresql":
+        if not db.execute(text(f"SELECT pg_try_advisory_xact_lock({REPLENISHMENT_LOCK_ID})")).scalar():
+            return {"status": "skipped", "reason": "another replenishment run is drafting orders", "dry_run": dry_run}
+
+    candidates = _candidates(db)
+    chemical_ids = [row.id for row in candidates]
+    on_order = _on_order(db, chemical_ids) if chemical_ids else {}
+    sources = _sources(db, chemical_ids) if chemical_ids else {}
+
+    skipped = []
+    groups = defaultdict(list)
+    for row in candidates:
+        source = sources.get(row.id)
+        if source is None:
+            skipped.append({"chemical_id": row.id, "name": row.name, "reason": "no purchase history with a supplier"})
+            continue
+        target = row.reorder_point + row.daily_usage * REPLENISHMENT_COVER_DAYS
+        needed = target - row.quantity - on_order.get(row.id, 0.0)
+        if needed <= 0:
+            skipped.append({"chemical_id": row.id, "name": row.name, "reason": "covered by open purchase orders"})
+            continue
+
+        supplier, unit_price, currency = source
+        pack_size = row.pack_size or 1.0
+        groups[(supplier, currency)].append({
+            "chemical_id": row.id,
+            "name": row.name,
+            "unit": row.unit,
+            "pack_size": pack_size,
+            "quantity": _round_up(needed, pack_size),
+            "unit_price": unit_price,
+            "lead_time_days": row.lead_time_days,
+            # Days left before stock runs out once the lead time is spent (lower is more urgent)
+            "slack_days": row.quantity / row.daily_usage - row.lead_time_days if row.daily_usage > 0 else math.inf
+        })
+
+    orders = []
+    for (supplier, currency), lines in sorted(groups.items()):
+        lines.sort(key=lambda line: line["slack_days"])
+        total = sum(line["quantity"] * line["unit_price"] for line in lines)
+        topped_up = False
+        pack_price = lines[0]["pack_size"] * lines[0]["unit_price"]
+        if total < REPLENISHMENT_MIN_ORDER_VALUE and pack_price > 0:
+            extra_packs = math.ceil((REPLENISHMENT_MIN_ORDER_VALUE - total) / pack_price - 1e-9)
+            lines[0]["quantity"] += extra_packs * lines[0]["pack_size"]
+            topped_up = True
+        for line in lines:
+            line["total_price"] = round(line["quantity"] * line["unit_price"], 2)
+        orders.append({
+            "supplier": supplier,
+            "currency": currency,
+            "total_amount": round(sum(line["total_price"] for line in lines), 2),
+            "topped_up": topped_up,
+            "expected_delivery": datetime.now(timezone.utc) + timedelta(days=max(line["lead_time_days"] for line in lines)),
+            "items": lines
+        })
+
+    if orders and not dry_run:
+        order_rows = [
+            {
+                "order_number": generate_order_number(),
+                "supplier": order["supplier"],
+                "total_amount": order["total_amount"],
+                "currency": order["currency"],
+                "expected_delivery": order["expected_delivery"],
+                "status": "draft",
+                "notes": DRAFT_NOTE,
+                "created_by": user_id
+            }
+            for order in orders
+        ]
+        created = db.execute(
+            insert(PurchaseOrder).returning(PurchaseOrder.id, PurchaseOrder.order_number, sort_by_parameter_order=True),
+            order_rows
+        ).all()
+        item_rows = []
+        for order, (order_id, order_number) in zip(orders, created):
+            order["order_id"], order["order_number"] = order_id, order_number
+            item_rows.extend(
+                {
+                    "purchase_order_id": order_id,
+                    "chemical_id": line["chemical_id"],
+                    "quantity": line["quantity"],
+                    "unit": line["unit"],
+                    "unit_price": line["unit_price"],
+                    "total_price": line["total_price"],
+                    "notes": f"Pack size {line['pack_size']:g} {line['unit']}"
+                }
+                for line in order["items"]
+            )
+        db.execute(insert(PurchaseOrderItem), item_rows)
+        queue_cache_invalidation(db, account_summary_cache_keys())
+        db.commit()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"✅ Replenishment: {len(orders)} orders, {sum(len(o['items']) for o in orders)} lines "
+                f"from {len(candidates)} chemicals in {elapsed:.2f}s{' (dry run)' if dry_run else ''}")
+    return {
+        "status": "ok",
+        "dry_run": dry_run,
+        "orders": orders,
+        "skipped": skipped,
+        "elapsed_ms": round(elapsed * 1000, 1)
+    }
@@ -0,0 +1,254 @@
+import os
+import zlib
+from typing import Dict, Optional
+import brotli
+import msgpack
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Compression switch, threshold (bytes; smaller bodies are sent as-is) and levels
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", 1024))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 6))
+# Brotli quality 0-11; above ~5 costs far more CPU than it saves on dynamic responses
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", 4))
+# MessagePack bodies for clients whose Accept header prefers them over JSON
+RESPONSE_MSGPACK_ENABLED = os.getenv("RESPONSE_MSGPACK_ENABLED", "true").lower() == "true"
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "application/x-ndjson", MSGPACK_MEDIA_TYPE, "text/")
+# Server-sent events must reach the client event by event
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+# Preferred first when the client accepts both equally
+ENCODINGS = ("br", "gzip")
+# Appended inside the quotes of a MessagePack response's ETag, so it never validates the JSON variant
+MSGPACK_ETAG_SUFFIX = ";msgpack"
+
+def _qualities(header: str) -> Dict[str, float]:
+    """Token -> q-value for an Accept / Accept-Encoding header"""
+    qualities = {}
+    for part in header.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[token] = max(quality, qualities.get(token, 0.0))
+    return qualities
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The content coding to use for a response ("br", "gzip"), or None for identity"""
+    qualities = _qualities(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def wants_msgpack(accept: str) -> bool:
+    """Whether the Accept header prefers MessagePack to JSON (ties go to an explicit application/json)"""
+    qualities = _qualities(accept)
+    msgpack_quality = max(qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    if msgpack_quality <= 0:
+        return False
+    if "application/json" in qualities:
+        return msgpack_quality > qualities["application/json"]
+    return msgpack_quality >= qualities.get("application/*", qualities.get("*/*", 0.0))
+
+def msgpack_etag(etag: str) -> str:
+    return etag[:-1] + MSGPACK_ETAG_SUFFIX + '"' if etag.endswith('"') else etag + MSGPACK_ETAG_SUFFIX
+
+def msgpack_if_none_match(if_none_match: str) -> str:
+    """If-None-Match of a MessagePack request, rewritten to validate against the app's (JSON) ETag.
+
+    The request's own tags lose the suffix; JSON tags get ';json' so they no longer match.
+    (A JSON request is left alone: suffixed tags never match an unsuffixed ETag.)
+    """
+    tags = []
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            tags.append(tag)
+        elif tag.endswith(MSGPACK_ETAG_SUFFIX + '"'):
+            tags.append(tag[:-len(MSGPACK_ETAG_SUFFIX) - 1] + '"')
+        elif tag:
+            tags.append(tag[:-1] + ';json"' if tag.endswith('"') else tag + ";json")
+    return ", ".join(tags)
+
+def strip_msgpack_suffix(if_match: str) -> str:
+    """If-Match guards the stored version, which both representations share"""
+    return if_match.replace(MSGPACK_ETAG_SUFFIX + '"', '"')
+
+def to_msgpack(body: bytes) -> bytes:
+    """Re-encode a JSON body as MessagePack (datetimes stay ISO 8601 strings)"""
+    return msgpack.packb(orjson.loads(body))
+
+class Compressor:
+    """Incremental br/gzip compressor at the configured level"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=RESPONSE_BROTLI_QUALITY if level is None else level)
+            self._zlib = None
+        else:
+            # wbits=31: zlib stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(RESPONSE_GZIP_LEVEL if level is None else level, zlib.DEFLATED, 31)
+            self._brotli = None
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    compressor = Compressor(encoding, level)
+    return compressor.compress(body) + compressor.finish()
+
+class ResponseEncodingMiddleware:
+    """Content negotiation for HTTP responses.
+
+    JSON bodies become MessagePack when Accept prefers application/msgpack, and bodies of
+    at least RESPONSE_COMPRESSION_MIN_SIZE bytes are br/gzip compressed per Accept-Encoding.
+    Streaming responses (CSV/NDJSON exports) are compressed chunk by chunk and never
+    transcoded; server-sent events pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not RESPONSE_COMPRESSION_ENABLED and not RESPONSE_MSGPACK_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", "")) if RESPONSE_COMPRESSION_ENABLED else None
+        transcode = RESPONSE_MSGPACK_ENABLED and wants_msgpack(headers.get("accept", ""))
+        if transcode and "if-none-match" in headers:
+            MutableHeaders(scope=scope)["if-none-match"] = msgpack_if_none_match(headers["if-none-match"])
+        if RESPONSE_MSGPACK_ENABLED and MSGPACK_ETAG_SUFFIX in headers.get("if-match", ""):
+            MutableHeaders(scope=scope)["if-match"] = strip_msgpack_suffix(headers["if-match"])
+        # Wrapped even for identity JSON clients: every variant must carry the same Vary
+        await self.app(scope, receive, _EncodingResponder(send, encoding, transcode).send)
+
+class _EncodingResponder:
+    """Holds http.response.start until the first body message shows whether the response streams"""
+
+    def __init__(self, send: Send, encoding: Optional[str], transcode: bool):
+        self._send = send
+        self.encoding = encoding
+        self.transcode = transcode
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self.start = message
+        elif message["type"] != "http.response.body":
+            self.passthrough = True
+            await self._flush_start()
+            await self._send(message)
+        elif self.compressor is not None:
+            await self._send_compressed_chunk(message)
+        elif message.get("more_body", False):
+            await self._start_stream(message)
+        else:
+            await self._send_whole(message)
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._send(start)
+
+    def _media_type(self, headers: MutableHeaders) -> str:
+        return headers.get("content-type", "").split(";")[0].strip().lower()
+
+    def _negotiable(self, headers: MutableHeaders) -> bool:
+        """JSON (or a 304 standing in for it) that has a MessagePack variant"""
+        return RESPONSE_MSGPACK_ENABLED and (
+            self._media_type(headers) == "application/json" or self.start["status"] == 304
+        )
+
+    def _compressible_type(self, headers: MutableHeaders) -> bool:
+        """A response that has a compressed variant, whether or not this client accepts it"""
+        media_type = self._media_type(headers)
+        return (
+            RESPONSE_COMPRESSION_ENABLED
+            and "content-encoding" not in headers
+            and (media_type.startswith(COMPRESSIBLE_MEDIA_TYPES) or self.start["status"] == 304)
+            and not media_type.startswith(UNCOMPRESSED_MEDIA_TYPES)
+        )
+
+    def _weaken_etag(self, headers: MutableHeaders) -> None:
+        # The body no longer matches a strong validator byte for byte
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+
+    async def _send_whole(self, message: Message) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        body = original = message.get("body", b"")
+        if self._negotiable(headers):
+            headers.add_vary_header("Accept")
+            if self.transcode:
+                if "etag" in headers:
+                    headers["etag"] = msgpack_etag(headers["etag"])
+                    self._weaken_etag(headers)
+                if body:
+                    body = to_msgpack(body)
+                    headers["content-type"] = MSGPACK_MEDIA_TYPE
+        if self._compressible_type(headers):
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding is not None and len(body) >= RESPONSE_COMPRESSION_MIN_SIZE:
+                body = compress(body, self.encoding)
+                headers["content-encoding"] = self.encoding
+        if body is not original:
+            headers["content-length"] = str(len(body))
+            self._weaken_etag(headers)
+        self.start["headers"] = headers.raw
+        await self._flush_start()
+        await self._send({**message, "body": body})
+
+    async def _start_stream(self, message: Message) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        if self._compressible_type(headers):
+            headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None or not self._compressible_type(headers):
+            self.start["headers"] = headers.raw
+            self.passthrough = True
+            await self._flush_start()
+            await self._send(message)
+            return
+        self.compressor = Compressor(self.encoding)
+        headers["content-encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["content-length"]
+        self._weaken_etag(headers)
+        self.start["headers"] = headers.raw
+        await self._flush_start()
+        await self._send_compressed_chunk(message)
+
+    async def _send_compressed_chunk(self, message: Message) -> None:
+        body = self.compressor.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            body += self.compressor.finish()
+        if body or not more_body:
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
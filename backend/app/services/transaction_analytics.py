@@ -0,0 +1,405 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import BigInteger, cast, extract, func, or_, select
+from sqlalchemy.orm import Session
+from app.models.account_transactions import AccountTransaction, SpendRollup
+from app.models.chemical_inventory import ChemicalInventory
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between incremental refreshes; queries in between use the loaded columns as they are
+ANALYTICS_REFRESH_INTERVAL = float(os.getenv("ANALYTICS_REFRESH_INTERVAL", 5))
+# Rows created/updated this many seconds before the high-water mark are re-read, to catch late commits
+ANALYTICS_REFRESH_OVERLAP = int(os.getenv("ANALYTICS_REFRESH_OVERLAP", 60))
+ANALYTICS_LOAD_BATCH = int(os.getenv("ANALYTICS_LOAD_BATCH", 50000))
+
+# Dictionary-encoded columns, usable in group_by and as filters
+DIMENSIONS = ("chemical", "supplier", "currency", "transaction_type", "status")
+BUCKETS = ("day", "week", "month", "quarter", "year")
+METRICS = ("amount", "quantity", "count", "unit_price")
+
+COLUMN_DTYPES = {
+    "id": np.int64,
+    "chemical": np.int32,
+    "supplier": np.int32,
+    "currency": np.int32,
+    "transaction_type": np.int32,
+    "status": np.int32,
+    "created_at": np.int64,  # Unix seconds, UTC
+    "month": np.int32,  # Months since 1970-01 (derived from created_at on merge; month/quarter/year buckets)
+    "quantity": np.float64,
+    "amount": np.float64,
+}
+
+class Dictionary:
+    """Maps column values to dense int32 codes (codes are never reused or removed)"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Any) -> Optional[int]:
+        return self._codes.get(value)
+
+    def encode(self, values: Sequence[Any]) -> np.ndarray:
+        """Encode a batch: one dict lookup per distinct value, not per row"""
+        if len(values) == 0:
+            return np.empty(0, dtype=np.int32)
+        unique, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+        mapping = np.fromiter((self.code(value) for value in unique), dtype=np.int32, count=len(unique))
+        return mapping[inverse.reshape(-1)]
+
+def month_numbers(timestamps: np.ndarray) -> np.ndarray:
+    return timestamps.astype("datetime64[s]").astype("datetime64[M]").astype(np.int32)
+
+def month_buckets(months: np.ndarray, bucket: str) -> np.ndarray:
+    """Period number for month, quarter or year buckets from months since 1970-01"""
+    if bucket == "month":
+        return months
+    if bucket == "quarter":
+        return months // 3
+    return months // 12
+
+def _epoch_seconds(value: datetime) -> int:
+    """Unix seconds for a query bound; naive values (e.g. ?start=2024-01-01T00:00:00) are UTC like the column store"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def bucket_codes(timestamps: np.ndarray, bucket: str) -> np.ndarray:
+    """Integer period number per timestamp (days, Monday-start weeks, months, quarters or years since 1970)"""
+    if bucket == "day":
+        return timestamps // 86400
+    if bucket == "week":
+        return (timestamps // 86400 + 3) // 7  # 1970-01-01 was a Thursday
+    return month_buckets(month_numbers(timestamps), bucket)
+
+def bucket_start(code: int, bucket: str) -> str:
+    """ISO date of the first day of a period number"""
+    if bucket == "day":
+        return str(np.datetime64(code, "D"))
+    if bucket == "week":
+        return str(np.datetime64(code * 7 - 3, "D"))
+    months = {"month": code, "quarter": code * 3, "year": code * 12}[bucket]
+    return str(np.datetime64(months, "M").astype("datetime64[D]"))
+
+class TransactionAnalytics:
+    """Column store of account_transactions for ad-hoc aggregation.
+
+    Every transaction is one position in a set of NumPy arrays, sorted by id;
+    string-like columns are dictionary-encoded to int32 codes. Queries build a
+    boolean mask, fold the group-by columns (and an optional time bucket) into
+    one int64 key and aggregate with np.unique/np.bincount, so their cost is a
+    few passes over contiguous arrays regardless of the number of groups.
+
+    The store refreshes incrementally: rows with an id above the loaded
+    maximum, or created/updated since the high-water marks (minus an overlap
+    for transactions that committed late), are re-read and upserted by id.
+    Deletes leave nothing to read, so the row count is checked against the
+    spend rollup and a persistent mismatch triggers a full reload.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.stats = {"full_loads": 0, "incremental_refreshes": 0, "rows_applied": 0}
+        self._reset()
+
+    def _reset(self) -> None:
+        self.dictionaries = {name: Dictionary() for name in DIMENSIONS}
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        self.size = 0
+        self.max_id = 0
+        self.created_hwm: Optional[int] = None
+        self.updated_hwm: Optional[datetime] = None
+        self.last_refresh = 0.0
+        self._count_offset = 0
+        self._count_mismatch = False
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][:self.size]
+
+    # Loading
+
+    def _select(self):
+        t = AccountTransaction
+        return select(
+            t.id,
+            t.chemical_id,
+            func.coalesce(t.supplier, ""),
+            func.coalesce(t.currency, "USD"),
+            t.transaction_type,
+            func.coalesce(t.status, "pending"),
+            cast(func.coalesce(extract("epoch", t.created_at), 0), BigInteger),
+            t.quantity,
+            t.amount,
+            t.updated_at
+        )
+
+    def _encode_rows(self, rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+        ids, chemicals, suppliers, currencies, types, statuses, created, quantities, amounts, updated = zip(*rows)
+        latest_update = max((value for value in updated if value is not None), default=None)
+        if latest_update is not None and (self.updated_hwm is None or latest_update > self.updated_hwm):
+            self.updated_hwm = latest_update
+        return {
+            "id": np.array(ids, dtype=np.int64),
+            "chemical": self.dictionaries["chemical"].encode(chemicals),
+            "supplier": self.dictionaries["supplier"].encode(suppliers),
+            "currency": self.dictionaries["currency"].encode(currencies),
+            "transaction_type": self.dictionaries["transaction_type"].encode(types),
+            "status": self.dictionaries["status"].encode(statuses),
+            "created_at": np.array(created, dtype=np.int64),
+            "quantity": np.array(quantities, dtype=np.float64),
+            "amount": np.array(amounts, dtype=np.float64),
+        }
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._columns["id"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+
+    def merge_columns(self, batch: Dict[str, np.ndarray]) -> None:
+        """Upsert encoded rows by id: existing positions are overwritten, new ids appended"""
+        ids = batch["id"]
+        if len(ids) == 0:
+            return
+        batch["month"] = month_numbers(batch["created_at"])
+        loaded_ids = self.column("id")
+        positions = np.searchsorted(loaded_ids, ids)
+        found = positions < self.size
+        found[found] = loaded_ids[positions[found]] == ids[found]
+
+        if found.any():
+            for name, column in self._columns.items():
+                column[positions[found]] = batch[name][found]
+
+        new = ~found
+        if new.any():
+            out_of_order = self.size > 0 and ids[new].min() < self.max_id
+            start = self.size
+            count = int(new.sum())
+            self._grow(start + count)
+            for name, column in self._columns.items():
+                column[start:start + count] = batch[name][new]
+            self.size += count
+            if out_of_order or not np.all(ids[new][1:] > ids[new][:-1]):
+                # A lower id committed late (or the batch was unsorted): restore id order
+                order = np.argsort(self.column("id"), kind="stable")
+                for name, column in self._columns.items():
+                    column[:self.size] = column[:self.size][order]
+            self.max_id = int(self.column("id")[-1])
+
+        latest_created = int(batch["created_at"].max())
+        if self.created_hwm is None or latest_created > self.created_hwm:
+            self.created_hwm = latest_created
+        self.stats["rows_applied"] += len(ids)
+
+    def _apply(self, result) -> int:
+        applied = 0
+        for rows in result.partitions(ANALYTICS_LOAD_BATCH):
+            self.merge_columns(self._encode_rows(rows))
+            applied += len(rows)
+        return applied
+
+    def _expected_count(self, db: Session) -> int:
+        """Transaction count from the spend rollup: O(periods), not O(transactions)"""
+        return int(db.query(func.coalesce(func.sum(SpendRollup.transaction_count), 0)).scalar())
+
+    def load(self, db: Session) -> None:
+        """Full (re)load of every transaction"""
+        with self._lock:
+            started = time.perf_counter()
+            self._reset()
+            expected = self._expected_count(db)
+            result = db.execute(
+                self._select().order_by(AccountTransaction.id).execution_options(yield_per=ANALYTICS_LOAD_BATCH)
+            )
+            self._apply(result)
+            # The rollup may not match exactly (e.g. before a backfill); later checks compare against this offset
+            self._count_offset = expected - self.size
+            self.last_refresh = time.monotonic()
+            self.stats["full_loads"] += 1
+            logger.info(f"✅ Transaction analytics loaded {self.size} rows in {time.perf_counter() - started:.2f}s")
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Apply changes since the last refresh (full load on first use or after deletes)"""
+        with self._lock:
+            if self.last_refresh == 0:
+                self.load(db)
+                return
+            if not force and time.monotonic() - self.last_refresh < ANALYTICS_REFRESH_INTERVAL:
+                return
+
+            t = AccountTransaction
+            changed = [t.id > self.max_id]
+            if self.created_hwm is not None:
+                changed.append(t.created_at >= datetime.fromtimestamp(self.created_hwm - ANALYTICS_REFRESH_OVERLAP, tz=timezone.utc))
+            if self.updated_hwm is not None:
+                changed.append(t.updated_at >= self.updated_hwm - timedelta(seconds=ANALYTICS_REFRESH_OVERLAP))
+            expected = self._expected_count(db)
+            self._apply(db.execute(self._select().where(or_(*changed)).order_by(t.id)))
+            self.last_refresh = time.monotonic()
+            self.stats["incremental_refreshes"] += 1
+
+            if expected - self.size == self._count_offset:
+                self._count_mismatch = False
+            elif self._count_mismatch:
+                # Still off after a second refresh: rows were deleted (a racing insert would have been picked up)
+                logger.info("🔄 Transaction analytics row count drifted from the spend rollup; reloading")
+                self.load(db)
+            else:
+                self._count_mismatch = True
+
+    # Querying
+
+    def _matches(self, dimension: str, values: Sequence[Any]) -> np.ndarray:
+        dictionary = self.dictionaries[dimension]
+        codes = {dictionary.lookup(value) for value in values} - {None}
+        column = self.column(dimension)
+        if len(codes) > 8:
+            return np.isin(column, np.fromiter(codes, dtype=np.int32))
+        mask = np.zeros(self.size, dtype=bool)
+        for code in codes:
+            mask |= column == code
+        return mask
+
+    def query(self, group_by: Sequence[str] = (), bucket: Optional[str] = None,
+              metrics: Sequence[str] = ("amount", "count"), filters: Optional[Dict[str, Sequence[Any]]] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              order_by: Optional[str] = None, limit: Optional[int] = None) -> dict:
+        """Filter, group and aggregate the loaded transactions.
+
+        group_by: any of DIMENSIONS; bucket: one of BUCKETS (groups by period of created_at);
+        metrics: any of METRICS (unit_price is amount-weighted: sum(amount) / sum(quantity));
+        filters: dimension -> accepted values; start/end bound created_at (end exclusive);
+        order_by: a metric to sort descending by, with limit for top-N.
+        """
+        for dimension in list(group_by) + list(filters or {}):
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension '{dimension}'. Use one of: {', '.join(DIMENSIONS)}")
+        if bucket is not None and bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}'. Use one of: {', '.join(BUCKETS)}")
+        for metric in list(metrics) + ([order_by] if order_by else []):
+            if metric not in METRICS:
+                raise ValueError(f"Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}")
+
+        with self._lock:
+            started = time.perf_counter()
+            created_at = self.column("created_at")
+            mask = None
+            conditions = [self._matches(dimension, values) for dimension, values in (filters or {}).items()]
+            if start is not None:
+                conditions.append(created_at >= _epoch_seconds(start))
+            if end is not None:
+                conditions.append(created_at < _epoch_seconds(end))
+            for condition in conditions:
+                mask = condition if mask is None else mask & condition
+
+            def selected(column: np.ndarray) -> np.ndarray:
+                return column if mask is None else column[mask]
+
+            # Fold every grouping column into one mixed-radix int64 key
+            parts = []
+            for dimension in group_by:
+                parts.append((dimension, selected(self.column(dimension)), 0, max(len(self.dictionaries[dimension].values), 1)))
+            if bucket is not None:
+                if bucket in ("day", "week"):
+                    periods = bucket_codes(selected(created_at), bucket)
+                else:
+                    periods = month_buckets(selected(self.column("month")), bucket)
+                first = int(periods.min()) if len(periods) else 0
+                parts.append(("period", periods - first, first, int(periods.max()) - first + 1 if len(periods) else 1))
+
+            matched = self.size if mask is None else int(np.count_nonzero(mask))
+            keys = None
+            key_space = 1
+            for _, codes, _, radix in parts:
+                keys = codes.astype(np.int64) if keys is None else keys * radix + codes
+                key_space *= radix
+            if keys is None:
+                keys = np.zeros(matched, dtype=np.int64)
+
+            if key_space <= max(4 * matched, 1 << 16):
+                # Small key space: the key is the bincount index, no sort needed
+                index, slots = keys, key_space
+            else:
+                unique_keys, index = np.unique(keys, return_inverse=True)
+                index, slots = index.reshape(-1), len(unique_keys)
+            # Only the sums the requested metrics need
+            needed = set(metrics) | ({order_by} if order_by else set())
+            values = {"count": np.bincount(index, minlength=slots)}
+            for column in ("amount", "quantity"):
+                if column in needed or "unit_price" in needed:
+                    values[column] = np.bincount(index, weights=selected(self.column(column)), minlength=slots)
+            if slots == key_space:
+                groups = np.flatnonzero(values["count"])
+                values = {name: sums[groups] for name, sums in values.items()}
+            else:
+                groups = unique_keys
+            if "unit_price" in needed:
+                values["unit_price"] = np.divide(
+                    values["amount"], values["quantity"], out=np.zeros_like(values["amount"]), where=values["quantity"] > 0
+                )
+
+            order = np.arange(len(groups))
+            if order_by:
+                order = np.argsort(-values[order_by], kind="stable")
+            if limit is not None:
+                order = order[:limit]
+
+            # Decode the keys of the selected groups only
+            decoded = {}
+            remaining = groups[order]
+            for name, _, offset, radix in reversed(parts):
+                decoded[name] = remaining % radix + offset
+                remaining = remaining // radix
+
+            # Build the response rows from plain lists (per-element NumPy indexing is slow for large results)
+            columns = []
+            for dimension in group_by:
+                labels = self.dictionaries[dimension].values
+                columns.append((dimension, [labels[code] for code in decoded[dimension].tolist()]))
+            if bucket is not None:
+                periods = decoded["period"].tolist()
+                starts = {code: bucket_start(code, bucket) for code in set(periods)}
+                columns.append(("period", [starts[code] for code in periods]))
+            for metric in metrics:
+                columns.append((metric, values[metric][order].tolist()))
+            names = [name for name, _ in columns]
+            rows = [dict(zip(names, row)) for row in zip(*(column for _, column in columns))]
+
+            return {
+                "rows": rows,
+                "matched_transactions": matched,
+                "loaded_transactions": self.size,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+            }
+
+def label_chemicals(db: Session, rows: List[dict]) -> List[dict]:
+    """Add chemical_name to rows grouped by chemical (one query for the chemicals in the result)"""
+    ids = {row["chemical"] for row in rows if "chemical" in row}
+    if not ids:
+        return rows
+    names = dict(db.query(ChemicalInventory.id, ChemicalInventory.name).filter(ChemicalInventory.id.in_(ids)).all())
+    for row in rows:
+        if "chemical" in row:
+            row["chemical_name"] = names.get(row["chemical"])
+    return rows
+
+transaction_analytics = TransactionAnalytics()
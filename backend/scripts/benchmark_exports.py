@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Worker memory and throughput of the streaming exports.
+
+Seeds account transactions inside one transaction that is rolled back at the
+end, then exports the first 1k rows and then all of them, two ways:
+
+  - buffered: fetch every row, then encode the whole file (what paging the
+    JSON API into one download amounts to)
+  - streamed: app.services.exports.export_chunks, yield_per batches of
+    EXPORT_BATCH_SIZE rows (a server-side cursor on PostgreSQL)
+
+Peak traced allocation (tracemalloc) should stay flat for the streamed export
+however many rows it writes.
+
+Usage: python scripts/benchmark_exports.py [rows] [format]
+"""
+
+import sys
+import os
+import time
+import uuid
+import tracemalloc
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.models.user import User, UserRole
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.account_transactions import AccountTransaction
+from app.crud import exports as crud_exports
+from app.services.exports import EXPORT_BATCH_SIZE, encode_rows, export_chunks
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+FORMAT = sys.argv[2] if len(sys.argv) > 2 else "csv"
+SEED_BATCH = 10_000
+
+def seed(db: Session) -> str:
+    tag = uuid.uuid4().hex[:8]
+    user_uid = f"bench-{tag}"
+    db.add(User(uid=user_uid, email=f"{user_uid}@example.com", first_name="Bench", role=UserRole.ACCOUNT))
+    chemical = ChemicalInventory(name=f"Bench chemical {tag}", quantity=0, unit="g")
+    db.add(chemical)
+    db.flush()
+    for offset in range(0, ROWS, SEED_BATCH):
+        db.execute(insert(AccountTransaction), [
+            {"chemical_id": chemical.id, "transaction_type": "purchase", "quantity": 2.0, "unit": "g",
+             "amount": 25.0 + n % 100, "currency": "USD", "supplier": f"Bench {tag}", "status": "delivered",
+             "notes": "Delivered to store room 2", "created_by": user_uid}
+            for n in range(offset, min(offset + SEED_BATCH, ROWS))
+        ])
+    return f"Bench {tag}"
+
+def buffered(db: Session, stmt) -> int:
+    result = db.execute(stmt)
+    names = list(result.keys())
+    return len(encode_rows(names, result.all(), FORMAT, header=FORMAT == "csv"))
+
+def streamed(db: Session, stmt) -> int:
+    return sum(len(chunk) for chunk in export_chunks(db, stmt, FORMAT))
+
+def measure(label: str, db: Session, run, stmt, rows: int) -> None:
+    db.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = run(db, stmt)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"   {label:<10} {rows:>9,} rows   {size / 1024 / 1024:7.1f} MiB out   "
+          f"peak {peak / 1024 / 1024:7.1f} MiB   {rows / elapsed:10,.0f} rows/s")
+
+def main():
+    engine.echo = False
+    print(f"🚀 Export benchmark: {ROWS:,} transactions as {FORMAT}, batches of {EXPORT_BATCH_SIZE:,}")
+    print("=" * 60)
+
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection)
+    try:
+        supplier = seed(db)
+        print(f"✅ Seeded {ROWS:,} transactions")
+
+        stmt = crud_exports.transaction_export(supplier=supplier)
+        for rows in (min(1_000, ROWS), ROWS):
+            print(f"\n📊 {rows:,} rows")
+            measure("buffered", db, buffered, stmt.limit(rows), rows)
+            measure("streamed", db, streamed, stmt.limit(rows), rows)
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    print("\n🧹 Rolled back all benchmark rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
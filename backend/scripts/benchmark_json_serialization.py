@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Serialization time per 10k rows for the large list endpoints.
+
+Builds pages of rows in memory, shaped as each endpoint returns them (no
+database needed), and encodes them three ways:
+
+  - json.dumps: response_model validation, dump to Python, stdlib json.dumps
+    (what FastAPI releases without the dump_json fast path do)
+  - response_model: validation plus pydantic-core dump_json (current FastAPI)
+  - fast path: what the endpoint returns with FAST_JSON_ENABLED=true, i.e.
+    orjson straight from the trusted Core rows for /chemicals/,
+    /account/transactions and /notifications/, and a pre-built TypeAdapter for
+    /admin/logs (its ORM objects are still validated once)
+
+Every variant is checked to decode to the same JSON before it is timed.
+
+Usage: python scripts/benchmark_json_serialization.py [rows] [repeats]
+"""
+
+import sys
+import os
+import json
+import time
+import statistics
+from datetime import datetime, timezone, timedelta
+from typing import List
+from pydantic import TypeAdapter
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.database  # noqa: F401 (loads the models in dependency order)
+from app.models.activity_log import ActivityLog
+from app.crud.rows import TransactionRow, NotificationRow
+from app.schema.chemical_inventory import ChemicalInventoryListItem, CHEMICAL_LIST_FIELDS
+from app.schema.account_transactions import AccountTransactionResponse
+from app.schema.notifications import NotificationResponse
+from app.schema.activity_log import ActivityLogListResponse
+from app.services.json_responses import rows_response, validated_response
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+NOW = datetime.now(timezone.utc)
+
+def chemical_rows() -> List[dict]:
+    """get_chemical_rows with the default fieldset returns dicts"""
+    values = {
+        "name": "Sodium chloride", "quantity": 125.5, "unit": "g", "alert_threshold": 10.0, "pack_size": 500.0,
+        "last_updated": NOW, "updated_by": "uid-bench", "version": 3, "stock_status": "in_stock"
+    }
+    return [{"id": n, **{name: values[name] for name in CHEMICAL_LIST_FIELDS if name != "id"}} for n in range(ROWS)]
+
+def transaction_rows() -> List[TransactionRow]:
+    return [
+        TransactionRow(n, n % 500, "purchase", 2.0, "g", 25.5, "USD", "Bench supplier", None, "delivered",
+                       None, "uid-bench", NOW - timedelta(minutes=n), None)
+        for n in range(ROWS)
+    ]
+
+def notification_rows() -> List[NotificationRow]:
+    return [
+        NotificationRow(n, "low_stock", "warning", f"Chemical {n} is below its alert threshold", n % 500,
+                        "uid-bench", NOW - timedelta(minutes=n), None, n % 3 == 0, False, ["admin", "lab_staff"])
+        for n in range(ROWS)
+    ]
+
+def activity_log_page() -> dict:
+    logs = []
+    for n in range(ROWS):
+        log = ActivityLog(id=n, user_id=1, action="update_chemical", description=f"Updated chemical {n}",
+                          timestamp=NOW - timedelta(minutes=n))
+        log.user_email = "bench@example.com"
+        logs.append(log)
+    return {"logs": logs, "total": ROWS, "limit": ROWS, "offset": 0}
+
+def timed(label: str, encode, baseline: float = None) -> float:
+    durations = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        encode()
+        durations.append(time.perf_counter() - start)
+    median = statistics.median(durations)
+    per_10k = median / ROWS * 10_000 * 1000
+    speedup = f"   ({baseline / median:.1f}x)" if baseline else ""
+    print(f"   {label:<16} {per_10k:8.1f} ms / 10k rows{speedup}")
+    return median
+
+def compare(label: str, adapter: TypeAdapter, content, fast, **dump_options) -> None:
+    def stdlib():
+        validated = adapter.validate_python(content, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json", **dump_options),
+                          ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def response_model():
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True), **dump_options)
+
+    expected = json.loads(stdlib())
+    assert json.loads(response_model()) == expected, f"{label}: response_model output differs"
+    assert json.loads(fast().body) == expected, f"{label}: fast path output differs"
+
+    print(f"\n📊 {label}")
+    baseline = timed("json.dumps", stdlib)
+    timed("response_model", response_model, baseline)
+    timed("fast path", fast, baseline)
+
+def main():
+    print(f"🚀 JSON serialization benchmark: pages of {ROWS:,} rows, {REPEATS} repeats")
+    print("=" * 60)
+
+    try:
+        chemicals = chemical_rows()
+        compare("GET /chemicals/", TypeAdapter(List[ChemicalInventoryListItem]), chemicals,
+                lambda: rows_response(chemicals), exclude_unset=True)
+        transactions = transaction_rows()
+        compare("GET /account/transactions", TypeAdapter(List[AccountTransactionResponse]), transactions,
+                lambda: rows_response(transactions))
+        notifications = notification_rows()
+        compare("GET /notifications/", TypeAdapter(List[NotificationResponse]), notifications,
+                lambda: rows_response(notifications))
+        page = activity_log_page()
+        log_page = TypeAdapter(ActivityLogListResponse)
+        compare("GET /admin/logs", log_page, page, lambda: validated_response(log_page, page))
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
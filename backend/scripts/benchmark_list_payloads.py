@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Payload-size and latency benchmark for the chemical and formulation list
+endpoints on a catalog with long notes.
+
+Seeds chemicals with multi-kilobyte notes and formulation text (and a few
+formulation rows each) inside one transaction that is rolled back at the end,
+then loads and serializes a page the way each list endpoint does:
+
+  - all columns: every column loaded and serialized (the old list behaviour)
+  - default: formulation/notes deferred (load_only) and left out of the rows
+  - fields=...: only the columns a list view shows
+
+Usage: python scripts/benchmark_list_payloads.py [chemicals] [page_size] [repeats]
+"""
+
+import sys
+import os
+import time
+import statistics
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.formulation_details import FormulationDetails
+from app.crud import chemical_inventory as crud_chemical_inventory
+from app.crud import formulation_details as crud_formulation_details
+from app.schema.chemical_inventory import ChemicalInventoryResponse, ChemicalInventoryListItem, CHEMICAL_LIST_FIELDS
+from app.schema.formulation_details import FormulationDetailsResponse, FormulationDetailsListItem, FORMULATION_LIST_FIELDS
+from app.services.fieldsets import parse_fields, pick
+
+CHEMICALS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+PAGE_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+REPEATS = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+FORMULATIONS_PER_CHEMICAL = 3
+
+NOTES = "Stored in flammables cabinet B. Opened 2024-03-02, re-tested monthly. " * 60  # ~4 KB
+FORMULATION = "Dissolve in deionised water at 25 C, stir 30 min, filter 0.22 um. " * 30  # ~2 KB
+
+def seed(db: Session) -> None:
+    db.execute(insert(ChemicalInventory), [
+        {"name": f"Bench chemical {n}", "quantity": n % 500, "unit": "g", "notes": NOTES, "formulation": FORMULATION}
+        for n in range(CHEMICALS)
+    ])
+    chemical_ids = [row[0] for row in db.query(ChemicalInventory.id).filter(ChemicalInventory.name.like("Bench chemical %"))]
+    db.execute(insert(FormulationDetails), [
+        {"chemical_id": chemical_id, "component_name": f"Component {k}", "amount": 1.0, "unit": "g",
+         "available_quantity": 10.0, "required_quantity": 1.0, "notes": NOTES[:2000]}
+        for chemical_id in chemical_ids for k in range(FORMULATIONS_PER_CHEMICAL)
+    ])
+
+def timed(label: str, db: Session, run) -> None:
+    durations = []
+    for _ in range(REPEATS):
+        db.expunge_all()
+        start = time.perf_counter()
+        payload = run()
+        durations.append((time.perf_counter() - start) * 1000)
+    print(f"   {label:<36} {len(payload) / 1024:9.1f} KiB   median {statistics.median(durations):8.1f} ms")
+
+def main():
+    engine.echo = False
+    print(f"🚀 List payload benchmark: {CHEMICALS:,} chemicals, page of {PAGE_SIZE:,}, {REPEATS} repeats")
+    print("=" * 60)
+
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection)
+    try:
+        seed(db)
+        print(f"✅ Seeded {CHEMICALS:,} chemicals and {CHEMICALS * FORMULATIONS_PER_CHEMICAL:,} formulation rows")
+
+        full_chemicals = TypeAdapter(List[ChemicalInventoryResponse])
+        sparse_chemicals = TypeAdapter(List[ChemicalInventoryListItem])
+
+        chemical_columns = list(ChemicalInventoryResponse.model_fields)
+
+        def chemical_page(fields=None):
+            if fields is None:
+                rows = crud_chemical_inventory.get_chemical_inventory(db, limit=PAGE_SIZE)
+                return full_chemicals.dump_json(full_chemicals.validate_python(rows, from_attributes=True))
+            rows = crud_chemical_inventory.get_chemical_inventory(db, limit=PAGE_SIZE, fields=fields)
+            return sparse_chemicals.dump_json(
+                sparse_chemicals.validate_python([pick(row, fields) for row in rows]), exclude_unset=True
+            )
+
+        print("\n📊 GET /chemicals/")
+        timed("all columns (before)", db, lambda: chemical_page())
+        timed("default (notes/formulation deferred)", db,
+              lambda: chemical_page(parse_fields(None, chemical_columns, CHEMICAL_LIST_FIELDS)))
+        timed("fields=name,quantity,unit", db,
+              lambda: chemical_page(parse_fields("name,quantity,unit", chemical_columns, CHEMICAL_LIST_FIELDS)))
+
+        full_formulations = TypeAdapter(List[FormulationDetailsResponse])
+        sparse_formulations = TypeAdapter(List[FormulationDetailsListItem])
+
+        formulation_columns = list(FormulationDetailsResponse.model_fields)
+
+        def formulation_page(fields=None):
+            if fields is None:
+                rows = crud_formulation_details.get_formulation_details(db, limit=PAGE_SIZE)
+                return full_formulations.dump_json(full_formulations.validate_python(rows, from_attributes=True))
+            rows = crud_formulation_details.get_formulation_details(db, limit=PAGE_SIZE, fields=fields)
+            return sparse_formulations.dump_json(
+                sparse_formulations.validate_python([pick(row, fields) for row in rows]), exclude_unset=True
+            )
+
+        print("\n📊 GET /formulations/")
+        timed("all columns (before)", db, lambda: formulation_page())
+        timed("default (notes deferred)", db,
+              lambda: formulation_page(parse_fields(None, formulation_columns, FORMULATION_LIST_FIELDS)))
+        timed("fields=component_name,amount,unit", db,
+              lambda: formulation_page(parse_fields("component_name,amount,unit", formulation_columns, FORMULATION_LIST_FIELDS)))
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    print("\n🧹 Rolled back all benchmark rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
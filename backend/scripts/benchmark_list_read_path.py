@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+CPU and memory per row of the ORM-free list read path against the ORM path.
+
+Seeds chemicals, formulations, account transactions and notifications inside
+one transaction that is rolled back at the end, then reads a page of each
+both ways and validates it with the endpoint's response model (as FastAPI
+does before encoding):
+
+  - ORM: db.query(Model) objects, validated with from_attributes
+  - Core: select() rows materialized into __slots__ dataclasses (app/crud/rows.py)
+
+Reports the median time and the peak traced allocation (tracemalloc) per row.
+
+Usage: python scripts/benchmark_list_read_path.py [rows] [repeats]
+"""
+
+import sys
+import os
+import time
+import uuid
+import statistics
+import tracemalloc
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.models.user import User, UserRole
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.formulation_details import FormulationDetails
+from app.models.account_transactions import AccountTransaction
+from app.models.notifications import Notification, NotificationRecipient
+from app.crud import chemical_inventory as crud_chemical_inventory
+from app.crud import formulation_details as crud_formulation_details
+from app.crud import account_transactions as crud_account
+from app.crud import notifications as crud_notifications
+from app.schema.chemical_inventory import ChemicalInventoryResponse
+from app.schema.formulation_details import FormulationDetailsResponse
+from app.schema.account_transactions import AccountTransactionResponse
+from app.schema.notifications import NotificationResponse
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+def seed(db: Session) -> str:
+    tag = uuid.uuid4().hex[:8]
+    user_uid = f"bench-{tag}"
+    db.add(User(uid=user_uid, email=f"{user_uid}@example.com", first_name="Bench", role=UserRole.ADMIN))
+    db.flush()
+    db.execute(insert(ChemicalInventory), [
+        {"name": f"Bench {tag} {n}", "quantity": n % 500, "unit": "g", "notes": "Shelf B", "updated_by": user_uid}
+        for n in range(ROWS)
+    ])
+    chemical_ids = db.execute(
+        select(ChemicalInventory.id).where(ChemicalInventory.name.like(f"Bench {tag} %"))
+    ).scalars().all()
+    db.execute(insert(FormulationDetails), [
+        {"chemical_id": chemical_id, "component_name": "Water", "amount": 1.0, "unit": "l",
+         "available_quantity": 5.0, "required_quantity": 1.0, "updated_by": user_uid}
+        for chemical_id in chemical_ids
+    ])
+    db.execute(insert(AccountTransaction), [
+        {"chemical_id": chemical_id, "transaction_type": "purchase", "quantity": 2.0, "unit": "g", "amount": 25.0,
+         "currency": "USD", "supplier": "Bench supplier", "status": "delivered", "created_by": user_uid}
+        for chemical_id in chemical_ids
+    ])
+    notification_ids = db.execute(
+        insert(Notification).returning(Notification.id, sort_by_parameter_order=True),
+        [{"type": "info", "severity": "info", "message": f"Bench notification {n}", "user_id": user_uid} for n in range(ROWS)]
+    ).scalars().all()
+    db.execute(insert(NotificationRecipient), [
+        {"notification_id": notification_id, "role": role}
+        for notification_id in notification_ids for role in ("admin", "product")
+    ])
+    return user_uid
+
+def measure(db: Session, run, adapter: TypeAdapter) -> tuple:
+    """Median seconds and peak traced bytes for reading + validating one page"""
+    durations = []
+    for _ in range(REPEATS):
+        db.expunge_all()
+        start = time.perf_counter()
+        adapter.validate_python(run(), from_attributes=True)
+        durations.append(time.perf_counter() - start)
+    db.expunge_all()
+    tracemalloc.start()
+    rows = adapter.validate_python(run(), from_attributes=True)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(durations), peak, len(rows)
+
+def compare(label: str, db: Session, adapter: TypeAdapter, orm, core) -> None:
+    orm_time, orm_peak, count = measure(db, orm, adapter)
+    core_time, core_peak, _ = measure(db, core, adapter)
+    count = max(count, 1)
+    print(f"   {label:<14} ORM {orm_time / count * 1e6:6.1f} µs/row {orm_peak / count:7.0f} B/row   "
+          f"Core {core_time / count * 1e6:6.1f} µs/row {core_peak / count:7.0f} B/row   "
+          f"({orm_time / core_time:.1f}x faster, {orm_peak / max(core_peak, 1):.1f}x less memory)")
+
+def main():
+    engine.echo = False
+    print(f"🚀 List read path benchmark: pages of {ROWS:,} rows, {REPEATS} repeats")
+    print("=" * 60)
+
+    connection = engine.connect()
+    outer = connection.begin()
+    db = Session(bind=connection)
+    try:
+        user_uid = seed(db)
+        print(f"✅ Seeded {ROWS:,} chemicals, formulations, transactions and notifications")
+
+        print("\n📊 Read + validate one page")
+        compare("chemicals", db, TypeAdapter(List[ChemicalInventoryResponse]),
+                lambda: crud_chemical_inventory.get_chemical_inventory(db, limit=ROWS),
+                lambda: crud_chemical_inventory.get_chemical_rows(db, limit=ROWS))
+        compare("formulations", db, TypeAdapter(List[FormulationDetailsResponse]),
+                lambda: crud_formulation_details.get_formulation_details(db, limit=ROWS),
+                lambda: crud_formulation_details.get_formulation_rows(db, limit=ROWS))
+        compare("transactions", db, TypeAdapter(List[AccountTransactionResponse]),
+                lambda: crud_account.get_account_transactions(db, limit=ROWS),
+                lambda: crud_account.get_account_transaction_rows(db, limit=ROWS))
+        compare("notifications", db, TypeAdapter(List[NotificationResponse]),
+                lambda: crud_notifications.get_notifications(db, limit=ROWS, user_role=UserRole.ADMIN, user_uid=user_uid),
+                lambda: crud_notifications.get_notification_rows(db, UserRole.ADMIN, user_uid, limit=ROWS))
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    print("\n🧹 Rolled back all benchmark rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Query-count check for the purchase order endpoints.
+
+Seeds purchase orders with items inside one transaction that is rolled back at
+the end (nothing is left in the database), then counts the SQL statements sent
+while listing and serializing them the way the API does:
+
+  - lazy: the old list query, where every order's items load on first access (1 + N)
+  - selectinload: crud.get_purchase_orders (2 queries for any page size)
+
+Creating an order is counted too (order INSERT, one executemany for the items,
+one UPDATE for the total, then the reload).
+
+Usage: python scripts/benchmark_purchase_order_queries.py [orders] [items_per_order]
+"""
+
+import sys
+import os
+import time
+import uuid
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.models.user import User, UserRole
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.account_transactions import PurchaseOrder, PurchaseOrderItem
+from app.crud import account_transactions as crud_account
+from app.schema.account_transactions import PurchaseOrderCreate, PurchaseOrderItemCreate, PurchaseOrderResponse
+
+ORDERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+ITEMS_PER_ORDER = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+class QueryCounter:
+    """Counts statements executed on one connection"""
+
+    def __init__(self, connection):
+        self.count = 0
+        event.listen(connection, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+def seed(db: Session) -> str:
+    tag = uuid.uuid4().hex[:8]
+    user = User(uid=f"bench-{tag}", email=f"bench-{tag}@example.com", first_name="Bench", role=UserRole.ACCOUNT)
+    chemical = ChemicalInventory(name=f"Bench chemical {tag}", quantity=0, unit="g")
+    db.add_all([user, chemical])
+    db.flush()
+    for n in range(ORDERS):
+        crud_account.create_purchase_order(db, PurchaseOrderCreate(
+            supplier=f"Bench supplier {n % 10}",
+            items=[
+                PurchaseOrderItemCreate(chemical_id=chemical.id, quantity=i + 1, unit="g", unit_price=2.5)
+                for i in range(ITEMS_PER_ORDER)
+            ]
+        ), user.uid)
+    return user.uid
+
+def measure(label: str, counter: QueryCounter, run) -> None:
+    before = counter.count
+    start = time.perf_counter()
+    run()
+    print(f"   {label:<40} {counter.count - before:6d} queries   {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+def lazy_list(db: Session) -> list:
+    orders = db.query(PurchaseOrder).order_by(PurchaseOrder.id.desc()).limit(ORDERS).all()
+    return [PurchaseOrderResponse.model_validate(order) for order in orders]
+
+def eager_list(db: Session) -> list:
+    orders = crud_account.get_purchase_orders(db, limit=ORDERS)
+    return [PurchaseOrderResponse.model_validate(order) for order in orders]
+
+def main():
+    engine.echo = False
+    print(f"🚀 Purchase order query count: {ORDERS} orders x {ITEMS_PER_ORDER} items")
+    print("=" * 60)
+
+    connection = engine.connect()
+    outer = connection.begin()
+    # crud commits become savepoint releases, so the rollback below undoes everything
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    counter = QueryCounter(connection)
+    try:
+        user_uid = seed(db)
+        print(f"✅ Seeded {ORDERS} orders ({counter.count} statements, {counter.count / ORDERS:.1f} per order)")
+
+        print("\n📊 List + serialize")
+        db.expunge_all()
+        measure("lazy items (before)", counter, lambda: lazy_list(db))
+        db.expunge_all()
+        measure("selectinload items (after)", counter, lambda: eager_list(db))
+
+        print("\n📝 Create one order")
+        chemical_id = db.query(PurchaseOrderItem.chemical_id).limit(1).scalar()
+        measure(f"create with {ITEMS_PER_ORDER} items", counter, lambda: crud_account.create_purchase_order(
+            db, PurchaseOrderCreate(
+                supplier="Bench supplier",
+                items=[PurchaseOrderItemCreate(chemical_id=chemical_id, quantity=1, unit="g", unit_price=1.0)] * ITEMS_PER_ORDER
+            ), user_uid
+        ))
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    print("\n🧹 Rolled back all benchmark rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Bytes on the wire and latency for the response encodings clients can negotiate.
+
+Builds typical list payloads in memory, shaped and JSON-encoded as the
+endpoints return them (no database needed), then encodes each one the way
+ResponseEncodingMiddleware would for the given Accept / Accept-Encoding:
+
+  - identity JSON, gzip and br at the configured levels (RESPONSE_GZIP_LEVEL,
+    RESPONSE_BROTLI_QUALITY), plus a faster and a smaller level of each
+  - MessagePack, alone and br-compressed
+
+Latency is the median encode time plus the transfer time at the given
+bandwidth (default 10 Mbit/s, a scanner on shop-floor Wi-Fi).
+
+Usage: python scripts/benchmark_response_encoding.py [bandwidth_mbit] [repeats]
+"""
+
+import sys
+import os
+import time
+import statistics
+from datetime import datetime, timezone, timedelta
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.database  # noqa: F401 (loads the models in dependency order)
+from app.crud.rows import TransactionRow, NotificationRow
+from app.schema.chemical_inventory import CHEMICAL_LIST_FIELDS
+from app.services.json_responses import rows_response
+from app.services.response_encoding import (
+    RESPONSE_GZIP_LEVEL, RESPONSE_BROTLI_QUALITY, RESPONSE_COMPRESSION_MIN_SIZE, compress, to_msgpack
+)
+
+BANDWIDTH_MBIT = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+NOW = datetime.now(timezone.utc)
+UNITS = ("g", "kg", "ml", "l")
+STATUSES = ("in_stock", "low_stock", "out_of_stock")
+
+def chemicals(rows: int) -> bytes:
+    page = []
+    for n in range(rows):
+        values = {
+            "id": n + 1, "name": f"Chemical {n} ({'ACS' if n % 2 else 'Reagent'} grade)", "quantity": round(n * 3.7 % 900, 2),
+            "unit": UNITS[n % 4], "alert_threshold": 10.0, "pack_size": [None, 500.0, 1000.0][n % 3],
+            "last_updated": NOW - timedelta(minutes=n * 7), "updated_by": f"uid-{n % 12:04d}", "version": n % 9 + 1,
+            "stock_status": STATUSES[n % 3]
+        }
+        page.append({name: values[name] for name in CHEMICAL_LIST_FIELDS})
+    return rows_response(page).body
+
+def transactions(rows: int) -> bytes:
+    return rows_response([
+        TransactionRow(n + 1, n % 400 + 1, ("purchase", "usage")[n % 2], round(n * 1.3 % 50, 2), UNITS[n % 4],
+                       round(n * 17.9 % 2000, 2), "USD", f"Supplier {n % 15}", None, "delivered", None,
+                       f"uid-{n % 12:04d}", NOW - timedelta(minutes=n * 13), None)
+        for n in range(rows)
+    ]).body
+
+def notifications(rows: int) -> bytes:
+    return rows_response([
+        NotificationRow(n + 1, "low_stock", ("warning", "critical")[n % 2], f"Chemical {n % 400} is below its alert threshold",
+                        n % 400 + 1, None, NOW - timedelta(minutes=n * 5), None, n % 3 == 0, False, ["admin", "lab_staff"])
+        for n in range(rows)
+    ]).body
+
+def encodings():
+    return [
+        ("json", lambda body: body),
+        ("gzip level 1", lambda body: compress(body, "gzip", 1)),
+        (f"gzip level {RESPONSE_GZIP_LEVEL} (configured)", lambda body: compress(body, "gzip")),
+        ("gzip level 9", lambda body: compress(body, "gzip", 9)),
+        ("br quality 1", lambda body: compress(body, "br", 1)),
+        (f"br quality {RESPONSE_BROTLI_QUALITY} (configured)", lambda body: compress(body, "br")),
+        ("br quality 11", lambda body: compress(body, "br", 11)),
+        ("msgpack", to_msgpack),
+        ("msgpack + br (configured)", lambda body: compress(to_msgpack(body), "br")),
+    ]
+
+def report(label: str, body: bytes) -> None:
+    print(f"\n📊 {label}: {len(body) / 1024:.1f} KiB JSON")
+    for name, encode in encodings():
+        durations = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            encoded = encode(body)
+            durations.append(time.perf_counter() - start)
+        encode_ms = statistics.median(durations) * 1000
+        transfer_ms = len(encoded) * 8 / (BANDWIDTH_MBIT * 1e6) * 1000
+        print(f"   {name:<28} {len(encoded) / 1024:8.1f} KiB ({len(encoded) / len(body):5.1%})   "
+              f"encode {encode_ms:6.2f} ms   + transfer {transfer_ms:7.1f} ms = {encode_ms + transfer_ms:7.1f} ms")
+
+def main():
+    print(f"🚀 Response encoding benchmark at {BANDWIDTH_MBIT:g} Mbit/s, {REPEATS} repeats "
+          f"(bodies under {RESPONSE_COMPRESSION_MIN_SIZE} bytes are sent uncompressed)")
+    print("=" * 60)
+
+    try:
+        report("GET /chemicals/ (100 rows)", chemicals(100))
+        report("GET /chemicals/?limit=1000", chemicals(1000))
+        report("GET /account/transactions?limit=1000", transactions(1000))
+        report("GET /notifications/ (100 rows)", notifications(100))
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
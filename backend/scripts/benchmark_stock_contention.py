@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark: 50 concurrent writers consuming from one chemical row.
+
+Compares the old read-modify-write pattern (SELECT quantity, then UPDATE with
+an absolute value) against the atomic consume path. Run against a disposable
+database; the script creates and removes its own chemical row.
+
+Usage: python scripts/benchmark_stock_contention.py [writers] [ops_per_writer]
+"""
+
+import sys
+import os
+import time
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_URL
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.user import User, UserRole
+from app.crud.chemical_inventory import consume_chemical_inventory
+from app.schema.chemical_inventory import ChemicalStockChange
+
+WRITERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+OPS_PER_WRITER = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+bench_engine = create_engine(DATABASE_URL, pool_size=WRITERS, max_overflow=0, echo=False)
+BenchSession = sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)
+
+def read_modify_write(chemical_id: int, user_uid: str) -> float:
+    """The pre-existing pattern: load, compute a new absolute quantity, write it back"""
+    start = time.perf_counter()
+    with bench_engine.begin() as conn:
+        quantity = conn.execute(
+            text("SELECT quantity FROM chemical_inventory WHERE id = :id"), {"id": chemical_id}
+        ).scalar()
+        conn.execute(
+            text("UPDATE chemical_inventory SET quantity = :q WHERE id = :id"),
+            {"q": quantity - 1, "id": chemical_id}
+        )
+    return time.perf_counter() - start
+
+def atomic_consume(chemical_id: int, user_uid: str) -> float:
+    """The new single-statement consume path"""
+    start = time.perf_counter()
+    db = BenchSession()
+    try:
+        consume_chemical_inventory(
+            db, chemical_id, ChemicalStockChange(amount=1), user_uid, UserRole.ADMIN
+        )
+    finally:
+        db.close()
+    return time.perf_counter() - start
+
+def run(label, worker, chemical_id, user_uid, initial):
+    total_ops = WRITERS * OPS_PER_WRITER
+    
+    def writer(_):
+        return [worker(chemical_id, user_uid) for _ in range(OPS_PER_WRITER)]
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WRITERS) as pool:
+        latencies = [lat for batch in pool.map(writer, range(WRITERS)) for lat in batch]
+    elapsed = time.perf_counter() - start
+    
+    with bench_engine.connect() as conn:
+        final = conn.execute(
+            text("SELECT quantity FROM chemical_inventory WHERE id = :id"), {"id": chemical_id}
+        ).scalar()
+    
+    latencies.sort()
+    expected = initial - total_ops
+    print(f"\n📊 {label}")
+    print(f"   ops: {total_ops}  elapsed: {elapsed:.2f}s  throughput: {total_ops / elapsed:.0f} ops/s")
+    print(f"   latency p50: {statistics.median(latencies) * 1000:.1f} ms  "
+          f"p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+    print(f"   final quantity: {final}  expected: {expected}  lost updates: {int(final - expected)}")
+
+def main():
+    print(f"🚀 Stock contention benchmark ({WRITERS} writers x {OPS_PER_WRITER} ops)")
+    print("=" * 60)
+    
+    db = BenchSession()
+    try:
+        admin = db.query(User).filter(User.role == UserRole.ADMIN).first()
+        if not admin:
+            print("❌ No admin user found. Run scripts/create_admin.py first.")
+            return
+        
+        initial = float(WRITERS * OPS_PER_WRITER)
+        chemical = ChemicalInventory(name="__contention_benchmark__", quantity=initial, unit="g")
+        db.add(chemical)
+        db.commit()
+        chemical_id = chemical.id
+        
+        run("read-modify-write", read_modify_write, chemical_id, admin.uid, initial)
+        
+        db.query(ChemicalInventory).filter(ChemicalInventory.id == chemical_id).update(
+            {"quantity": initial}, synchronize_session=False
+        )
+        db.commit()
+        
+        run("atomic consume", atomic_consume, chemical_id, admin.uid, initial)
+    finally:
+        db.execute(text("DELETE FROM activity_logs WHERE description LIKE '%__contention_benchmark__%'"))
+        db.execute(text("DELETE FROM chemical_inventory WHERE name = '__contention_benchmark__'"))
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the in-memory transaction analytics engine.
+
+Builds a synthetic column store (10M transactions by default, no database
+needed), then times the typical finance questions: spend by supplier and
+quarter, unit-price drift per chemical and month, top-N consumers and a
+filtered time range. An incremental merge of updated and new rows is timed
+too. A plain Python group-by over a sample gives the row-at-a-time baseline.
+
+Usage: python scripts/benchmark_transaction_analytics.py [rows] [repeats]
+"""
+
+import sys
+import os
+import time
+import statistics
+from datetime import datetime, timezone
+import numpy as np
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import database  # noqa: F401 (models must be imported through app.database first)
+from app.services.transaction_analytics import TransactionAnalytics, bucket_codes
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+BASELINE_ROWS = min(ROWS, 1_000_000)
+
+CHEMICALS = 5_000
+SUPPLIERS = [f"Supplier {i}" for i in range(200)] + [""]
+CURRENCIES = ["USD", "EUR", "INR"]
+TYPES = ["purchase", "usage", "adjustment"]
+STATUSES = ["pending", "ordered", "delivered", "cancelled"]
+START = int(datetime(2021, 1, 1, tzinfo=timezone.utc).timestamp())
+END = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+
+def synthetic_batch(engine: TransactionAnalytics, ids: np.ndarray, rng: np.random.Generator) -> dict:
+    """Encoded columns for the given ids, with codes drawn from the engine's dictionaries"""
+    n = len(ids)
+    return {
+        "id": ids.astype(np.int64),
+        "chemical": rng.integers(0, CHEMICALS, n, dtype=np.int32),
+        "supplier": rng.integers(0, len(SUPPLIERS), n, dtype=np.int32),
+        "currency": rng.choice(np.arange(len(CURRENCIES), dtype=np.int32), n, p=[0.8, 0.15, 0.05]),
+        "transaction_type": rng.choice(np.arange(len(TYPES), dtype=np.int32), n, p=[0.5, 0.45, 0.05]),
+        "status": rng.integers(0, len(STATUSES), n, dtype=np.int32),
+        "created_at": np.sort(rng.integers(START, END, n, dtype=np.int64)),
+        "quantity": rng.uniform(0.1, 100.0, n),
+        "amount": rng.uniform(1.0, 5_000.0, n),
+    }
+
+def build(rows: int) -> TransactionAnalytics:
+    engine = TransactionAnalytics()
+    for dimension, values in (("chemical", range(1, CHEMICALS + 1)), ("supplier", SUPPLIERS),
+                              ("currency", CURRENCIES), ("transaction_type", TYPES), ("status", STATUSES)):
+        for value in values:
+            engine.dictionaries[dimension].code(value)
+    rng = np.random.default_rng(42)
+    chunk = 1_000_000
+    for first in range(1, rows + 1, chunk):
+        engine.merge_columns(synthetic_batch(engine, np.arange(first, min(first + chunk, rows + 1)), rng))
+    engine.last_refresh = time.monotonic()
+    return engine
+
+def timed(label: str, run) -> None:
+    durations = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = run()
+        durations.append((time.perf_counter() - start) * 1000)
+    groups = len(result["rows"]) if isinstance(result, dict) else len(result)
+    print(f"   {label:<44} median {statistics.median(durations):9.1f} ms   "
+          f"min {min(durations):9.1f} ms   ({groups} groups)")
+
+def python_baseline(engine: TransactionAnalytics, rows: int) -> dict:
+    """Row-at-a-time group-by, the shape of a hand-written endpoint loop"""
+    suppliers = engine.column("supplier")[:rows].tolist()
+    quarters = bucket_codes(engine.column("created_at")[:rows], "quarter").tolist()
+    amounts = engine.column("amount")[:rows].tolist()
+    totals = {}
+    for supplier, quarter, amount in zip(suppliers, quarters, amounts):
+        key = (supplier, quarter)
+        totals[key] = totals.get(key, 0.0) + amount
+    return totals
+
+def main():
+    print(f"🚀 Transaction analytics benchmark: {ROWS:,} rows, {REPEATS} repeats")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    engine = build(ROWS)
+    memory = sum(engine.column(name).nbytes for name in engine._columns) / 1024 / 1024
+    print(f"✅ Built column store in {time.perf_counter() - start:.2f}s ({memory:.0f} MiB of column data)")
+
+    print("\n📊 Queries")
+    timed("spend by supplier x quarter",
+          lambda: engine.query(group_by=["supplier"], bucket="quarter", metrics=["amount", "count"]))
+    timed("unit-price drift per chemical x month",
+          lambda: engine.query(group_by=["chemical"], bucket="month", metrics=["unit_price"],
+                               filters={"transaction_type": ["purchase"]}))
+    timed("top 20 consumers by quantity",
+          lambda: engine.query(group_by=["chemical"], metrics=["quantity"], filters={"transaction_type": ["usage"]},
+                               order_by="quantity", limit=20))
+    timed("one supplier, 2025, by week",
+          lambda: engine.query(bucket="week", filters={"supplier": ["Supplier 7"]},
+                               start=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                               end=datetime(2026, 1, 1, tzinfo=timezone.utc)))
+    timed("totals (no grouping)", lambda: engine.query())
+
+    print("\n🔄 Incremental merge")
+    rng = np.random.default_rng(7)
+    updated = np.sort(rng.choice(np.arange(1, ROWS + 1), 10_000, replace=False))
+    inserted = np.arange(ROWS + 1, ROWS + 10_001)
+    start = time.perf_counter()
+    engine.merge_columns(synthetic_batch(engine, np.concatenate([updated, inserted]), rng))
+    print(f"   10,000 updates + 10,000 inserts merged in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(now {engine.size:,} rows)")
+
+    print(f"\n🐢 Python baseline (spend by supplier x quarter, {BASELINE_ROWS:,} rows)")
+    start = time.perf_counter()
+    python_baseline(engine, BASELINE_ROWS)
+    elapsed = time.perf_counter() - start
+    print(f"   {elapsed * 1000:.1f} ms, ~{elapsed * ROWS / BASELINE_ROWS:.1f} s extrapolated to {ROWS:,} rows")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
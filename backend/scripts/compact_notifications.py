@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Notification retention job: collapses superseded stock alerts, purges
+closed notifications older than the retention window (stock alerts resolved
+before it, other notifications once dismissed), and caps the
+number of notifications each role keeps. Intended to run daily from cron, e.g.
+
+    0 3 * * * cd /path/to/backend && python scripts/compact_notifications.py
+
+Retention and cap come from NOTIFICATION_RETENTION_DAYS / NOTIFICATION_ROLE_CAP
+or the command line.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.crud.notifications import compact_notifications, NOTIFICATION_RETENTION_DAYS, NOTIFICATION_ROLE_CAP
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the notifications table")
+    parser.add_argument("--retention-days", type=int, default=NOTIFICATION_RETENTION_DAYS)
+    parser.add_argument("--role-cap", type=int, default=NOTIFICATION_ROLE_CAP)
+    args = parser.parse_args()
+    
+    print(f"🧹 Compacting notifications (retention {args.retention_days} days, cap {args.role_cap} per role)...")
+    
+    db = SessionLocal()
+    try:
+        result = compact_notifications(db, retention_days=args.retention_days, role_cap=args.role_cap)
+    except Exception as e:
+        print(f"❌ Compaction failed: {e}")
+        return 1
+    finally:
+        db.close()
+    
+    print(f"✅ Superseded stock alerts removed: {result['superseded']}")
+    print(f"✅ Closed notifications purged: {result['purged']}")
+    print(f"✅ Recipient entries over the role cap: {result['capped_recipients']} "
+          f"({result['orphaned']} notifications no longer visible to any role removed)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Replenishment job: drafts one purchase order per supplier for every chemical
+at or below its forecast reorder point. Each line uses the chemical's usual
+supplier and last unit price, is rounded up to whole packs, and small orders
+are topped up to REPLENISHMENT_MIN_ORDER_VALUE. Run after the forecast refresh:
+
+    30 0 * * * cd /path/to/backend && python scripts/draft_replenishment_orders.py
+
+Usage: python scripts/draft_replenishment_orders.py [--dry-run] [--created-by UID]
+  --dry-run     print the orders without writing them
+  --created-by  user the drafts are created by (default: the first admin)
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.user import User, UserRole
+from app.services.replenishment import draft_replenishment_orders
+
+def main():
+    parser = argparse.ArgumentParser(description="Draft purchase orders for chemicals below their reorder point")
+    parser.add_argument("--dry-run", action="store_true", help="Show the orders without creating them")
+    parser.add_argument("--created-by", help="UID of the user the drafts are created by")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        user_id = args.created_by
+        if user_id is None:
+            admin = db.query(User).filter(User.role == UserRole.ADMIN).order_by(User.id).first()
+            if admin is None:
+                print("❌ No admin user found; pass --created-by")
+                return 1
+            user_id = admin.uid
+        
+        print("🔄 Drafting replenishment orders...")
+        result = draft_replenishment_orders(db, user_id, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Replenishment failed: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+    
+    if result["status"] != "ok":
+        print(f"⚠️ Skipped: {result['reason']}")
+        return 0
+    for order in result["orders"]:
+        label = order.get("order_number") or "(dry run)"
+        print(f"  📦 {label} {order['supplier']}: {len(order['items'])} lines, "
+              f"{order['total_amount']:.2f} {order['currency']}{' (topped up)' if order['topped_up'] else ''}")
+    for skip in result["skipped"]:
+        print(f"  ⏭️ {skip['name']} (#{skip['chemical_id']}): {skip['reason']}")
+    print(f"✅ {len(result['orders'])} orders, {sum(len(o['items']) for o in result['orders'])} lines "
+          f"in {result['elapsed_ms']} ms{' (dry run, nothing written)' if result['dry_run'] else ''}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Database migration script for account indexes.
+create_all() only creates missing tables, so indexes added to existing
+account tables (account_transactions.created_at / updated_at,
+(chemical_id, created_at), purchase_orders (status, order_date),
+purchase_order_items.purchase_order_id, ...) are created here. Safe to re-run.
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.models import account_transactions
+
+ACCOUNT_TABLES = ["account_transactions", "purchase_orders", "purchase_order_items"]
+
+def migrate_account_indexes():
+    """Create every index declared on the account models that does not exist yet"""
+    print("🔄 Starting account index migration...")
+    
+    account_transactions.Base.metadata.create_all(bind=engine)
+    tables = account_transactions.Base.metadata.tables
+    with engine.begin() as connection:
+        for name in ACCOUNT_TABLES:
+            for index in sorted(tables[name].indexes, key=lambda index: index.name):
+                index.create(bind=connection, checkfirst=True)
+                print(f"✅ {index.name} created/verified")
+
+if __name__ == "__main__":
+    print("🚀 Account Index Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_account_indexes()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
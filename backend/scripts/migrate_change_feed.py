@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Database migration script to install the change feed: the notify_table_change()
+trigger function and one row trigger per table in FEED_TABLES.
+
+Run once per deploy (and again after adding a table to FEED_TABLES). The API
+workers only LISTEN; they never need DDL rights.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.change_feed import FEED_TABLES, NOTIFY_FUNCTION_SQL
+
+def trigger_exists(db, table: str) -> bool:
+    result = db.execute(text("""
+        SELECT trigger_name
+        FROM information_schema.triggers
+        WHERE event_object_table = :table AND trigger_name = :trigger_name
+    """), {"table": table, "trigger_name": f"{table}_change_feed"})
+    return result.fetchone() is not None
+
+def migrate_change_feed():
+    """Install the NOTIFY trigger function and per-table row triggers"""
+    print("🔄 Starting change feed migration...")
+    
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            print("⚠️ Change feed needs PostgreSQL, skipping")
+            return
+        
+        print("📝 Creating notify_table_change() function...")
+        db.execute(text(NOTIFY_FUNCTION_SQL))
+        print("✅ notify_table_change() ready")
+        
+        for table in FEED_TABLES:
+            if trigger_exists(db, table):
+                print(f"✅ {table}_change_feed trigger already exists")
+                continue
+            print(f"📝 Creating {table}_change_feed trigger...")
+            db.execute(text(
+                f"CREATE TRIGGER {table}_change_feed AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION notify_table_change()"
+            ))
+            print(f"✅ {table}_change_feed trigger created")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Change Feed Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_change_feed()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
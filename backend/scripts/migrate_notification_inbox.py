@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Database migration script for per-user notification state.
+Creates notification_read_marks and notification_receipts, copies the old
+global is_read / is_dismissed flags into receipts for every user in the
+notification's recipient roles, then drops the global columns.
+Run after scripts/migrate_notification_recipients.py.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import notifications
+
+def column_exists(db, column_name: str) -> bool:
+    result = db.execute(text("""
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name = 'notifications' AND column_name = :column_name
+    """), {"column_name": column_name})
+    return result.fetchone() is not None
+
+def migrate_notification_inbox():
+    """Replace global read/dismissed flags with per-user state"""
+    print("🔄 Starting notification inbox migration...")
+    
+    notifications.Base.metadata.create_all(bind=engine)
+    print("✅ notification_read_marks and notification_receipts tables created/verified")
+    
+    db = SessionLocal()
+    try:
+        if not column_exists(db, "is_read"):
+            print("✅ Global flags already migrated")
+        else:
+            print("📝 Copying global read/dismissed flags into per-user receipts...")
+            result = db.execute(text("""
+                INSERT INTO notification_receipts (user_uid, notification_id, read_at, dismissed_at)
+                SELECT u.uid, n.id,
+                       CASE WHEN n.is_read OR n.is_dismissed THEN now() END,
+                       CASE WHEN n.is_dismissed THEN now() END
+                FROM notifications n
+                JOIN notification_recipients r ON r.notification_id = n.id
+                JOIN users u ON lower(u.role::text) = r.role
+                WHERE n.is_read OR n.is_dismissed
+                ON CONFLICT DO NOTHING
+            """))
+            print(f"✅ Created {result.rowcount} receipts")
+            
+            db.execute(text("ALTER TABLE notifications DROP COLUMN is_read"))
+            db.execute(text("ALTER TABLE notifications DROP COLUMN is_dismissed"))
+            print("✅ Global is_read / is_dismissed columns dropped")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Notification Inbox Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_notification_inbox()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
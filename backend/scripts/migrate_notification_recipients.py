@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Database migration script to move notification recipients from the JSON
+string column notifications.recipients into the notification_recipients table.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import notifications
+
+def migrate_notification_recipients():
+    """Normalize JSON recipients into indexed (notification_id, role) rows"""
+    print("🔄 Starting notification recipients migration...")
+    
+    notifications.Base.metadata.create_all(bind=engine)
+    print("✅ notification_recipients table created/verified")
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'notifications' AND column_name = 'recipients'
+        """))
+        
+        if not result.fetchone():
+            print("✅ recipients column already migrated")
+        else:
+            print("📝 Copying recipient roles...")
+            result = db.execute(text("""
+                INSERT INTO notification_recipients (notification_id, role)
+                SELECT DISTINCT n.id, r.role
+                FROM notifications n
+                CROSS JOIN LATERAL json_array_elements_text(n.recipients::json) AS r(role)
+                WHERE n.recipients IS NOT NULL AND n.recipients <> ''
+                ON CONFLICT DO NOTHING
+            """))
+            print(f"✅ Copied {result.rowcount} recipient rows")
+            
+            print("📝 Dropping notifications.recipients...")
+            db.execute(text("ALTER TABLE notifications DROP COLUMN recipients"))
+            print("✅ recipients column dropped")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Notification Recipients Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_notification_recipients()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the pack_size column to the
+chemical_inventory table (purchase unit used by the replenishment job).
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def migrate_pack_size():
+    """Add chemical_inventory.pack_size"""
+    print("🔄 Starting pack size migration...")
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'chemical_inventory' AND column_name = 'pack_size'
+        """))
+        
+        if result.fetchone():
+            print("✅ pack_size column already exists")
+        else:
+            print("📝 Adding pack_size column...")
+            db.execute(text("ALTER TABLE chemical_inventory ADD COLUMN pack_size DOUBLE PRECISION"))
+            print("✅ pack_size column added")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Pack Size Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_pack_size()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
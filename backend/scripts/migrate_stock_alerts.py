@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Database migration script for server-side stock alerts.
+Adds notifications.resolved_at, resolves duplicate active stock alerts
+(keeping the newest per type and chemical) and creates the partial unique
+index the alert evaluator upserts against.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def migrate_stock_alerts():
+    """Prepare notifications for deduplicated stock alerts"""
+    print("🔄 Starting stock alert migration...")
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'notifications' AND column_name = 'resolved_at'
+        """))
+        
+        if result.fetchone():
+            print("✅ resolved_at column already exists")
+        else:
+            print("📝 Adding resolved_at column...")
+            db.execute(text("ALTER TABLE notifications ADD COLUMN resolved_at TIMESTAMP WITH TIME ZONE"))
+            print("✅ resolved_at column added")
+        
+        result = db.execute(text("""
+            UPDATE notifications n
+            SET resolved_at = now()
+            WHERE n.resolved_at IS NULL
+            AND n.type IN ('low_stock', 'out_of_stock')
+            AND n.chemical_id IS NOT NULL
+            AND EXISTS (
+                SELECT 1 FROM notifications newer
+                WHERE newer.type = n.type
+                AND newer.chemical_id = n.chemical_id
+                AND newer.resolved_at IS NULL
+                AND newer.id > n.id
+            )
+        """))
+        print(f"✅ Resolved {result.rowcount} duplicate stock alerts")
+        
+        print("📝 Creating partial unique index...")
+        db.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_active_stock_alert
+            ON notifications (type, chemical_id)
+            WHERE resolved_at IS NULL AND type IN ('low_stock', 'out_of_stock')
+        """))
+        print("✅ uq_notifications_active_stock_alert ready")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Stock Alert Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_stock_alerts()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Database migration script for the stock ledger.
+Creates stock_movements/stock_snapshots and backfills an opening balance
+movement (plus snapshot) for every chemical that has no ledger entries yet.
+The opening balance is dated at the chemical's last update, so as-of queries
+between then and the migration see the stock it already had. Also adds the
+chemical_inventory.movement_count column that paces balance snapshots.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import stock_movements
+
+def migrate_stock_ledger():
+    """Create ledger tables and backfill opening balances"""
+    print("🔄 Starting stock ledger migration...")
+    
+    stock_movements.Base.metadata.create_all(bind=engine)
+    print("✅ stock_movements and stock_snapshots tables created/verified")
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(text("""
+            INSERT INTO stock_movements (chemical_id, movement_type, quantity_delta, note, created_by, created_at)
+            SELECT c.id, 'adjust', c.quantity, 'Opening balance (ledger backfill)', c.updated_by,
+                   coalesce(c.last_updated, now())
+            FROM chemical_inventory c
+            WHERE NOT EXISTS (SELECT 1 FROM stock_movements m WHERE m.chemical_id = c.id)
+        """))
+        print(f"✅ Backfilled {result.rowcount} opening balance movements")
+        
+        # Earlier runs dated opening balances at migration time; move them back where nothing changed since
+        result = db.execute(text("""
+            UPDATE stock_movements m
+            SET created_at = c.last_updated
+            FROM chemical_inventory c
+            WHERE m.chemical_id = c.id
+            AND m.note = 'Opening balance (ledger backfill)'
+            AND c.last_updated < m.created_at
+        """))
+        db.execute(text("""
+            UPDATE stock_snapshots s
+            SET created_at = m.created_at
+            FROM stock_movements m
+            WHERE s.movement_id = m.id
+            AND m.note = 'Opening balance (ledger backfill)'
+            AND s.created_at <> m.created_at
+        """))
+        print(f"✅ Re-dated {result.rowcount} opening balances to the chemical's last update")
+        
+        result = db.execute(text("""
+            INSERT INTO stock_snapshots (chemical_id, movement_id, balance, created_at)
+            SELECT m.chemical_id, m.id, m.quantity_delta, m.created_at
+            FROM stock_movements m
+            WHERE m.note = 'Opening balance (ledger backfill)'
+            AND NOT EXISTS (SELECT 1 FROM stock_snapshots s WHERE s.chemical_id = m.chemical_id)
+        """))
+        print(f"✅ Created {result.rowcount} opening snapshots")
+        
+        result = db.execute(text("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_name = 'chemical_inventory' AND column_name = 'movement_count'
+        """))
+        if result.fetchone():
+            print("✅ movement_count column already exists")
+        else:
+            print("📝 Adding movement_count column...")
+            db.execute(text("ALTER TABLE chemical_inventory ADD COLUMN movement_count INTEGER NOT NULL DEFAULT 0"))
+            db.execute(text("""
+                UPDATE chemical_inventory c
+                SET movement_count = counts.movements
+                FROM (SELECT chemical_id, count(*) AS movements FROM stock_movements GROUP BY chemical_id) counts
+                WHERE counts.chemical_id = c.id
+            """))
+            print("✅ movement_count column added and backfilled")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Stock Ledger Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_stock_ledger()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
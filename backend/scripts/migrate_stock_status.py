@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add alert_threshold, the generated stock_status
+column and its partial index to the chemical_inventory table.
+
+Re-running it recreates a stock_status column generated by an older expression
+(e.g. one that still reported counted units as low stock) and resolves the
+low stock alerts that no longer apply.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.chemical_inventory import STOCK_STATUS_SQL, COUNTED_UNITS
+
+def column_exists(db, column_name: str, table_name: str = "chemical_inventory") -> bool:
+    result = db.execute(text("""
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name = :table_name AND column_name = :column_name
+    """), {"table_name": table_name, "column_name": column_name})
+    return result.fetchone() is not None
+
+def stock_status_is_current(db) -> bool:
+    """Whether the generated column already excludes counted units from low stock"""
+    expression = db.execute(text("""
+        SELECT generation_expression
+        FROM information_schema.columns
+        WHERE table_name = 'chemical_inventory' AND column_name = 'stock_status'
+    """)).scalar() or ""
+    return all(f"'{unit}'" in expression for unit in COUNTED_UNITS)
+
+def migrate_stock_status():
+    """Add alert threshold and server-side stock status"""
+    print("🔄 Starting stock status migration...")
+    
+    db = SessionLocal()
+    try:
+        if column_exists(db, "alert_threshold"):
+            print("✅ alert_threshold column already exists")
+        else:
+            print("📝 Adding alert_threshold column...")
+            db.execute(text("ALTER TABLE chemical_inventory ADD COLUMN alert_threshold DOUBLE PRECISION NOT NULL DEFAULT 10"))
+            print("✅ alert_threshold column added")
+        
+        if column_exists(db, "stock_status") and not stock_status_is_current(db):
+            print("📝 Dropping stock_status column generated by an older expression...")
+            # Postgres cannot change a generation expression in place; the partial index goes with the column
+            db.execute(text("ALTER TABLE chemical_inventory DROP COLUMN stock_status"))
+        
+        if column_exists(db, "stock_status"):
+            print("✅ stock_status column already exists")
+        else:
+            print("📝 Adding generated stock_status column...")
+            db.execute(text(f"ALTER TABLE chemical_inventory ADD COLUMN stock_status VARCHAR GENERATED ALWAYS AS ({STOCK_STATUS_SQL}) STORED"))
+            print("✅ stock_status column added")
+        
+        print("📝 Creating partial stock alert index...")
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_chemical_inventory_stock_alerts
+            ON chemical_inventory (stock_status, quantity)
+            WHERE stock_status <> 'in_stock'
+        """))
+        print("✅ ix_chemical_inventory_stock_alerts ready")
+        
+        if column_exists(db, "resolved_at", "notifications"):
+            result = db.execute(text("""
+                UPDATE notifications n
+                SET resolved_at = now()
+                FROM chemical_inventory c
+                WHERE n.chemical_id = c.id
+                AND n.resolved_at IS NULL
+                AND n.type = 'low_stock'
+                AND c.stock_status <> 'low_stock'
+            """))
+            print(f"✅ Resolved {result.rowcount} low stock alerts that no longer apply")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Stock Status Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_stock_status()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the optimistic concurrency version column
+to the chemical_inventory table.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def migrate_stock_versioning():
+    """Add chemical_inventory.version for If-Match updates"""
+    print("🔄 Starting stock versioning migration...")
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'chemical_inventory' AND column_name = 'version'
+        """))
+        
+        if result.fetchone():
+            print("✅ version column already exists")
+        else:
+            print("📝 Adding version column...")
+            db.execute(text("ALTER TABLE chemical_inventory ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+            print("✅ version column added")
+        
+        db.commit()
+        print("✅ Migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Stock Versioning Migration Script")
+    print("=" * 40)
+    
+    try:
+        migrate_stock_versioning()
+        print("\n🎉 Migration completed successfully!")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        sys.exit(1)
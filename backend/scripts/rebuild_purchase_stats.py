@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Rebuild chemical_purchase_stats from account_transactions.
+Creates the table and the (chemical_id, created_at) index on
+account_transactions if missing, then re-aggregates every purchase per
+chemical. Run once after deploying (backfill) and whenever the stats are
+suspected to have drifted.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import account_transactions
+from app.crud.account_transactions import rebuild_chemical_purchase_stats
+
+def main():
+    print("🔄 Rebuilding chemical purchase stats...")
+    
+    account_transactions.Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_account_transactions_chemical_id_created_at "
+            "ON account_transactions (chemical_id, created_at)"
+        ))
+    print("✅ chemical_purchase_stats table and (chemical_id, created_at) index created/verified")
+    
+    db = SessionLocal()
+    try:
+        rows = rebuild_chemical_purchase_stats(db)
+        print(f"✅ Wrote stats for {rows} chemicals")
+        return 0
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Rebuild spend_rollup from account_transactions.
+Creates the table and the account_transactions.created_at index if missing,
+then re-aggregates every transaction into per-month rows. Run once after
+deploying the rollup (backfill) and any time the totals are suspected to have
+drifted, e.g. after transactions were edited directly in the database.
+"""
+
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import account_transactions
+from app.crud.account_transactions import rebuild_spend_rollup
+
+def main():
+    print("🔄 Rebuilding spend rollup...")
+    
+    account_transactions.Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_account_transactions_created_at ON account_transactions (created_at)"
+        ))
+    print("✅ spend_rollup table and created_at index created/verified")
+    
+    db = SessionLocal()
+    try:
+        rows = rebuild_spend_rollup(db)
+        print(f"✅ Wrote {rows} rollup rows")
+        return 0
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Reconciliation job: checks every chemical_inventory.quantity against the sum
+of its stock_movements in one bulk query. Exits non-zero when any balance
+disagrees, so it can run from cron or CI.
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.crud.stock_movements import reconcile_stock_balances
+
+def main():
+    print("🔍 Reconciling stock balances against the ledger...")
+    
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_stock_balances(db)
+    finally:
+        db.close()
+    
+    if not mismatches:
+        print("✅ All balances match the ledger")
+        return 0
+    
+    print(f"❌ {len(mismatches)} chemical(s) out of balance:")
+    for item in mismatches:
+        print(f"   - #{item['chemical_id']} {item['name']}: stored {item['materialized_quantity']}, "
+              f"ledger {item['ledger_quantity']} (diff {item['difference']:+})")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
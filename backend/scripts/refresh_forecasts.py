@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Forecast refresh job: folds the usage of every complete day since the last
+run into each chemical's EWMA and rewrites chemical_forecasts (usage rate,
+days of stock, lead time, reorder point). Run daily from cron, shortly after
+midnight UTC:
+
+    15 0 * * * cd /path/to/backend && python scripts/refresh_forecasts.py
+
+Usage: python scripts/refresh_forecasts.py [--full]
+  --full  rebuild from FORECAST_HISTORY_DAYS of history instead of the stored state
+"""
+
+import sys
+import os
+import argparse
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import chemical_forecasts
+from app.services.forecasting import refresh_forecasts
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh chemical consumption forecasts")
+    parser.add_argument("--full", action="store_true", help="Recompute from the full history window")
+    args = parser.parse_args()
+    
+    print("🔄 Refreshing chemical forecasts...")
+    chemical_forecasts.Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        result = refresh_forecasts(db, full=args.full)
+    except Exception as e:
+        print(f"❌ Forecast refresh failed: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+    
+    if result["status"] != "ok":
+        print(f"⚠️ Skipped: {result['reason']}")
+        return 0
+    print(f"✅ {result['mode'].capitalize()} refresh through {result['through']}: "
+          f"{result['chemicals']} chemicals, {result['days_folded']} days folded in {result['elapsed_ms']} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -188,6 +188,21 @@ export const fetchChemicalPurchaseHistory = async (chemicalId) => {
   return response.json();
 };
 
+export const fetchChemicalsPurchaseStats = async (chemicalIds) => {
+  const params = new URLSearchParams();
+  chemicalIds.forEach(id => params.append('chemical_ids', id));
+  const response = await fetch(`${API_BASE}/account/chemicals/purchase-stats?${params}`, {
+    headers: getAuthHeaders()
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch purchase stats');
+  }
+
+  return response.json();
+};
+
 export const fetchRecentTransactions = async (limit = 10) => {
   const response = await fetch(`${API_BASE}/account/recent-transactions?limit=${limit}`, {
     headers: getAuthHeaders()
@@ -23,6 +23,39 @@ export async function fetchChemicals() {
   return res.json();
 }
 
+export async function fetchLowStockChemicals(limit = 100) {
+  const res = await fetch(`${API_BASE}/chemicals/low-stock?limit=${limit}`, { 
+    headers: await authHeaders() 
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to fetch low stock chemicals');
+  }
+  return res.json();
+}
+
+export async function fetchOutOfStockChemicals(limit = 100) {
+  const res = await fetch(`${API_BASE}/chemicals/out-of-stock?limit=${limit}`, { 
+    headers: await authHeaders() 
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to fetch out of stock chemicals');
+  }
+  return res.json();
+}
+
+export async function fetchStockStatusCounts() {
+  const res = await fetch(`${API_BASE}/chemicals/stock-status`, { 
+    headers: await authHeaders() 
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to fetch stock status');
+  }
+  return res.json();
+}
+
 export async function fetchChemical(id) {
   const res = await fetch(`${API_BASE}/chemicals/${id}`, { 
     headers: await authHeaders() 
@@ -60,6 +93,32 @@ export async function updateChemical(id, data) {
   return res.json();
 }
 
+export async function consumeChemical(id, amount, note = null) {
+  const res = await fetch(`${API_BASE}/chemicals/${id}/consume`, {
+    method: 'POST',
+    headers: await authHeaders(),
+    body: JSON.stringify({ amount, note }),
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to consume chemical');
+  }
+  return res.json();
+}
+
+export async function receiveChemical(id, amount, note = null) {
+  const res = await fetch(`${API_BASE}/chemicals/${id}/receive`, {
+    method: 'POST',
+    headers: await authHeaders(),
+    body: JSON.stringify({ amount, note }),
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to receive chemical');
+  }
+  return res.json();
+}
+
 export async function addChemicalNote(id, note) {
   const res = await fetch(`${API_BASE}/chemicals/${id}/notes`, {
     method: 'POST',
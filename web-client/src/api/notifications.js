@@ -53,6 +53,20 @@ export const fetchUnreadNotifications = async () => {
   return response.json();
 };
 
+// Get the number of unread notifications
+export const fetchUnreadCount = async () => {
+  const response = await fetch(`${API_BASE}/notifications/unread-count`, {
+    headers: getAuthHeaders()
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch unread count');
+  }
+
+  return response.json();
+};
+
 // Get active notifications
 export const fetchActiveNotifications = async () => {
   const response = await fetch(`${API_BASE}/notifications/active`, {
@@ -67,6 +81,12 @@ export const fetchActiveNotifications = async () => {
   return response.json();
 };
 
+// Open the live notification stream (EventSource cannot send headers, so the token goes in the query)
+export const openNotificationStream = () => {
+  const token = localStorage.getItem('firebase_token');
+  return new EventSource(`${API_BASE}/notifications/stream?token=${encodeURIComponent(token || '')}`);
+};
+
 // Dismiss notification
 export const dismissNotification = async (notificationId) => {
   const response = await fetch(`${API_BASE}/notifications/${notificationId}/dismiss`, {
@@ -97,6 +117,53 @@ export const markNotificationRead = async (notificationId) => {
   return response.json();
 };
 
+// Mark every notification for the current user as read
+export const markAllNotificationsRead = async () => {
+  const response = await fetch(`${API_BASE}/notifications/read-all`, {
+    method: 'POST',
+    headers: getAuthHeaders()
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to mark notifications as read');
+  }
+
+  return response.json();
+};
+
+// Mark notifications read by ids and/or filters ({ ids, type, chemical_id, before })
+export const bulkMarkNotificationsRead = async (criteria) => {
+  const response = await fetch(`${API_BASE}/notifications/bulk/read`, {
+    method: 'POST',
+    headers: getAuthHeaders(),
+    body: JSON.stringify(criteria)
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to mark notifications as read');
+  }
+
+  return response.json();
+};
+
+// Dismiss notifications by ids and/or filters ({ ids, type, chemical_id, before })
+export const bulkDismissNotifications = async (criteria) => {
+  const response = await fetch(`${API_BASE}/notifications/bulk/dismiss`, {
+    method: 'POST',
+    headers: getAuthHeaders(),
+    body: JSON.stringify(criteria)
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to dismiss notifications');
+  }
+
+  return response.json();
+};
+
 // Update notification
 export const updateNotification = async (notificationId, updateData) => {
   const response = await fetch(`${API_BASE}/notifications/${notificationId}`, {
@@ -12,11 +12,12 @@ export default function ChemicalForm({ chemical, onSubmit, onCancel, title }) {
     supplier: '',
     location: ''
   });
+  const [initialData, setInitialData] = useState(null);
   const [errors, setErrors] = useState({});
 
   useEffect(() => {
     if (chemical) {
-      setFormData({
+      const data = {
         name: chemical.name || '',
         quantity: chemical.quantity || 0,
         unit: chemical.unit || '',
@@ -25,7 +26,9 @@ export default function ChemicalForm({ chemical, onSubmit, onCancel, title }) {
         alert_threshold: chemical.alert_threshold || 10,
         supplier: chemical.supplier || '',
         location: chemical.location || ''
-      });
+      };
+      setFormData(data);
+      setInitialData(data);
     }
   }, [chemical]);
 
@@ -73,12 +76,21 @@ export default function ChemicalForm({ chemical, onSubmit, onCancel, title }) {
     
     if (validateForm()) {
       // Convert quantity and alert_threshold to numbers
-      const submitData = {
-        ...formData,
-        quantity: parseFloat(formData.quantity),
-        alert_threshold: parseFloat(formData.alert_threshold)
-      };
-      onSubmit(submitData);
+      const toSubmitData = (data) => ({
+        ...data,
+        quantity: parseFloat(data.quantity),
+        alert_threshold: parseFloat(data.alert_threshold)
+      });
+      const submitData = toSubmitData(formData);
+      if (initialData) {
+        // Updates send only the fields the user changed, so untouched ones are never overwritten
+        const original = toSubmitData(initialData);
+        onSubmit(Object.fromEntries(
+          Object.entries(submitData).filter(([key, value]) => value !== original[key])
+        ));
+      } else {
+        onSubmit(submitData);
+      }
     }
   };
 
@@ -15,6 +15,8 @@ import {
 import {
   fetchChemicals,
   fetchChemical,
+  fetchLowStockChemicals,
+  fetchOutOfStockChemicals,
   createChemical,
   updateChemical,
   addChemicalNote,
@@ -25,7 +27,7 @@ import {
   addFormulationNote,
   deleteFormulation,
 } from '../api/chemicals';
-import { fetchChemicalPurchaseHistory } from '../api/accountTransactions';
+import { fetchChemicalsPurchaseStats } from '../api/accountTransactions';
 import ChemicalDetail from './ChemicalDetail';
 import ChemicalForm from './ChemicalForm';
 import FormulationForm from './FormulationForm';
@@ -62,8 +64,8 @@ export default function ChemicalsDashboard() {
       console.log('Loaded chemicals:', data);
       setChemicals(data);
       
-      // Check for alerts based on quantities
-      checkForAlerts(data);
+      // Stock alerts are computed server-side; fetch only the affected rows
+      await loadStockAlerts();
       
       // Load purchase history for account view
       if (['admin', 'account'].includes(userInfo?.role || user?.role || 'all_users')) {
@@ -82,12 +84,21 @@ export default function ChemicalsDashboard() {
 
   const loadPurchaseHistory = async (chemicalData) => {
     const history = {};
+    if (chemicalData.length === 0) {
+      setPurchaseHistory(history);
+      return;
+    }
+    try {
+      // One request for every listed chemical
+      const stats = await fetchChemicalsPurchaseStats(chemicalData.map(chemical => chemical.id));
+      for (const item of stats) {
+        history[item.chemical_id] = item;
+      }
+    } catch (err) {
+      console.error('Error loading purchase stats:', err);
+    }
     for (const chemical of chemicalData) {
-      try {
-        const historyData = await fetchChemicalPurchaseHistory(chemical.id);
-        history[chemical.id] = historyData;
-      } catch (err) {
-        console.error(`Error loading purchase history for chemical ${chemical.id}:`, err);
+      if (!history[chemical.id]) {
         history[chemical.id] = {
           total_purchased: 0,
           total_spent: 0,
@@ -99,43 +110,40 @@ export default function ChemicalsDashboard() {
     setPurchaseHistory(history);
   };
 
-  const checkForAlerts = (chemicalData) => {
-    const newAlerts = [];
-    
-    chemicalData.forEach(chemical => {
-      // Get alert threshold (default to 10 if not set)
-      const alertThreshold = chemical.alert_threshold || 10;
+  const loadStockAlerts = async () => {
+    try {
+      const [lowStock, outOfStock] = await Promise.all([
+        fetchLowStockChemicals(),
+        fetchOutOfStockChemicals()
+      ]);
+      const newAlerts = [];
       
-      // Low stock alert (below custom threshold)
-      if (chemical.quantity < alertThreshold && chemical.quantity > 0 && 
-          chemical.unit !== 'pieces' && chemical.unit !== 'bottles') {
+      lowStock.forEach(chemical => {
         newAlerts.push({
           id: `low_stock_${chemical.id}`,
           type: 'low_stock',
           severity: 'warning',
-          message: `Low stock alert: ${chemical.name} has only ${chemical.quantity} ${chemical.unit} remaining (threshold: ${alertThreshold} ${chemical.unit})`,
+          message: `Low stock alert: ${chemical.name} has only ${chemical.quantity} ${chemical.unit} remaining (threshold: ${chemical.alert_threshold} ${chemical.unit})`,
           chemicalId: chemical.id,
-          timestamp: new Date().toISOString()
+          timestamp: chemical.last_updated
         });
-      }
+      });
       
-      // Out of stock alert
-      if (chemical.quantity <= 0) {
+      outOfStock.forEach(chemical => {
         newAlerts.push({
           id: `out_of_stock_${chemical.id}`,
           type: 'out_of_stock',
           severity: 'critical',
           message: `Out of stock: ${chemical.name} is completely depleted`,
           chemicalId: chemical.id,
-          timestamp: new Date().toISOString()
+          timestamp: chemical.last_updated
         });
-      }
+      });
       
-      // Expiry alert (if we had expiry dates)
-      // This would be implemented when expiry tracking is added
-    });
-    
-    setAlerts(newAlerts);
+      setAlerts(newAlerts);
+    } catch (err) {
+      console.error('Error loading stock alerts:', err);
+    }
   };
 
   const handleSelectChemical = async (id) => {
@@ -153,6 +161,18 @@ export default function ChemicalsDashboard() {
     }
   };
 
+  const handleEditChemical = async (id) => {
+    // List rows leave out formulation and notes; edit the full record
+    try {
+      const chemical = await fetchChemical(id);
+      setEditingChemical(chemical);
+      setError('');
+    } catch (err) {
+      console.error('Error loading chemical for editing:', err);
+      setError(err.message || 'Failed to load chemical details.');
+    }
+  };
+
   const handleCreateChemical = async (chemicalData) => {
     try {
       console.log('Creating chemical with data:', chemicalData);
@@ -599,7 +619,7 @@ export default function ChemicalsDashboard() {
                         <button 
                           onClick={(e) => {
                             e.stopPropagation();
-                            setEditingChemical(chemical);
+                            handleEditChemical(chemical.id);
                           }}
                           className={styles.editBtn}
                         >
@@ -632,7 +652,7 @@ export default function ChemicalsDashboard() {
               formulations={formulations}
               user={user}
               onAddNote={handleAddChemicalNote}
-              onEdit={() => setEditingChemical(selectedChemical)}
+              onEdit={() => handleEditChemical(selectedChemical.id)}
               onDelete={() => handleDeleteChemical(selectedChemical.id)}
               onCreateFormulation={() => setShowFormulationForm(true)}
               onEditFormulation={setEditingFormulation}
@@ -1,52 +1,9 @@
 import React, { useState, useEffect } from 'react';
-import { sendNotification, fetchNotifications, dismissNotification } from '../api/notifications';
+import { fetchNotifications, dismissNotification, openNotificationStream } from '../api/notifications';
 import styles from './NotificationSystem.module.scss';
 
 export default function NotificationSystem({ alerts, onDismissAlert }) {
   const [notifications, setNotifications] = useState([]);
-  const [loading, setLoading] = useState(false);
-
-  // Send notification to backend
-  const sendNotificationToBackend = async (alert) => {
-    try {
-      const notificationData = {
-        type: alert.type,
-        severity: alert.severity,
-        message: alert.message,
-        chemical_id: alert.chemicalId,
-        timestamp: alert.timestamp,
-        recipients: ['admin', 'product'] // Send to admins and product team
-      };
-
-      await sendNotification(notificationData);
-      console.log('Notification sent successfully');
-    } catch (error) {
-      console.error('Error sending notification:', error);
-    }
-  };
-
-  // Send notifications for new alerts
-  useEffect(() => {
-    if (alerts.length > 0) {
-      setLoading(true);
-      
-      // Send notifications for critical alerts immediately
-      const criticalAlerts = alerts.filter(alert => alert.severity === 'critical');
-      criticalAlerts.forEach(alert => {
-        sendNotificationToBackend(alert);
-      });
-
-      // Send notifications for warning alerts with a delay
-      const warningAlerts = alerts.filter(alert => alert.severity === 'warning');
-      setTimeout(() => {
-        warningAlerts.forEach(alert => {
-          sendNotificationToBackend(alert);
-        });
-      }, 5000); // 5 second delay for warnings
-
-      setLoading(false);
-    }
-  }, [alerts]);
 
   // Fetch existing notifications
   const loadNotifications = async () => {
@@ -58,8 +15,30 @@ export default function NotificationSystem({ alerts, onDismissAlert }) {
     }
   };
 
+  // Load once, then apply changes pushed by the server instead of polling
   useEffect(() => {
     loadNotifications();
+
+    const stream = openNotificationStream();
+    const upsert = (event) => {
+      const notification = JSON.parse(event.data);
+      setNotifications(prev => [
+        { is_read: false, is_dismissed: false, ...prev.find(n => n.id === notification.id), ...notification },
+        ...prev.filter(n => n.id !== notification.id)
+      ]);
+    };
+    const remove = (event) => {
+      const { id } = JSON.parse(event.data);
+      setNotifications(prev => prev.filter(n => n.id !== id));
+    };
+
+    stream.addEventListener('notification', upsert);
+    stream.addEventListener('resolved', upsert);
+    stream.addEventListener('deleted', remove);
+    // The server could not replay everything we missed
+    stream.addEventListener('resync', loadNotifications);
+
+    return () => stream.close();
   }, []);
 
   const handleDismissNotification = async (notificationId) => {
@@ -99,12 +78,6 @@ export default function NotificationSystem({ alerts, onDismissAlert }) {
 
   return (
     <div className={styles.notificationSystem}>
-      {loading && (
-        <div className={styles.loadingIndicator}>
-          Sending notifications...
-        </div>
-      )}
-      
       {notifications.length > 0 && (
         <div className={styles.notificationsList}>
           <h4>Recent Notifications</h4>